@@ -0,0 +1,73 @@
+"""documents table with HNSW vector index
+
+Revision ID: 3f1c2a9d7b01
+Revises:
+Create Date: 2026-10-19 10:00:00.000000
+
+HNSW build parameters can be tuned per run, e.g.
+
+    alembic -x hnsw_m=32 -x hnsw_ef_construction=128 upgrade head
+
+Larger values give better recall at the cost of build time and index size.
+"""
+
+from typing import Sequence, Union
+
+from alembic import context, op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c2a9d7b01"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Keep in sync with docy.models.document
+VECTOR_DIMENSIONS = 384
+DEFAULT_HNSW_M = 16
+DEFAULT_HNSW_EF_CONSTRUCTION = 64
+
+
+def _hnsw_parameters() -> tuple[int, int]:
+    arguments = context.get_x_argument(as_dictionary=True)
+    m = int(arguments.get("hnsw_m", DEFAULT_HNSW_M))
+    ef_construction = int(arguments.get("hnsw_ef_construction", DEFAULT_HNSW_EF_CONSTRUCTION))
+    if ef_construction < 2 * m:
+        raise ValueError("hnsw_ef_construction must be at least twice hnsw_m")
+    return m, ef_construction
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    m, ef_construction = _hnsw_parameters()
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    # The table may already exist from SQLModel.metadata.create_all, so every step is idempotent
+    op.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS document (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR NOT NULL,
+            embedding vector({VECTOR_DIMENSIONS})
+        )
+        """
+    )
+    op.execute("ALTER TABLE document ADD COLUMN IF NOT EXISTS content TEXT NOT NULL DEFAULT ''")
+    op.execute("ALTER TABLE document ADD COLUMN IF NOT EXISTS metadata JSONB NOT NULL DEFAULT '{}'")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_document_name ON document (name)")
+
+    # Build without blocking writers; CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_document_metadata ON document USING gin (metadata)")
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_document_embedding_hnsw "
+            "ON document USING hnsw (embedding vector_cosine_ops) "
+            f"WITH (m = {m}, ef_construction = {ef_construction})"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_document_embedding_hnsw", table_name="document", if_exists=True)
+    op.drop_index("ix_document_metadata", table_name="document", if_exists=True)
+    op.drop_column("document", "metadata")
+    op.drop_column("document", "content")
@@ -0,0 +1,46 @@
+"""message keyset index and content full-text index
+
+Revision ID: 5a9c7e3b1d48
+Revises: e7a1b3c5d9f2
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5a9c7e3b1d48"
+down_revision: Union[str, None] = "e7a1b3c5d9f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Keep in sync with docy.models.chat.MESSAGE_SEARCH_EXPRESSION
+MESSAGE_SEARCH_EXPRESSION = "to_tsvector('simple', content)"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_messages_chat_id_created_at_id "
+            "ON messages (chat_id, created_at, id)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_messages_content_search "
+            f"ON messages USING gin ({MESSAGE_SEARCH_EXPRESSION})"
+        )
+        # Superseded: the composite index's prefix serves chat_id lookups, and the B-tree on
+        # content can fail outright on very long messages
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_messages_chat_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_messages_content")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_messages_chat_id ON messages (chat_id)")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_messages_content ON messages (content)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_messages_content_search")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_messages_chat_id_created_at_id")
@@ -0,0 +1,38 @@
+"""full-text search vector on documents
+
+Revision ID: 8b4e6d2c5a17
+Revises: 3f1c2a9d7b01
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8b4e6d2c5a17"
+down_revision: Union[str, None] = "3f1c2a9d7b01"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Keep in sync with docy.models.document.SEARCH_VECTOR_EXPRESSION
+SEARCH_VECTOR_EXPRESSION = "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(content, ''))"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "ALTER TABLE document ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPRESSION}) STORED"
+    )
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_document_search_vector ON document USING gin (search_vector)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_document_search_vector", table_name="document", if_exists=True)
+    op.drop_column("document", "search_vector")
@@ -0,0 +1,33 @@
+"""artifact bodies in the content-addressed blob store
+
+Revision ID: c4d2e8f1a903
+Revises: 8b4e6d2c5a17
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4d2e8f1a903"
+down_revision: Union[str, None] = "8b4e6d2c5a17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows keep their inline body until it is next updated; new bodies go to the blob store
+    op.execute("ALTER TABLE artifacts ADD COLUMN IF NOT EXISTS content_sha VARCHAR(64)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_artifacts_content_sha ON artifacts (content_sha)")
+    op.alter_column("artifacts", "content", existing_type=sa.Text(), nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_artifacts_content_sha", table_name="artifacts", if_exists=True)
+    op.drop_column("artifacts", "content_sha")
@@ -0,0 +1,47 @@
+"""artifact version history
+
+Revision ID: e7a1b3c5d9f2
+Revises: c4d2e8f1a903
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e7a1b3c5d9f2"
+down_revision: Union[str, None] = "c4d2e8f1a903"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing artifacts get their first version when their body is next updated
+    op.create_table(
+        "artifact_versions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("artifact_id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("content_sha", sa.String(length=64), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("is_snapshot", sa.Boolean(), nullable=False),
+        sa.Column("delta", sa.LargeBinary(), nullable=True),
+        sa.ForeignKeyConstraint(["artifact_id"], ["artifacts.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("artifact_id", "version", name="uq_artifact_versions_artifact_version"),
+    )
+    op.create_index(op.f("ix_artifact_versions_artifact_id"), "artifact_versions", ["artifact_id"], unique=False)
+    op.create_index(op.f("ix_artifact_versions_id"), "artifact_versions", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_artifact_versions_id"), table_name="artifact_versions")
+    op.drop_index(op.f("ix_artifact_versions_artifact_id"), table_name="artifact_versions")
+    op.drop_table("artifact_versions")
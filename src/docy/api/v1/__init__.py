@@ -9,7 +9,8 @@ from .endpoints import (
     task_router,
     user_router,
     file_router,
-    chat_router
+    chat_router,
+    search_router,
 )
 
 api_v1_router = APIRouter()
@@ -23,6 +24,7 @@ api_v1_router.include_router(prompt_router)
 api_v1_router.include_router(task_router)
 api_v1_router.include_router(user_router)
 api_v1_router.include_router(file_router)
+api_v1_router.include_router(search_router)
 
 
 __all__ = ["api_v1_router"]
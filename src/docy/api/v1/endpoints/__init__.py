@@ -7,6 +7,7 @@ from .task import router as task_router
 from .user import router as user_router
 from .files import router as file_router
 from .chat import router as chat_router
+from .search import router as search_router
 
 __all__ = [
     "user_router",
@@ -18,4 +19,5 @@ __all__ = [
     "prompt_router",
     "file_router",
     "chat_router",
+    "search_router",
 ]
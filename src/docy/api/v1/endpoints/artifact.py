@@ -1,24 +1,127 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Path, status
+from fastapi import APIRouter, Depends, Path, Query, Request, Response, status
 from fastapi.exceptions import HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
 from docy.db import get_session
+from docy.models import Artifact, ArtifactType
 from docy.repositories import ArtifactRepository
-from docy.schemas.artifact import ArtifactIn, ArtifactOut, ArtifactUpdate
+from docy.repositories.artifact import ARTIFACT_PROJECT
+from docy.schemas.artifact import ArtifactIn, ArtifactOut, ArtifactSummary, ArtifactUpdate, ArtifactVersionOut
 
 router = APIRouter(prefix="/artifacts", tags=["artifacts"])
 
+MEDIA_TYPES = {
+    ArtifactType.MARKDOWN: "text/markdown; charset=utf-8",
+    ArtifactType.CODE: "text/plain; charset=utf-8",
+    ArtifactType.DEFAULT: "text/plain; charset=utf-8",
+}
+
 
 def get_artifact_repository(session: AsyncSession = Depends(get_session)):
     return ArtifactRepository(session)
 
 
-@router.get("/", response_model=List[ArtifactOut])
-async def get_artifacts(artifact_repo: ArtifactRepository = Depends(get_artifact_repository)):
-    artifacts = await artifact_repo.get_multi()
-    return artifacts
+async def to_artifact_out(artifact: Artifact, artifact_repo: ArtifactRepository) -> ArtifactOut:
+    """Attach the body, which lives in the blob store rather than on the row; `project` must be loaded."""
+    return ArtifactOut(
+        id=artifact.id,
+        name=artifact.name,
+        description=artifact.description,
+        content=await artifact_repo.read_content(artifact),
+        validated=artifact.validated,
+        artifact_type=artifact.artifact_type,
+        project=artifact.project,
+    )
+
+
+@router.get("/", response_model=List[ArtifactSummary])
+async def get_artifacts(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    project_id: Optional[int] = Query(None),
+    artifact_repo: ArtifactRepository = Depends(get_artifact_repository),
+):
+    """List artifact metadata; bodies are fetched per artifact from `/artifacts/{id}/content`."""
+    return await artifact_repo.list_summaries(skip=skip, limit=limit, project_id=project_id)
+
+
+@router.get("/{artifact_id}/content")
+async def get_artifact_content(
+    request: Request,
+    artifact_id: int = Path(...),
+    artifact_repo: ArtifactRepository = Depends(get_artifact_repository),
+):
+    """
+    Stream an artifact's body.
+    The body's SHA-256 is its ETag, so clients revalidating with If-None-Match get 304 until it changes.
+    """
+    ref = await artifact_repo.get_content_ref(artifact_id)
+    if ref is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Artifact with id {artifact_id} not found")
+
+    media_type = MEDIA_TYPES.get(ref["artifact_type"], MEDIA_TYPES[ArtifactType.DEFAULT])
+    content_sha = ref["content_sha"]
+    if content_sha is None:
+        # Written before bodies moved to the blob store
+        return Response(content=ref["content"] or "", media_type=media_type)
+
+    etag = f'"{content_sha}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"etag": etag})
+    headers = {"etag": etag}
+    size = artifact_repo.blob_store.size(content_sha)
+    if size is not None:
+        headers["content-length"] = str(size)
+    return StreamingResponse(artifact_repo.iter_content(content_sha), media_type=media_type, headers=headers)
+
+
+async def ensure_artifact(artifact_id: int, artifact_repo: ArtifactRepository) -> None:
+    if not await artifact_repo.count({"id": artifact_id}):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Artifact with id {artifact_id} not found")
+
+
+@router.get("/{artifact_id}/versions", response_model=List[ArtifactVersionOut])
+async def get_artifact_versions(
+    artifact_id: int = Path(...),
+    artifact_repo: ArtifactRepository = Depends(get_artifact_repository),
+):
+    """List an artifact's revisions, newest first."""
+    await ensure_artifact(artifact_id, artifact_repo)
+    return await artifact_repo.list_versions(artifact_id)
+
+
+@router.get("/{artifact_id}/versions/diff", response_class=PlainTextResponse)
+async def diff_artifact_versions(
+    artifact_id: int = Path(...),
+    from_version: int = Query(..., ge=1),
+    to_version: int = Query(..., ge=1),
+    artifact_repo: ArtifactRepository = Depends(get_artifact_repository),
+):
+    """Unified diff between two revisions of an artifact."""
+    diff = await artifact_repo.diff_versions(artifact_id, from_version, to_version)
+    if diff is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Artifact version not found")
+    return PlainTextResponse(diff, media_type="text/x-diff; charset=utf-8")
+
+
+@router.get("/{artifact_id}/versions/{version}")
+async def get_artifact_version(
+    artifact_id: int = Path(...),
+    version: int = Path(..., ge=1),
+    artifact_repo: ArtifactRepository = Depends(get_artifact_repository),
+):
+    """Body of one revision of an artifact, rebuilt from its nearest snapshot."""
+    ref = await artifact_repo.get_content_ref(artifact_id)
+    if ref is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Artifact with id {artifact_id} not found")
+    content = await artifact_repo.get_version_content(artifact_id, version)
+    if content is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Version {version} not found")
+    media_type = MEDIA_TYPES.get(ref["artifact_type"], MEDIA_TYPES[ArtifactType.DEFAULT])
+    return Response(content=content, media_type=media_type)
 
 
 @router.get("/{artifact_id}", response_model=ArtifactOut)
@@ -26,8 +129,8 @@ async def get_artifact(
     artifact_id: int = Path(...),
     artifact_repo: ArtifactRepository = Depends(get_artifact_repository),
 ):
-    artifact = await artifact_repo.get_or_404(artifact_id)
-    return artifact
+    artifact = await artifact_repo.get_or_404(artifact_id, load_options=[ARTIFACT_PROJECT])
+    return await to_artifact_out(artifact, artifact_repo)
 
 
 @router.post("/", response_model=int)
@@ -39,19 +142,19 @@ async def create_artifact(
     return artifact.id
 
 
-@router.put("/{artifact_id}")
+@router.put("/{artifact_id}", response_model=ArtifactOut)
 async def update_artifact(
     artifact_update: ArtifactUpdate,
     artifact_id: int = Path(...),
     artifact_repo: ArtifactRepository = Depends(get_artifact_repository),
 ):
-    artifact_db = await artifact_repo.get_or_404(artifact_id)
+    artifact_db = await artifact_repo.get_or_404(artifact_id, load_options=[ARTIFACT_PROJECT])
 
     updated_artifact = await artifact_repo.update(artifact_update, artifact_db)
     if updated_artifact is None:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update artifact")
 
-    return updated_artifact
+    return await to_artifact_out(updated_artifact, artifact_repo)
 
 
 @router.delete("/{artifact_id}")
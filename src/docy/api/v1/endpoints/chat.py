@@ -1,9 +1,10 @@
-from typing import List
+from typing import List, Optional
 
 import sqlalchemy
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from docy.models.chat import (
@@ -11,6 +12,7 @@ from docy.models.chat import (
     Message, MessageCreate, MessageRead
 )
 from docy.db.session import get_session
+from docy.repositories import MessageRepository
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
@@ -51,19 +53,25 @@ async def read_chats(
 async def read_chat(
     *,
     session: AsyncSession = Depends(get_session),
-    chat_id: int
-) -> Chat:
+    chat_id: int,
+    message_limit: int = Query(50, ge=0, le=500)
+) -> ChatReadWithMessages:
     """
-    Retrieve a specific chat by ID, including its messages.
+    Retrieve a specific chat by ID with its latest `message_limit` messages.
+    Older messages are paged with `GET /chats/{chat_id}/messages/?before=<first message id>`.
     """
-    # Use selectinload to efficiently load related messages in the same query
-    statement = select(Chat).where(Chat.id == chat_id).options(selectinload(Chat.messages))
+    statement = select(Chat).where(Chat.id == chat_id).options(selectinload(Chat.user))
     result = await session.execute(statement)
     db_chat = result.scalars().one_or_none() # Use one_or_none() for clarity
-
     if db_chat is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat not found")
-    return db_chat
+
+    messages, has_more = await MessageRepository(session).get_page(chat_id, limit=message_limit, latest=True)
+    # Attach the page as the loaded relationship instead of loading every message of the chat
+    set_committed_value(db_chat, "messages", messages)
+    chat_read = ChatReadWithMessages.model_validate(db_chat, from_attributes=True)
+    chat_read.has_more_messages = has_more
+    return chat_read
 
 # == Message Endpoints ==
 
@@ -94,24 +102,23 @@ async def read_messages_for_chat(
     *,
     session: AsyncSession = Depends(get_session),
     chat_id: int,
-    skip: int = Query(0, ge=0),
+    before: Optional[int] = Query(None, description="Return messages older than this message id"),
+    after: Optional[int] = Query(None, description="Return messages newer than this message id"),
+    skip: int = Query(0, ge=0, deprecated=True, description="Offset paging; use `before`/`after` instead"),
     limit: int = Query(100, ge=1, le=500) # Allow fetching more messages
 ) -> List[Message]:
     """
-    Retrieve messages for a specific chat with pagination.
+    Retrieve messages for a specific chat, oldest first, with keyset pagination.
+    Without cursors the chat's first messages are returned; `before` returns the newest messages
+    older than the given one and `after` the oldest newer ones. Pass the first or last id of a
+    page to get the next one. The deprecated `skip` still offsets the page for older clients.
     """
     # Optional: Check if chat exists first
     chat = await session.get(Chat, chat_id)
     if not chat:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Chat with id {chat_id} not found")
 
-    statement = (
-        select(Message)
-        .where(Message.chat_id == chat_id)
-        .order_by(Message.created_at) # Order messages chronologically
-        .offset(skip)
-        .limit(limit)
+    messages, _ = await MessageRepository(session).get_page(
+        chat_id, before=before, after=after, limit=limit, skip=skip
     )
-    result = await session.execute(statement)
-    messages = list(result.scalars().all())
     return messages
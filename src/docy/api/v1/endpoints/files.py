@@ -1,13 +1,19 @@
+import asyncio
+import codecs
+import hashlib
 import os
+from email.utils import formatdate, parsedate_to_datetime
 
-from typing import List
+from typing import List, Optional
 from pathlib import Path
 from pydantic import BaseModel
 
-from fastapi import APIRouter, Depends, status, Query, HTTPException, Path as PathParam
+from fastapi import APIRouter, Depends, status, Query, HTTPException, Path as PathParam, Request, Response, UploadFile
 from fastapi.responses import FileResponse, JSONResponse
 
 from docy.core import Settings
+from docy.storage import get_blob_store
+from docy.services.file_listing import SORT_KEYS, DirectoryListing
 
 settings = Settings()
 
@@ -15,12 +21,36 @@ settings = Settings()
 DATA_DIR = Path(settings.DOCY_DATA_DIR)
 DATA_DIR.mkdir(exist_ok=True, parents=True)
 
+# Bytes moved per read/write when streaming uploads and content chunks
+CHUNK_SIZE = 1024 * 1024
+# Largest slice GET /files/{name}/content returns in one response
+MAX_CONTENT_LENGTH = 4 * 1024 * 1024
+# Files are hard links into the content-addressed blob store, bound under this namespace
+BLOB_NAMESPACE = "files"
+
+blob_store = get_blob_store()
+
+
+def _hidden(name: str) -> bool:
+    # The blob store directory and the dot-prefixed temp links made while replacing a file
+    return name == blob_store.root.name or (name.startswith(".") and name.endswith(".link"))
+
+
+listing = DirectoryListing(DATA_DIR, exclude=_hidden)
+
 
 class File(BaseModel):
     name: str
     content: str
 
 
+class FileChunk(File):
+    offset: int
+    size: int
+    # Where the next chunk starts; None once the end of the file is reached
+    next_offset: Optional[int] = None
+
+
 class FileInfo(BaseModel):
     name: str
     size: int
@@ -30,97 +60,210 @@ class FileInfo(BaseModel):
 router = APIRouter(prefix="/files", tags=["files"])
 
 
-@router.get("/", response_model=List[FileInfo])
-async def get_files():
-    files = []
-    for file_path in DATA_DIR.glob("*"):
-        if file_path.is_file():
-            try:
-                stat = file_path.stat()
-                files.append(FileInfo(
-                    name=file_path.name,
-                    size=stat.st_size,
-                    modified=str(stat.st_mtime)
-                ))
-            except Exception as e:
-                # Skip files that can't be accessed
-                continue
-
-    return files
-
-
-@router.get("/{file_name}")
-async def get_file(
-    file_name: str = PathParam(...),
-    as_download: bool = Query(False, description="Set to true to download the file instead of viewing it")
-):
-    """
-    Get a specific file by name.
-    Can return file content as JSON or serve the file directly depending on the query parameter.
-    """
-    file_path = DATA_DIR / file_name
+def _resolve(file_name: str) -> Path:
+    """Path of `file_name` inside DATA_DIR, rejecting names that escape it or reach into the blob store."""
+    try:
+        file_path = (DATA_DIR / file_name).resolve()
+        if file_path == DATA_DIR.resolve():
+            # An empty name (or one like "." or "a/..") would target the data directory itself
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid file name - empty name"
+            )
+        if not file_path.is_relative_to(DATA_DIR.resolve()):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid file name - path traversal detected"
+            )
+        if file_path.is_relative_to(blob_store.root.resolve()):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid file name - reserved path"
+            )
+    except (ValueError, RuntimeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid file name"
+        ) from e
+    return file_path
+
 
-    if not file_path.exists() or not file_path.is_file():
+def _existing(file_name: str) -> Path:
+    file_path = _resolve(file_name)
+    if not file_path.is_file():
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"File '{file_name}' not found"
         )
+    return file_path
+
+
+def _not_modified(request: Request, stat: os.stat_result) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since against the validators FileResponse sends."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etag = f'"{_etag(stat)}"'
+        return etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")] or if_none_match == "*"
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(stat.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _etag(stat: os.stat_result) -> str:
+    # Same construction as Starlette's FileResponse
+    return hashlib.md5(f"{stat.st_mtime}-{stat.st_size}".encode(), usedforsecurity=False).hexdigest()
+
+
+def _blob_name(file_path: Path) -> str:
+    return file_path.relative_to(DATA_DIR.resolve()).as_posix()
 
-    # Return the file as a direct download/view
-    return FileResponse(
-        path=file_path,
-        filename=file_name if as_download else None,
-        media_type="application/octet-stream" if as_download else None
-    )
 
+def _store_file(file_path: Path, sha: str) -> None:
+    """Point `file_path` at blob `sha`, replacing any previous content atomically."""
+    blob_store.link(sha, file_path)
+    blob_store.bind(BLOB_NAMESPACE, _blob_name(file_path), sha)
+    listing.invalidate(file_path)
 
-@router.get("/{file_name}/content", response_model=File)
-async def get_file_content(file_name: str = PathParam(...)):
+
+def _remove_file(file_path: Path) -> None:
+    file_path.unlink()
+    blob_store.unbind(BLOB_NAMESPACE, _blob_name(file_path))
+    listing.invalidate(file_path)
+
+
+async def _write_stream(file_path: Path, chunks) -> int:
     """
-    Get a specific file's content as JSON.
+    Write an async byte stream to `file_path` chunk by chunk.
+
+    The data is spooled into the blob store while being hashed; the target is then replaced by
+    a link to the blob, so readers never see a partial file, a failed upload leaves the old
+    version in place and content that is already stored takes no extra space.
     """
-    file_path = DATA_DIR / file_name
+    writer = await asyncio.to_thread(blob_store.writer)
+    try:
+        async for chunk in chunks:
+            if chunk:
+                await asyncio.to_thread(writer.write, chunk)
+        sha = await asyncio.to_thread(writer.commit)
+    except BaseException:
+        writer.abort()
+        raise
+    await asyncio.to_thread(_store_file, file_path, sha)
+    return writer.size
+
 
-    if not file_path.exists() or not file_path.is_file():
+@router.get("/", response_model=List[FileInfo])
+async def get_files(
+    response: Response,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=10000),
+    sort: str = Query("name", description=f"One of: {', '.join(SORT_KEYS)}"),
+    descending: bool = Query(False),
+    recursive: bool = Query(False, description="Include files in subdirectories, named by relative path"),
+    pattern: Optional[str] = Query(None, description="Glob on the relative path, e.g. *.md"),
+):
+    """
+    List files in the data directory, one page at a time.
+    Listings come from a directory cache that only rescans directories whose mtime changed;
+    the total number of matching files is returned in the `X-Total-Count` header.
+    """
+    if sort not in SORT_KEYS:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"File '{file_name}' not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid sort key '{sort}'"
         )
+    total, entries = await asyncio.to_thread(
+        listing.page, offset=offset, limit=limit, sort=sort, descending=descending, recursive=recursive, pattern=pattern
+    )
+    response.headers["X-Total-Count"] = str(total)
+    return [FileInfo(name=entry.path, size=entry.size, modified=str(entry.modified)) for entry in entries]
+
+
+@router.get("/{file_name:path}/content", response_model=FileChunk)
+async def get_file_content(
+    file_name: str = PathParam(...),
+    offset: int = Query(0, ge=0, description="Byte offset to start reading at"),
+    length: int = Query(MAX_CONTENT_LENGTH, ge=1, le=MAX_CONTENT_LENGTH, description="Maximum bytes to read"),
+):
+    """
+    Get a slice of a file's text content as JSON.
+    Only `length` bytes are read from disk. A UTF-8 sequence cut by the slice end is left for the
+    next chunk, so following `next_offset` until it is null reassembles the file exactly.
+    """
+    file_path = _existing(file_name)
+
+    def read_slice():
+        with open(file_path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            file.seek(offset)
+            return size, file.read(length)
 
     try:
-        content = file_path.read_text()
-        return File(name=file_name, content=content)
+        size, data = await asyncio.to_thread(read_slice)
+        end = offset + len(data)
+        final = end >= size
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        content = decoder.decode(data, final=final)
+        # Bytes of an incomplete trailing character stay buffered in the decoder
+        pending = len(decoder.getstate()[0])
+        return FileChunk(
+            name=file_name,
+            content=content,
+            offset=offset,
+            size=size,
+            next_offset=None if final else end - pending,
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error reading file: {str(e)}"
+        ) from e
+
+
+@router.get("/{file_name:path}")
+async def get_file(
+    request: Request,
+    file_name: str = PathParam(...),
+    as_download: bool = Query(False, description="Set to true to download the file instead of viewing it")
+):
+    """
+    Get a specific file by name.
+    The file is streamed from disk; `Range` requests get 206 partial content and
+    `If-None-Match` / `If-Modified-Since` revalidation gets 304 when the file is unchanged.
+    """
+    file_path = _existing(file_name)
+    stat = file_path.stat()
+
+    if _not_modified(request, stat):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"etag": f'"{_etag(stat)}"', "last-modified": formatdate(stat.st_mtime, usegmt=True)},
         )
 
+    # FileResponse streams in chunks and handles Range / If-Range itself
+    return FileResponse(
+        path=file_path,
+        filename=file_name if as_download else None,
+        media_type="application/octet-stream" if as_download else None,
+        stat_result=stat,
+    )
+
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_file(file: File):
     """
     Create a new file or update an existing file.
+    For large files use `PUT /files/{file_name}` or `POST /files/upload`, which stream to disk.
     """
-    file_path = DATA_DIR / file.name
+    file_path = _resolve(file.name)
 
-    # Check if file contains invalid characters or paths
     try:
-        # Ensure the file path is within the DATA_DIR
-        if not file_path.resolve().is_relative_to(DATA_DIR.resolve()):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid file name - path traversal detected"
-            )
-    except (ValueError, RuntimeError):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid file name"
-        )
-
-    try:
-        # Write content to file
-        file_path.write_text(file.content)
+        sha = await asyncio.to_thread(blob_store.put, file.content.encode())
+        await asyncio.to_thread(_store_file, file_path, sha)
         return JSONResponse(
             status_code=status.HTTP_201_CREATED,
             content={"message": f"File '{file.name}' created successfully"}
@@ -129,27 +272,64 @@ async def create_file(file: File):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating file: {str(e)}"
-        )
+        ) from e
+
+
+@router.put("/{file_name:path}", status_code=status.HTTP_201_CREATED)
+async def upload_file_body(request: Request, file_name: str = PathParam(...)):
+    """
+    Create or replace a file from the raw request body, streamed to disk in chunks.
+    """
+    file_path = _resolve(file_name)
+    try:
+        size = await _write_stream(file_path, request.stream())
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error writing file: {str(e)}"
+        ) from e
+    return {"message": f"File '{file_name}' uploaded successfully", "size": size}
 
 
-@router.delete("/{file_name}", status_code=status.HTTP_204_NO_CONTENT)
+@router.post("/upload", status_code=status.HTTP_201_CREATED)
+async def upload_files(files: List[UploadFile]):
+    """
+    Create or replace files from a multipart/form-data upload, copied to disk in chunks.
+    """
+    uploaded = []
+    for upload in files:
+        file_name = upload.filename or ""
+        file_path = _resolve(file_name)
+
+        async def chunks(upload: UploadFile = upload):
+            while chunk := await upload.read(CHUNK_SIZE):
+                yield chunk
+
+        try:
+            size = await _write_stream(file_path, chunks())
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error writing file '{file_name}': {str(e)}"
+            ) from e
+        finally:
+            await upload.close()
+        uploaded.append({"name": file_name, "size": size})
+    return {"files": uploaded}
+
+
+@router.delete("/{file_name:path}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_file(file_name: str = PathParam(...)):
     """
     Delete a file by name.
     """
-    file_path = DATA_DIR / file_name
-
-    if not file_path.exists() or not file_path.is_file():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"File '{file_name}' not found"
-        )
+    file_path = _existing(file_name)
 
     try:
-        file_path.unlink()
+        await asyncio.to_thread(_remove_file, file_path)
         return None
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error deleting file: {str(e)}"
-        )
+        ) from e
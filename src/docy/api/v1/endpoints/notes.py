@@ -1,12 +1,16 @@
+import asyncio
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
 from pydantic import BaseModel
 
 from docy.core import Settings
-from docy.services import NoteService
+from docy.services import ChromaService, NoteEntry, NoteService
+from docy.services.note_search import NoteSemanticIndex
+from docy.services.vectordb import EmbeddingModel
 
 settings = Settings()
 
@@ -27,6 +31,7 @@ class NoteCreate(BaseModel):
     metadata: Optional[NoteMetadata] = None
     folder: Optional[str] = None
     template: Optional[str] = None
+    variables: Optional[Dict[str, str]] = None
 
 
 class NoteUpdate(BaseModel):
@@ -34,6 +39,24 @@ class NoteUpdate(BaseModel):
     metadata: Optional[NoteMetadata] = None
 
 
+class NoteSection(BaseModel):
+    note_id: str
+    title: str
+    header: Optional[str] = None
+    text: str
+    score: float
+
+
+class NoteBatchUpdate(NoteUpdate):
+    note_id: str
+
+
+class NoteBatch(BaseModel):
+    create: List[NoteCreate] = []
+    update: List[NoteBatchUpdate] = []
+    durable: bool = True
+
+
 class NoteResponse(BaseModel):
     title: str
     path: str
@@ -43,22 +66,97 @@ class NoteResponse(BaseModel):
     modified: datetime
 
 
+class NoteSummary(BaseModel):
+    id: str
+    title: str
+    folder: str
+    tags: List[str] = []
+    modified: datetime
+
+    @classmethod
+    def from_entry(cls, entry: NoteEntry) -> "NoteSummary":
+        return cls(
+            id=entry.id,
+            title=entry.title,
+            folder=entry.folder,
+            tags=entry.tags,
+            modified=datetime.fromtimestamp(entry.mtime_ns / 1e9),
+        )
+
+
+class NoteEdge(BaseModel):
+    source: str
+    target: str
+
+
+class NoteGraph(BaseModel):
+    nodes: List[NoteSummary]
+    edges: List[NoteEdge]
+    unresolved: Dict[str, List[str]] = {}
+
+
+@lru_cache
 def get_note_service():
-    # You might want to make this a proper dependency injection
-    # with configuration and error handling
-    return NoteService(settings.OBSIDIAN_VAULT_DIR)
+    # Cached so every request shares the same note index
+    return NoteService(settings.OBSIDIAN_VAULT_DIR, index_refresh_interval=settings.NOTE_INDEX_REFRESH_SECONDS)
+
+
+@lru_cache
+def get_note_semantic_index():
+    embedding_model = EmbeddingModel(
+        cache_path=settings.EMBEDDING_CACHE_PATH or None,
+        backend=settings.EMBEDDING_BACKEND,
+        model_file=settings.EMBEDDING_MODEL_FILE or None,
+        quantize=settings.EMBEDDING_QUANTIZE,
+        workers=settings.EMBEDDING_WORKERS,
+        threads_per_worker=settings.EMBEDDING_WORKER_THREADS,
+    )
+    return NoteSemanticIndex(get_note_service(), ChromaService(embedding_model=embedding_model), embedding_model)
+
+
+def _create_kwargs(note: NoteCreate) -> dict:
+    return {
+        "title": note.title,
+        "content": note.content,
+        "metadata": note.metadata.model_dump(exclude_none=True) if note.metadata else None,
+        "folder": note.folder,
+        "template": note.template,
+        "variables": note.variables,
+    }
+
+
+def _update_kwargs(note_id: str, note_update: NoteUpdate) -> dict:
+    return {
+        "note_path": note_id,
+        "content": note_update.content,
+        "metadata": note_update.metadata.model_dump(exclude_none=True) if note_update.metadata else None,
+    }
+
 
+async def _resolve_note_or_404(obsidian_service: NoteService, note_ref: str) -> str:
+    note_id = await asyncio.to_thread(obsidian_service.resolve_note, note_ref)
+    if note_id is None:
+        raise HTTPException(status_code=404, detail="Note not found")
+    return note_id
 
-@router.get("/", response_model=List[NoteResponse])
+
+@router.get("/", response_model=List[NoteSummary])
 async def get_all_notes(
+    response: Response,
     obsidian_service: NoteService = Depends(get_note_service),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    sort: Literal["title", "mtime", "folder"] = Query("title"),
+    descending: bool = Query(False),
 ):
-    """Get all notes with pagination"""
+    """Get note summaries with pagination, served from the note index. The total is sent in X-Total-Count."""
     try:
-        notes = obsidian_service.get_all_notes()
-        return notes[offset : offset + limit]
+        # The index may rescan the vault first; keep that off the event loop
+        total, entries = await asyncio.to_thread(
+            obsidian_service.list_notes, sort=sort, descending=descending, offset=offset, limit=limit
+        )
+        response.headers["X-Total-Count"] = str(total)
+        return [NoteSummary.from_entry(entry) for entry in entries]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
@@ -69,7 +167,7 @@ async def get_recent_notes(
 ):
     """Get recent notes"""
     try:
-        return obsidian_service.get_recent_notes(limit)
+        return await asyncio.to_thread(obsidian_service.get_recent_notes, limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
@@ -85,6 +183,57 @@ async def search_notes(
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+@router.get("/semantic-search", response_model=List[NoteSection])
+def semantic_search_notes(
+    query: str = Query(..., min_length=1),
+    k: int = Query(5, ge=1, le=50),
+    semantic_index: NoteSemanticIndex = Depends(get_note_semantic_index),
+):
+    """Search note sections by meaning. Plain `def` so embedding runs in the threadpool, not on the event loop"""
+    try:
+        return semantic_index.search(query, k)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.post("/semantic-index", response_model=Dict[str, int])
+def sync_semantic_index(semantic_index: NoteSemanticIndex = Depends(get_note_semantic_index)):
+    """Embed new and changed note sections and drop deleted ones"""
+    try:
+        return semantic_index.sync()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.get("/graph", response_model=NoteGraph)
+async def get_note_graph(
+    note: str = Query(..., min_length=1, description="Path, file name or title of the center note"),
+    depth: int = Query(1, ge=0, le=5),
+    obsidian_service: NoteService = Depends(get_note_service),
+):
+    """Get the link neighborhood of a note up to `depth` hops"""
+    note_id = await _resolve_note_or_404(obsidian_service, note)
+    try:
+        graph = await asyncio.to_thread(obsidian_service.get_graph, note_id, depth)
+        return NoteGraph(
+            nodes=[NoteSummary.from_entry(entry) for entry in graph["nodes"]],
+            edges=graph["edges"],
+            unresolved=graph["unresolved"],
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.get("/tags/{tag}", response_model=List[NoteSummary])
+async def get_notes_by_tag(tag: str, obsidian_service: NoteService = Depends(get_note_service)):
+    """Get all notes with a tag"""
+    try:
+        entries = await asyncio.to_thread(obsidian_service.get_notes_by_tag, tag)
+        return [NoteSummary.from_entry(entry) for entry in entries]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
 @router.get("/{note_id}", response_model=NoteResponse)
 async def get_note(
     note_id: str = Path(..., description="The note identifier or path"),
@@ -104,14 +253,27 @@ async def get_note(
 async def create_note(note: NoteCreate, obsidian_service: NoteService = Depends(get_note_service)):
     """Create a new note"""
     try:
-        created_note = obsidian_service.create_note(
-            title=note.title,
-            content=note.content,
-            metadata=note.metadata.dict() if note.metadata else None,
-            folder=note.folder,
-            template=note.template,
+        notes = await asyncio.to_thread(obsidian_service.write_notes, creates=[_create_kwargs(note)])
+        return notes[0]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.post("/batch", response_model=List[NoteResponse], status_code=201)
+async def write_notes(batch: NoteBatch, obsidian_service: NoteService = Depends(get_note_service)):
+    """Create and update many notes in one atomic, journaled batch"""
+    try:
+        # Journaled, fsynced writes; keep them off the event loop like the index reads
+        return await asyncio.to_thread(
+            obsidian_service.write_notes,
+            creates=[_create_kwargs(note) for note in batch.create],
+            updates=[_update_kwargs(note.note_id, note) for note in batch.update],
+            durable=batch.durable,
         )
-        return obsidian_service.read_note(created_note)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
@@ -120,12 +282,10 @@ async def create_note(note: NoteCreate, obsidian_service: NoteService = Depends(
 async def update_note(note_id: str, note_update: NoteUpdate, obsidian_service: NoteService = Depends(get_note_service)):
     """Update an existing note"""
     try:
-        success = obsidian_service.update_note(
-            note_id, content=note_update.content, metadata=note_update.metadata.dict() if note_update.metadata else None
-        )
-        if not success:
-            raise HTTPException(status_code=404, detail="Note not found")
-        return obsidian_service.read_note(note_id)
+        notes = await asyncio.to_thread(obsidian_service.write_notes, updates=[_update_kwargs(note_id, note_update)])
+        return notes[0]
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail="Note not found") from e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
@@ -152,3 +312,14 @@ async def get_note_tags(note_id: str, obsidian_service: NoteService = Depends(ge
         return obsidian_service.get_tags(note["content"])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.get("/{note_id}/backlinks", response_model=List[NoteSummary])
+async def get_note_backlinks(note_id: str, obsidian_service: NoteService = Depends(get_note_service)):
+    """Get all notes linking to a specific note"""
+    resolved_id = await _resolve_note_or_404(obsidian_service, note_id)
+    try:
+        entries = await asyncio.to_thread(obsidian_service.get_backlinks, resolved_id)
+        return [NoteSummary.from_entry(entry) for entry in entries]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
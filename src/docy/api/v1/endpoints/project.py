@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio.session import AsyncSession
 
 from docy.db import get_session
 from docy.repositories import ProjectRepository
+from docy.repositories.project import ARTIFACT_SUMMARIES
 from docy.schemas import ProjectIn, ProjectOut, ProjectUpdate
 
 router = APIRouter(prefix="/projects", tags=["projects"])
@@ -16,12 +17,12 @@ def get_project_repo(session: AsyncSession = Depends(get_session)) -> ProjectRep
 
 @router.get("/", response_model=List[ProjectOut])
 async def get_projects(project_repo: ProjectRepository = Depends(get_project_repo)):
-    return await project_repo.get_multi()
+    return await project_repo.get_multi(load_options=[ARTIFACT_SUMMARIES])
 
 
 @router.get("/{project_id}", response_model=ProjectOut)
 async def get_project(project_id: int = Path(...), project_repo: ProjectRepository = Depends(get_project_repo)):
-    return await project_repo.get(project_id)
+    return await project_repo.get(project_id, load_options=[ARTIFACT_SUMMARIES])
 
 
 @router.post("/")
@@ -0,0 +1,94 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel, Field
+
+from docy.core import Settings
+from docy.db.session import async_session_local
+from docy.services import HybridRetriever
+from docy.services.vectordb import EmbeddingModel
+
+settings = Settings()
+
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+class SearchHit(BaseModel):
+    id: int
+    name: str
+    content: str
+    metadata: Dict[str, Any]
+    score: float
+    ranks: Dict[str, int]
+
+
+class SearchResponse(BaseModel):
+    results: List[SearchHit]
+    partial: bool
+    timings_ms: Dict[str, float]
+
+
+class IndexDocument(BaseModel):
+    name: str = Field(description="Document name; previously indexed chunks with this name are replaced")
+    content: str = Field(description="Markdown source")
+    source: Literal["note", "artifact", "github"]
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+
+
+@lru_cache
+def get_retriever() -> HybridRetriever:
+    embedding_model = EmbeddingModel(
+        cache_path=settings.EMBEDDING_CACHE_PATH or None,
+        backend=settings.EMBEDDING_BACKEND,
+        model_file=settings.EMBEDDING_MODEL_FILE or None,
+        quantize=settings.EMBEDDING_QUANTIZE,
+        workers=settings.EMBEDDING_WORKERS,
+        threads_per_worker=settings.EMBEDDING_WORKER_THREADS,
+    )
+    return HybridRetriever(
+        async_session_local,
+        embedding_model,
+        rrf_k=settings.SEARCH_RRF_K,
+        lexical_weight=settings.SEARCH_LEXICAL_WEIGHT,
+        vector_weight=settings.SEARCH_VECTOR_WEIGHT,
+        budget_ms=settings.SEARCH_BUDGET_MS,
+    )
+
+
+@router.get("/", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1),
+    k: int = Query(10, ge=1, le=100),
+    source: Optional[Literal["note", "artifact", "github"]] = None,
+    lexical_weight: Optional[float] = Query(None, ge=0),
+    vector_weight: Optional[float] = Query(None, ge=0),
+    budget_ms: Optional[float] = Query(None, gt=0, le=10000),
+    ef_search: int = Query(settings.SEARCH_EF_SEARCH, ge=1, le=1000),
+    retriever: HybridRetriever = Depends(get_retriever),
+):
+    """Hybrid full-text + vector search over indexed notes, artifacts and GitHub docs."""
+    result = await retriever.search(
+        q,
+        k=k,
+        filters={"source": source} if source else None,
+        lexical_weight=lexical_weight,
+        vector_weight=vector_weight,
+        budget_ms=budget_ms,
+        ef_search=ef_search,
+    )
+    return SearchResponse(
+        results=[SearchHit(**hit.__dict__) for hit in result.hits],
+        partial=result.partial,
+        timings_ms=result.timings_ms,
+    )
+
+
+@router.post("/documents")
+async def index_document(document: IndexDocument, retriever: HybridRetriever = Depends(get_retriever)):
+    """Chunk, embed and store one markdown document for search."""
+    chunks = await retriever.index_markdown(
+        document.name, document.content, {**document.metadata, "source": document.source}
+    )
+    return {"name": document.name, "chunks": chunks}
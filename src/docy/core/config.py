@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -6,8 +8,12 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
     GITHUB_ACCESS_TOKEN: str = Field(default="")
+    GITHUB_API_URL: str = Field(default="https://api.github.com")
+    GITHUB_MAX_CONCURRENCY: int = Field(default=16)
+    GITHUB_CACHE_PATH: str = Field(default="")
     GROQ_API_KEY: str = Field(default="")
     OBSIDIAN_VAULT_DIR: str = Field(default="")
+    NOTE_INDEX_REFRESH_SECONDS: float = Field(default=30.0)
     GEMINI_API_KEY: str = Field(default="")
     GOOGLE_API_KEY: str = Field(default="")
 
@@ -19,3 +25,26 @@ class Settings(BaseSettings):
 
     TEST_DB_NAME: str = Field(default="")
     DOCY_DATA_DIR: str = Field(default="")
+    # Content-addressed store behind files and artifacts; defaults to DOCY_DATA_DIR/.blobs so named files can hard-link
+    BLOB_STORE_DIR: str = Field(default="")
+    BLOB_STORE_COMPRESS: bool = Field(default=False)
+    # Seconds between collections of unreferenced blobs by the API process; 0 disables them
+    BLOB_STORE_GC_INTERVAL: float = Field(default=3600.0)
+    # Unreferenced blobs younger than this are kept, covering writes whose reference is not committed yet
+    BLOB_STORE_GC_GRACE: float = Field(default=3600.0)
+    # Every Nth artifact revision is stored in full, bounding how many deltas a read replays
+    ARTIFACT_SNAPSHOT_INTERVAL: int = Field(default=10)
+    # Ingestion checkpoints; defaults to ~/.local/state/docy so nothing is written into the ingested tree
+    INGEST_STATE_DIR: str = Field(default="")
+    EMBEDDING_CACHE_PATH: str = Field(default="")
+    EMBEDDING_BACKEND: Literal["torch", "onnx", "openvino"] = Field(default="torch")
+    EMBEDDING_MODEL_FILE: str = Field(default="")
+    EMBEDDING_QUANTIZE: bool = Field(default=False)
+    EMBEDDING_WORKERS: int = Field(default=0)
+    EMBEDDING_WORKER_THREADS: int = Field(default=1)
+
+    SEARCH_RRF_K: int = Field(default=60)
+    SEARCH_LEXICAL_WEIGHT: float = Field(default=1.0)
+    SEARCH_VECTOR_WEIGHT: float = Field(default=1.0)
+    SEARCH_BUDGET_MS: float = Field(default=500.0)
+    SEARCH_EF_SEARCH: int = Field(default=40)
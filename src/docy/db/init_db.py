@@ -1,3 +1,4 @@
+from sqlalchemy import text
 from sqlmodel import SQLModel
 
 from .engine import engine
@@ -5,4 +6,6 @@ from .engine import engine
 
 async def create_db_and_tables():
     async with engine.begin() as conn:
+        # The document table's vector column and HNSW index need the pgvector extension
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
         await conn.run_sync(SQLModel.metadata.create_all)
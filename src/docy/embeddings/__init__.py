@@ -0,0 +1,11 @@
+from .cache import EmbeddingCache, normalize_text
+from .loader import Backend, LazyModel
+from .pool import EmbeddingPool
+
+__all__ = [
+    "EmbeddingCache",
+    "normalize_text",
+    "Backend",
+    "LazyModel",
+    "EmbeddingPool",
+]
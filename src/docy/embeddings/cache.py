@@ -0,0 +1,129 @@
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+
+EncodeFn = Callable[[List[str]], np.ndarray]
+
+
+def normalize_text(text: str) -> str:
+    """Normalization applied before hashing: NFC and collapsed whitespace, which the tokenizer ignores anyway."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache:
+    """
+    Embedding cache keyed by (model name, model variant, normalized text hash).
+
+    The variant (backend, quantization, exported model file; see `LazyModel.variant`) keeps an
+    fp32 model and its quantized or ONNX versions from reading each other's vectors.
+
+    An in-memory LRU sits in front of an optional SQLite store, so hot texts cost a dict lookup
+    and everything ever embedded survives restarts. Only cache misses reach the model.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        path: Optional[Union[str, Path]] = None,
+        max_memory_items: int = 10_000,
+        variant: str = "",
+    ):
+        self.model_name = model_name
+        self.variant = variant
+        self.max_memory_items = max_memory_items
+        self._memory: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.stats: Dict[str, int] = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, dtype TEXT, vector BLOB) WITHOUT ROWID"
+            )
+
+    def key(self, text: str) -> bytes:
+        # The plain model keeps the variant-less key, so existing caches stay valid
+        namespace = f"{self.model_name}\0{self.variant}" if self.variant else self.model_name
+        return hashlib.sha256(f"{namespace}\0{normalize_text(text)}".encode("utf-8")).digest()
+
+    def encode(self, texts: List[str], encode: EncodeFn) -> np.ndarray:
+        """
+        Return embeddings for `texts`, calling `encode` once with the unique cache misses only.
+        """
+        keys = [self.key(text) for text in texts]
+        found = self._get_many(keys)
+
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts, strict=True):
+            if key not in found and key not in missing:
+                missing[key] = text
+        if missing:
+            vectors = np.asarray(encode(list(missing.values())))
+            computed = dict(zip(missing.keys(), vectors, strict=True))
+            self._put_many(computed)
+            found.update(computed)
+
+        return np.stack([found[key] for key in keys]) if keys else np.empty((0, 0), dtype=np.float32)
+
+    def hit_rate(self) -> float:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    def metrics(self) -> Dict[str, Union[int, float]]:
+        return {**self.stats, "memory_items": len(self._memory), "hit_rate": round(self.hit_rate(), 4)}
+
+    def _get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        found: Dict[bytes, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+                    self.stats["memory_hits"] += 1
+
+            lookup = list({key for key in keys if key not in found})
+            if self._db is not None and lookup:
+                # Stay well below SQLite's bound-parameter limit
+                for start in range(0, len(lookup), 500):
+                    chunk = lookup[start : start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = self._db.execute(
+                        f"SELECT key, dtype, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                    ).fetchall()
+                    for key, dtype, blob in rows:
+                        vector = np.frombuffer(blob, dtype=dtype)
+                        found[key] = vector
+                        self._remember(key, vector)
+                        self.stats["disk_hits"] += 1
+
+            self.stats["misses"] += sum(1 for key in keys if key not in found)
+        return found
+
+    def _put_many(self, vectors: Dict[bytes, np.ndarray]) -> None:
+        with self._lock:
+            for key, vector in vectors.items():
+                self._remember(key, vector)
+            if self._db is not None:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, dtype, vector) VALUES (?, ?, ?)",
+                        [(key, vector.dtype.str, vector.tobytes()) for key, vector in vectors.items()],
+                    )
+
+    def _remember(self, key: bytes, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
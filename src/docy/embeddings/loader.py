@@ -0,0 +1,91 @@
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Literal, Optional
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+Backend = Literal["torch", "onnx", "openvino"]
+
+
+class LazyModel:
+    """
+    Builds a SentenceTransformer on first use instead of at import.
+
+    `sentence_transformers` itself is only imported then, so processes that never embed pay
+    nothing. Construction is guarded by a lock so concurrent first callers load the model once.
+
+    Args:
+        model_name: Hugging Face model id
+        backend: "torch" (default), or "onnx" / "openvino" for the exported variants
+        model_file: File inside the model repo to load for onnx/openvino, e.g. "onnx/model_qint8_avx512.onnx"
+        quantize: For the torch backend, apply dynamic int8 quantization to the Linear layers
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        backend: Backend = "torch",
+        model_file: Optional[str] = None,
+        quantize: bool = False,
+    ):
+        self.model_name = model_name
+        self.backend = backend
+        self.model_file = model_file
+        self.quantize = quantize
+        self._model: Optional["SentenceTransformer"] = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Ship only the configuration to worker processes; they load their own copy
+        state = self.__dict__.copy()
+        state["_model"] = None
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def variant(self) -> str:
+        """
+        Which weights this loads beyond the model name; "" for the plain torch model.
+
+        Quantized and exported variants produce (slightly) different vectors, so caches key on it.
+        """
+        if self.backend != "torch":
+            return f"{self.backend}:{self.model_file or 'default'}"
+        return "torch-qint8" if self.quantize else ""
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def get(self) -> "SentenceTransformer":
+        model = self._model
+        if model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load()
+                model = self._model
+        return model
+
+    def warm_up(self) -> None:
+        """Load the model and run one encode so the first real request doesn't pay for kernel setup."""
+        self.get().encode(["warm-up"], convert_to_numpy=True)
+
+    def _load(self) -> "SentenceTransformer":
+        from sentence_transformers import SentenceTransformer
+
+        kwargs: Dict[str, Any] = {}
+        if self.backend != "torch":
+            kwargs["backend"] = self.backend
+            if self.model_file:
+                kwargs["model_kwargs"] = {"file_name": self.model_file}
+        model = SentenceTransformer(self.model_name, **kwargs)
+
+        if self.quantize and self.backend == "torch":
+            import torch
+
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model
@@ -0,0 +1,246 @@
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# How often blocked calls wake up to check that the worker processes are still alive
+POLL_INTERVAL = 1.0
+
+
+def _worker_main(model: Any, threads: int, batch_size: int, tasks: Any, results: Any) -> None:
+    """
+    Worker process loop.
+
+    Loads its own copy of the model, then encodes chunks from `tasks` and writes the vectors
+    straight into the caller's shared memory block; only a small status tuple is sent back.
+    """
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    try:
+        encoder = model.get()
+        dim = encoder.get_sentence_embedding_dimension()
+    except Exception as e:
+        results.put(("error", f"{type(e).__name__}: {e}"))
+        return
+    results.put(("ready", dim))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        job_id, shm_name, start, texts = task
+        try:
+            vectors = encoder.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+            shm = shared_memory.SharedMemory(name=shm_name)
+            try:
+                out = np.ndarray((start + len(texts), vectors.shape[1]), dtype=np.float32, buffer=shm.buf)
+                out[start:] = vectors
+                del out
+            finally:
+                shm.close()
+            results.put((job_id, None))
+        except Exception as e:
+            results.put((job_id, f"{type(e).__name__}: {e}"))
+
+
+class EmbeddingPool:
+    """
+    Runs K model processes that share one task queue.
+
+    Each `encode` call allocates a shared memory block for its output, splits the texts into
+    chunks and lets idle workers pull them, so a many-core box is kept busy without the GIL or
+    pickling result lists. Safe to call from several threads at once.
+
+    Args:
+        model: Picklable model handle with a `get()` method, e.g. `LazyModel`
+        workers: Number of worker processes
+        threads_per_worker: Intra-op threads per worker (torch/BLAS)
+        chunk_size: Texts per task; smaller chunks balance better, larger ones batch better
+        start_timeout: Seconds to wait for every worker to load its model
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        workers: int,
+        threads_per_worker: int = 1,
+        chunk_size: int = 64,
+        start_timeout: float = 600.0,
+    ):
+        self.model = model
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.chunk_size = chunk_size
+        self.start_timeout = start_timeout
+        self.dim: Optional[int] = None
+
+        self._context = mp.get_context("spawn")
+        self._tasks: Any = None
+        self._results: Any = None
+        self._processes: List[Any] = []
+        self._dispatcher: Optional[threading.Thread] = None
+        self._job_ids = itertools.count()
+        self._jobs: Dict[int, Dict[str, Any]] = {}
+        self._jobs_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.dim is not None
+
+    def start(self) -> None:
+        """Spawn the workers and wait until every one has loaded its model."""
+        with self._start_lock:
+            if self.ready:
+                return
+            # Leftovers of a pool whose worker died
+            self._terminate()
+            self._tasks = self._context.Queue()
+            self._results = self._context.Queue()
+            for _ in range(self.workers):
+                process = self._context.Process(
+                    target=_worker_main,
+                    args=(self.model, self.threads_per_worker, self.chunk_size, self._tasks, self._results),
+                    daemon=True,
+                )
+                process.start()
+                self._processes.append(process)
+
+            try:
+                dim = self._wait_ready()
+            except Exception:
+                self._terminate()
+                raise
+            self.dim = dim
+
+            self._dispatcher = threading.Thread(target=self._dispatch, name="embedding-pool", daemon=True)
+            self._dispatcher.start()
+
+    def _wait_ready(self) -> int:
+        deadline = time.monotonic() + self.start_timeout
+        dim = 0
+        ready = 0
+        while ready < self.workers:
+            try:
+                status, value = self._results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                exitcode = self._dead_worker()
+                if exitcode is not None:
+                    raise RuntimeError(f"Embedding worker exited during startup (exit code {exitcode})") from None
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Embedding workers not ready after {self.start_timeout}s") from None
+                continue
+            if status != "ready":
+                raise RuntimeError(f"Embedding worker failed to start: {value}")
+            dim = value
+            ready += 1
+        return dim
+
+    def _dead_worker(self) -> Optional[int]:
+        """Exit code of the first worker process that is no longer running, if any."""
+        for process in self._processes:
+            if not process.is_alive():
+                return process.exitcode
+        return None
+
+    def _terminate(self) -> None:
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+            process.join(timeout=10)
+        self._processes.clear()
+
+    def _fail_jobs(self, error: str) -> None:
+        with self._jobs_lock:
+            jobs = list(self._jobs.values())
+            self._jobs.clear()
+        for job in jobs:
+            job["errors"].append(error)
+            job["done"].set()
+
+    def close(self) -> None:
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=10)
+        self._terminate()
+        if self._results is not None:
+            self._results.put(None)
+        self.dim = None
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if not self.ready:
+            self.start()
+        # Read once: the dispatcher resets `dim` when a worker dies
+        dim = self.dim
+        if dim is None:
+            raise RuntimeError("Embedding pool is not running")
+        if not texts:
+            return np.empty((0, dim), dtype=np.float32)
+
+        shm = shared_memory.SharedMemory(create=True, size=len(texts) * dim * 4)
+        try:
+            chunks = range(0, len(texts), self.chunk_size)
+            job_id = next(self._job_ids)
+            job = {"remaining": len(chunks), "errors": [], "done": threading.Event()}
+            with self._jobs_lock:
+                self._jobs[job_id] = job
+            for start in chunks:
+                self._tasks.put((job_id, shm.name, start, texts[start : start + self.chunk_size]))
+
+            dispatcher = self._dispatcher
+            while not job["done"].wait(timeout=POLL_INTERVAL):
+                if dispatcher is None or not dispatcher.is_alive():
+                    # The dispatcher gave up on a dead worker before this job was registered
+                    with self._jobs_lock:
+                        self._jobs.pop(job_id, None)
+                    raise RuntimeError("Embedding pool stopped before the job finished")
+            if job["errors"]:
+                raise RuntimeError(f"Embedding worker error: {job['errors'][0]}")
+            return np.ndarray((len(texts), dim), dtype=np.float32, buffer=shm.buf).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def _dispatch(self) -> None:
+        while True:
+            try:
+                message = self._results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                exitcode = self._dead_worker()
+                if exitcode is not None:
+                    # Its chunk will never be reported; fail everything in flight and let the
+                    # next encode() start a fresh pool
+                    self.dim = None
+                    self._fail_jobs(f"worker process exited with code {exitcode}")
+                    return
+                continue
+            except (EOFError, OSError):
+                self._fail_jobs("result queue closed")
+                return
+            if message is None:
+                return
+            job_id, error = message
+            with self._jobs_lock:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                if error:
+                    job["errors"].append(error)
+                job["remaining"] -= 1
+                if job["remaining"] == 0:
+                    del self._jobs[job_id]
+                    job["done"].set()
@@ -0,0 +1,131 @@
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+from rich import print as rprint
+from rich.console import Console
+from rich.table import Table
+
+from docy.core import Settings
+from docy.services.chroma_service import ChromaService
+from docy.services.github_service import GithubService
+from docy.services.ingestion import (
+    ChromaSink,
+    DocumentTableSink,
+    IngestionCheckpoint,
+    IngestionPipeline,
+    github_source,
+    local_directory_source,
+)
+from docy.services.vectordb import EmbeddingModel
+
+settings = Settings()
+
+app = typer.Typer(
+    help="Ingest documentation into the vector store: fetch -> chunk -> embed -> store.",
+    context_settings={"help_option_names": ["-h", "--help"]},
+    no_args_is_help=True,
+)
+console = Console()
+
+STORE_HELP = "Where to store chunks: 'chroma' (collection) or 'pgvector' (document table, used by /search)."
+
+
+def _embedding_model() -> EmbeddingModel:
+    return EmbeddingModel(
+        cache_path=settings.EMBEDDING_CACHE_PATH or None,
+        backend=settings.EMBEDDING_BACKEND,
+        model_file=settings.EMBEDDING_MODEL_FILE or None,
+        quantize=settings.EMBEDDING_QUANTIZE,
+        workers=settings.EMBEDDING_WORKERS,
+        threads_per_worker=settings.EMBEDDING_WORKER_THREADS,
+    )
+
+
+def _default_checkpoint(name: str) -> Path:
+    """Checkpoint path in the state directory, outside of any source being ingested."""
+    state_dir = Path(settings.INGEST_STATE_DIR).expanduser() if settings.INGEST_STATE_DIR else None
+    return (state_dir or Path.home() / ".local" / "state" / "docy") / f"{name}.json"
+
+
+def _pipeline(store: str, collection: str, checkpoint: Path, batch_size: int) -> IngestionPipeline:
+    embedding_model = _embedding_model()
+    if store == "pgvector":
+        from docy.db.session import async_session_local
+
+        sink = DocumentTableSink(async_session_local)
+    elif store == "chroma":
+        sink = ChromaSink(ChromaService(embedding_model=embedding_model), collection)
+    else:
+        rprint(f"[bold red]Error:[/bold red] Unknown store '{store}'.")
+        raise typer.Exit(code=1)
+    return IngestionPipeline(sink, embedding_model, checkpoint=IngestionCheckpoint(checkpoint), batch_size=batch_size)
+
+
+def _print_report(report: dict) -> None:
+    rprint(
+        f"[bold green]Done[/bold green] in {report['elapsed']}s: {report['seen']} documents seen, "
+        f"{report['stored']} stored ({report['chunks']} chunks), {report['skipped']} unchanged, "
+        f"{report['pruned']} pruned"
+    )
+    table = Table(title="Stage throughput")
+    table.add_column("Stage", style="cyan")
+    table.add_column("Items", justify="right")
+    table.add_column("Busy (s)", justify="right")
+    table.add_column("Items/s", justify="right")
+    for stage, values in report["stages"].items():
+        table.add_row(stage, str(values["items"]), f"{values['busy']:.2f}", f"{values['per_second']:.1f}")
+    console.print(table)
+
+
+@app.command()
+def local(
+    path: Path = typer.Argument(..., exists=True, file_okay=False, help="Directory of documentation files."),
+    store: str = typer.Option("chroma", "--store", "-s", help=STORE_HELP),
+    collection: str = typer.Option("docs", "--collection", "-c", help="Chroma collection name."),
+    checkpoint: Optional[Path] = typer.Option(None, "--checkpoint", help="Checkpoint file for resuming."),
+    batch_size: int = typer.Option(64, "--batch-size", "-b", help="Chunks per embedding call."),
+    prune: bool = typer.Option(False, "--prune", help="Delete stored documents that no longer exist."),
+):
+    """
+    Ingests the documentation files of a local directory.
+    """
+    resolved = path.resolve()
+    # Named after the directory and a digest of its full path, so different sources never share one
+    digest = hashlib.sha256(str(resolved).encode("utf-8")).hexdigest()[:12]
+    checkpoint = checkpoint or _default_checkpoint(f"ingest-{store}-{collection}-{resolved.name}-{digest}")
+    pipeline = _pipeline(store, collection, checkpoint, batch_size)
+    report = asyncio.run(pipeline.run(local_directory_source(path), prune=prune))
+    _print_report(report)
+
+
+@app.command()
+def github(
+    repo: str = typer.Argument(..., help="'owner/name', or the path of a local git repository."),
+    docs_paths: List[str] = typer.Option(["docs"], "--docs-path", "-d", help="Docs directories to include."),
+    ref: str = typer.Option("HEAD", "--ref", "-r", help="Branch, tag or commit."),
+    mode: str = typer.Option("api", "--mode", "-m", help="Fetch mode: 'api', 'tarball' or 'clone'."),
+    store: str = typer.Option("chroma", "--store", "-s", help=STORE_HELP),
+    collection: str = typer.Option("docs", "--collection", "-c", help="Chroma collection name."),
+    checkpoint: Optional[Path] = typer.Option(None, "--checkpoint", help="Checkpoint file for resuming."),
+    batch_size: int = typer.Option(64, "--batch-size", "-b", help="Chunks per embedding call."),
+    prune: bool = typer.Option(False, "--prune", help="Delete stored documents that no longer exist."),
+):
+    """
+    Ingests the README and docs of a GitHub repository.
+    """
+    if mode not in ("api", "tarball", "clone"):
+        rprint(f"[bold red]Error:[/bold red] Unknown mode '{mode}'.")
+        raise typer.Exit(code=1)
+    safe_name = repo.strip("/").replace("/", "__")
+    checkpoint = checkpoint or _default_checkpoint(f"ingest-{store}-{collection}-{safe_name}")
+    pipeline = _pipeline(store, collection, checkpoint, batch_size)
+    source = github_source(GithubService(), repo, docs_paths, ref, mode)  # type: ignore[arg-type]
+    report = asyncio.run(pipeline.run(source, prune=prune))
+    _print_report(report)
+
+
+if __name__ == "__main__":
+    app()
@@ -1,3 +1,4 @@
+import asyncio
 import datetime
 from contextlib import asynccontextmanager
 
@@ -10,12 +11,16 @@ from load_dotenv import load_dotenv
 from pydantic_ai import Agent
 
 from .api.v1 import api_v1_router
+from .core import Settings
 from .db import create_db_and_tables, engine
+from .storage import get_blob_store
 
 # from .mcp_server import mcp
 
 load_dotenv()
 
+settings = Settings()
+
 # Configure logfire
 logfire.configure()
 logfire.instrument_sqlalchemy(engine)
@@ -24,12 +29,30 @@ Agent.instrument_all()
 origins = ["http://localhost", "http://localhost:4321", "http://localhost:8000", "localhost:5173"]
 
 
+async def collect_blobs(interval: float, grace: float):
+    """Periodically delete blobs no file, artifact or version references anymore."""
+    blob_store = get_blob_store()
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed, freed = await asyncio.to_thread(blob_store.gc, grace)
+            if removed:
+                logfire.info(f"Blob store GC removed {removed} blobs, {freed} bytes")
+        except Exception as e:
+            logfire.error(f"Blob store GC failed: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logfire.info("Creating database tables...")
     await create_db_and_tables()
+    gc_task = None
+    if settings.BLOB_STORE_GC_INTERVAL > 0:
+        gc_task = asyncio.create_task(collect_blobs(settings.BLOB_STORE_GC_INTERVAL, settings.BLOB_STORE_GC_GRACE))
     yield
     logfire.info("Shutting down...")
+    if gc_task is not None:
+        gc_task.cancel()
 
 
 templates = Jinja2Templates(directory="templates")
@@ -1,5 +1,5 @@
 from .agent import Agent, AgentLLM, AgentState, AgentType
-from .artifact import Artifact, ArtifactType
+from .artifact import Artifact, ArtifactType, ArtifactVersion
 from .base import Base
 from .chat import Chat
 from .project import Project, ProjectMetadata, ProjectType
@@ -19,6 +19,7 @@ __all__ = [
     "ProjectMetadata",
     "Artifact",
     "ArtifactType",
+    "ArtifactVersion",
     "Agent",
     "AgentLLM",
     "AgentState",
@@ -1,9 +1,12 @@
+import datetime
 from enum import Enum
 from typing import TYPE_CHECKING, Optional
 
+from sqlalchemy import DateTime, LargeBinary, UniqueConstraint
 from sqlmodel import Column, Field, Relationship, Text
 
 from .base import Base
+from .chat import now_utc_aware
 
 if TYPE_CHECKING:
     # from .chat import Message
@@ -21,11 +24,37 @@ class Artifact(Base, table=True):
 
     name: str = Field(index=True)
     description: str = Field(sa_column=Column(Text))
-    content: str = Field(sa_column=Column(Text))
+    # Body lives in the content-addressed blob store; `content` only holds rows written before it
+    content: Optional[str] = Field(default=None, sa_column=Column(Text, nullable=True))
+    content_sha: Optional[str] = Field(default=None, max_length=64, index=True)
     validated: bool = Field(default=False, index=True)
     artifact_type: ArtifactType = Field(default=ArtifactType.DEFAULT, index=True)
 
     # Relationships
     project_id: int = Field(foreign_key="projects.id")
-    project: "Project" = Relationship(back_populates="artifacts", sa_relationship_kwargs=dict(lazy="selectin"))
+    # Never loaded implicitly; fetch with ARTIFACT_PROJECT where the project is returned
+    project: "Project" = Relationship(back_populates="artifacts", sa_relationship_kwargs=dict(lazy="raise"))
     # message: Optional["Message"] = Relationship(back_populates="artifact", sa_relationship_kwargs=dict(lazy="selectin"))
+
+
+class ArtifactVersion(Base, table=True):
+    """
+    One revision of an artifact body.
+
+    Snapshots reference the full body in the blob store; other revisions only keep a compressed
+    line delta against the previous revision, so a version is rebuilt from the nearest snapshot
+    at or before it.
+    """
+
+    __tablename__ = "artifact_versions"  # type: ignore
+    __table_args__ = (UniqueConstraint("artifact_id", "version", name="uq_artifact_versions_artifact_version"),)
+
+    artifact_id: int = Field(foreign_key="artifacts.id", ondelete="CASCADE", index=True)
+    version: int = Field()
+    created_at: datetime.datetime = Field(default_factory=now_utc_aware, sa_column=Column(DateTime(timezone=True)))
+
+    # SHA-256 and size of the full body of this revision
+    content_sha: str = Field(max_length=64)
+    size: int = Field()
+    is_snapshot: bool = Field(default=False)
+    delta: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary, nullable=True))
@@ -1,7 +1,7 @@
 import datetime
 from typing import List, Optional, TYPE_CHECKING
 
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column, DateTime, Index, Text, text
 from sqlmodel import Field, Relationship, SQLModel
 
 
@@ -12,16 +12,27 @@ def now_utc_aware():
     return datetime.datetime.now(datetime.timezone.utc)
 
 
+# Full-text index expression; 'simple' keeps identifiers and code tokens unstemmed
+MESSAGE_SEARCH_EXPRESSION = "to_tsvector('simple', content)"
+
+
 class MessageBase(SQLModel):
-    content: str = Field(index=True)
+    # Unindexed: a B-tree over unbounded text only slows inserts, searches use the GIN index below
+    content: str = Field(sa_column=Column(Text, nullable=False))
     created_at: datetime.datetime = Field(
         default_factory=now_utc_aware, sa_column=Column(DateTime(timezone=True))
     )
-    chat_id: int = Field(foreign_key="chats.id", index=True)
+    chat_id: int = Field(foreign_key="chats.id")
 
 
 class Message(MessageBase, table=True):
     __tablename__ = "messages" # type: ignore
+    __table_args__ = (
+        # Serves "messages of a chat in order" and keyset pagination on (created_at, id);
+        # its chat_id prefix also covers plain chat_id lookups
+        Index("ix_messages_chat_id_created_at_id", "chat_id", "created_at", "id"),
+        Index("ix_messages_content_search", text(MESSAGE_SEARCH_EXPRESSION), postgresql_using="gin"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
 
     chat: Optional["Chat"] = Relationship(back_populates="messages")
@@ -61,7 +72,9 @@ class ChatRead(ChatBase):
 
 
 class ChatReadWithMessages(ChatRead):
+    # The latest messages, oldest first; page further back with `before` on the messages endpoint
     messages: List[MessageRead] = []
+    has_more_messages: bool = False
 
 
 Chat.model_rebuild()
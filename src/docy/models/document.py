@@ -1,18 +1,45 @@
-import os
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-import numpy as np
 from pgvector.sqlalchemy import Vector
-from sentence_transformers import SentenceTransformer
+from sqlalchemy import Computed, Index, Text
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlmodel import Column, Field, SQLModel
 
 MODEL_NAME = "all-MiniLM-L6-v2"
 VECTOR_DIMENSIONS = 384
 
+# HNSW build parameters; the migration accepts overrides via `alembic -x hnsw_m=.. -x hnsw_ef_construction=..`
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 64
+
+# The 'simple' configuration skips stemming and stop words, so identifiers and error codes match verbatim;
+# paraphrases are left to the vector side of hybrid search
+SEARCH_VECTOR_EXPRESSION = "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(content, ''))"
+
 
 class Document(SQLModel, table=True):
+    __table_args__ = (
+        Index(
+            "ix_document_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": HNSW_M, "ef_construction": HNSW_EF_CONSTRUCTION},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+        # Serves the `metadata @> filter` containment checks used by filtered searches
+        Index("ix_document_metadata", "metadata", postgresql_using="gin"),
+        Index("ix_document_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
 
     name: str = Field(index=True)
+    content: str = Field(default="", sa_column=Column(Text, nullable=False, server_default=""))
+    doc_metadata: Dict[str, Any] = Field(
+        default_factory=dict, sa_column=Column("metadata", JSONB, nullable=False, server_default="{}")
+    )
 
     embedding: Optional[List[float]] = Field(default=None, sa_column=Column(Vector(VECTOR_DIMENSIONS)))
+    search_vector: Optional[str] = Field(
+        default=None, sa_column=Column(TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True))
+    )
@@ -30,7 +30,8 @@ class Project(Base, table=True):
     user_id: Optional[int] = Field(default=None, foreign_key="users.id", index=True)
     user: Optional["User"] = Relationship(back_populates="projects", sa_relationship_kwargs=dict(lazy="selectin"))
     tasks: List["Task"] = Relationship(back_populates="project", sa_relationship_kwargs=dict(lazy="selectin"))
-    artifacts: List["Artifact"] = Relationship(back_populates="project", sa_relationship_kwargs=dict(lazy="selectin"))
+    # Never loaded implicitly; listings opt in with ARTIFACT_SUMMARIES (metadata columns only)
+    artifacts: List["Artifact"] = Relationship(back_populates="project", sa_relationship_kwargs=dict(lazy="raise"))
 
 
 class ProjectMetadata(Base, table=True):
@@ -1,6 +1,7 @@
 from .agent import AgentRepository
 from .artifact import ArtifactRepository
 from .chat import ChatRepository
+from .document import DocumentRepository
 from .message import MessageRepository
 from .project import ProjectRepository
 from .prompt import PromptRepository
@@ -16,4 +17,5 @@ __all__ = [
     "PromptRepository",
     "ChatRepository",
     "MessageRepository",
+    "DocumentRepository",
 ]
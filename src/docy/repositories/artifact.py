@@ -1,12 +1,356 @@
+import asyncio
+import difflib
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import logfire
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio.session import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlmodel import func, select
 
-from ..models.artifact import Artifact
-from ..schemas.artifact import ArtifactIn, ArtifactUpdate
+from ..core import Settings
+from ..models.artifact import Artifact, ArtifactVersion
+from ..schemas.artifact import ArtifactIn, ArtifactSummary, ArtifactUpdate, ArtifactVersionOut
+from ..storage import BlobStore, apply_delta, encode_delta, get_blob_store
 from .base import BaseRepository
 
+settings = Settings()
+
+# Columns of an artifact listing; description and any inline body are never selected
+SUMMARY_COLUMNS = (
+    Artifact.id,
+    Artifact.name,
+    Artifact.validated,
+    Artifact.artifact_type,
+    Artifact.project_id,
+    Artifact.content_sha,
+)
+
+# Loads an artifact's project row alone, without the project's own artifacts, tasks or user
+ARTIFACT_PROJECT = selectinload(Artifact.project).raiseload("*")  # type: ignore
+
 
 class ArtifactRepository(BaseRepository[Artifact, ArtifactIn, ArtifactUpdate]):
-    """Repository for ProjectArtifact model operations."""
+    """
+    Repository for ProjectArtifact model operations.
+
+    Artifact bodies are kept in the blob store and rows reference them by SHA-256, so agents
+    saving the same content repeatedly store it once. Each row holds one blob reference.
+
+    Every body change is recorded in `artifact_versions`, mostly as compressed deltas against
+    the previous revision with a full snapshot every `snapshot_interval` revisions.
+    """
 
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self, session: AsyncSession, blob_store: Optional[BlobStore] = None, snapshot_interval: Optional[int] = None
+    ):
         super().__init__(Artifact, session)
+        self.blob_store = blob_store or get_blob_store()
+        self.snapshot_interval = max(snapshot_interval or settings.ARTIFACT_SNAPSHOT_INTERVAL, 1)
+
+    async def store_content(self, content: str) -> str:
+        """Store a body and take a reference on it. Returns its SHA-256."""
+        sha = await asyncio.to_thread(self.blob_store.put, content.encode("utf-8"))
+        await asyncio.to_thread(self.blob_store.incref, sha)
+        return sha
+
+    async def read_content(self, artifact: Artifact) -> str:
+        if artifact.content_sha:
+            data = await asyncio.to_thread(self.blob_store.get, artifact.content_sha)
+            return data.decode("utf-8")
+        return artifact.content or ""
+
+    async def iter_content(self, content_sha: str, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        """Stream a stored body without holding it in memory."""
+        reader = await asyncio.to_thread(self.blob_store.open, content_sha)
+        try:
+            while chunk := await asyncio.to_thread(reader.read, chunk_size):
+                yield chunk
+        finally:
+            reader.close()
+
+    async def get_content_ref(self, id: int) -> Optional[Dict[str, Any]]:
+        """
+        Fetch what is needed to serve an artifact's body, without loading the body or description
+
+        Returns:
+            Optional[Dict[str, Any]]: `content_sha` and `artifact_type`, plus `content` for rows written
+                before bodies moved to the blob store; None if the artifact does not exist
+        """
+        statement = select(Artifact.content_sha, Artifact.artifact_type).where(Artifact.id == id)
+        row = (await self.session.execute(statement)).one_or_none()
+        if row is None:
+            return None
+        ref = {"content_sha": row.content_sha, "artifact_type": row.artifact_type, "content": None}
+        if row.content_sha is None:
+            ref["content"] = (
+                await self.session.execute(select(Artifact.content).where(Artifact.id == id))
+            ).scalar_one_or_none()
+        return ref
+
+    async def list_summaries(
+        self, *, skip: int = 0, limit: int = 100, project_id: Optional[int] = None
+    ) -> List[ArtifactSummary]:
+        """
+        List artifact metadata only
+
+        Only the summary columns are selected, so the cost of a listing doesn't depend on body or
+        description sizes; body sizes come from the blob store index.
+        """
+        statement = select(*SUMMARY_COLUMNS).order_by(Artifact.id).offset(skip).limit(limit)
+        if project_id is not None:
+            statement = statement.where(Artifact.project_id == project_id)
+        rows = (await self.session.execute(statement)).all()
+        summaries = [ArtifactSummary.model_validate(dict(row._mapping)) for row in rows]
+
+        def attach_sizes():
+            for summary in summaries:
+                if summary.content_sha:
+                    summary.content_size = self.blob_store.size(summary.content_sha)
+
+        await asyncio.to_thread(attach_sizes)
+        return summaries
+
+    async def move_inline_content(self, batch_size: int = 100) -> int:
+        """
+        Move bodies still stored inline on the row into the blob store
+
+        Returns:
+            int: Rows moved in this batch; call until it returns 0
+        """
+        statement = (
+            select(Artifact.id, Artifact.content)
+            .where(Artifact.content_sha.is_(None), Artifact.content.is_not(None))  # type: ignore
+            .limit(batch_size)
+        )
+        rows = (await self.session.execute(statement)).all()
+        shas = []
+        for row in rows:
+            sha = await self.store_content(row.content)
+            shas.append(sha)
+            await self.session.execute(
+                update(Artifact).where(Artifact.id == row.id).values(content_sha=sha, content=None)  # type: ignore
+            )
+        try:
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            for sha in shas:
+                await asyncio.to_thread(self.blob_store.release, sha)
+            raise
+        return len(rows)
+
+    async def create(self, create_model: ArtifactIn) -> Artifact:
+        """Creates an artifact, storing its body in the blob store as version 1."""
+        logfire.debug(f"Creating {self.model_name} instance")
+
+        model_data = create_model.model_dump()
+        content = model_data.pop("content")
+        sha = await self.store_content(content)
+        db_obj = self.model(**model_data, content_sha=sha)
+
+        self.session.add(db_obj)
+        taken = [sha]
+        try:
+            await self.session.flush()
+            taken += await self._add_version(db_obj.id, content, sha, previous=None)
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            # The rows were never written, so neither were their references
+            await self._release(taken)
+            raise
+        await self.session.refresh(db_obj)
+        return db_obj
+
+    async def update(self, obj_in: ArtifactUpdate, db_obj: Artifact) -> Optional[Artifact]:
+        """
+        Updates an artifact; a new body moves the row's reference to the new blob and is
+        recorded as the next version.
+
+        The row is locked (SELECT ... FOR UPDATE) until commit, so concurrent updates of one
+        artifact are serialized: each sees the body and version number its predecessor wrote.
+        """
+        update_data = obj_in.model_dump(exclude_unset=True)
+        content = update_data.pop("content", None)
+        if content is None:
+            return await super().update(ArtifactUpdate(**update_data), db_obj)
+
+        # Reload under the lock; `db_obj` may predate another writer's commit
+        result = await self.session.execute(
+            select(Artifact).where(Artifact.id == db_obj.id).with_for_update().execution_options(populate_existing=True)
+        )
+        db_obj = result.scalar_one()
+        previous_sha = db_obj.content_sha
+        previous_content = await self.read_content(db_obj)
+        sha = await self.store_content(content)
+        taken = [sha]
+        for field, value in update_data.items():
+            setattr(db_obj, field, value)
+        db_obj.content_sha = sha
+        db_obj.content = None
+
+        self.session.add(db_obj)
+        try:
+            if sha != previous_sha:
+                latest = await self._latest_version(db_obj.id)
+                if latest is None:
+                    # Written before versioning: its current body becomes version 1
+                    base_sha = previous_sha or await asyncio.to_thread(
+                        self.blob_store.put, previous_content.encode("utf-8")
+                    )
+                    taken += await self._add_version(db_obj.id, previous_content, base_sha, previous=None)
+                    latest = 1
+                taken += await self._add_version(db_obj.id, content, sha, previous=(latest, previous_content))
+            await self.session.commit()
+        except Exception as e:
+            logfire.error(f"Failed to update {self.model_name} {db_obj.id}: {e}")
+            await self.session.rollback()
+            await self._release(taken)
+            return None
+
+        await self.session.refresh(db_obj)
+        await asyncio.to_thread(self.blob_store.release, previous_sha)
+        return db_obj
+
+    async def delete(self, id) -> Artifact:
+        snapshots = (
+            (
+                await self.session.execute(
+                    select(ArtifactVersion.content_sha).where(
+                        ArtifactVersion.artifact_id == id,
+                        ArtifactVersion.is_snapshot == True,  # noqa: E712
+                    )
+                )
+            )
+            .scalars()
+            .all()
+        )
+        # Versions go with the row through the foreign key's ON DELETE CASCADE
+        db_obj = await super().delete(id)
+        await self._release([db_obj.content_sha, *snapshots])
+        return db_obj
+
+    async def _release(self, shas: List[Optional[str]]) -> None:
+        def release_all():
+            for sha in shas:
+                self.blob_store.release(sha)
+
+        await asyncio.to_thread(release_all)
+
+    # -- versions ----------------------------------------------------------
+
+    async def _latest_version(self, artifact_id: int) -> Optional[int]:
+        statement = select(func.max(ArtifactVersion.version)).where(ArtifactVersion.artifact_id == artifact_id)
+        return (await self.session.execute(statement)).scalar_one_or_none()
+
+    async def _add_version(
+        self, artifact_id: int, content: str, content_sha: str, previous: Optional[Tuple[int, str]]
+    ) -> List[str]:
+        """
+        Stage the next revision of an artifact in the session
+
+        Every `snapshot_interval`-th revision, and any revision whose delta would not be much
+        smaller than the body, is a snapshot referencing the body in the blob store.
+
+        Args:
+            previous (Optional[Tuple[int, str]]): Latest version number and its body, None for the first version
+
+        Returns:
+            List[str]: Blob references taken, to be released if the transaction fails
+        """
+        version = 1 if previous is None else previous[0] + 1
+        size = len(content.encode("utf-8"))
+        delta = None
+        if previous is not None and (version - 1) % self.snapshot_interval != 0:
+            delta = await asyncio.to_thread(encode_delta, previous[1], content)
+            if len(delta) * 2 > size:
+                delta = None
+
+        taken = []
+        if delta is None:
+            await asyncio.to_thread(self.blob_store.incref, content_sha)
+            taken.append(content_sha)
+        self.session.add(
+            ArtifactVersion(
+                artifact_id=artifact_id,
+                version=version,
+                content_sha=content_sha,
+                size=size,
+                is_snapshot=delta is None,
+                delta=delta,
+            )
+        )
+        return taken
+
+    async def list_versions(self, artifact_id: int) -> List[ArtifactVersionOut]:
+        """List an artifact's revisions, newest first, without loading any delta."""
+        statement = (
+            select(
+                ArtifactVersion.version,
+                ArtifactVersion.created_at,
+                ArtifactVersion.content_sha,
+                ArtifactVersion.size,
+                ArtifactVersion.is_snapshot,
+                func.octet_length(ArtifactVersion.delta).label("delta_size"),
+            )
+            .where(ArtifactVersion.artifact_id == artifact_id)
+            .order_by(ArtifactVersion.version.desc())  # type: ignore
+        )
+        rows = (await self.session.execute(statement)).all()
+        return [ArtifactVersionOut.model_validate(dict(row._mapping)) for row in rows]
+
+    async def get_version_content(self, artifact_id: int, version: int) -> Optional[str]:
+        """
+        Rebuild the body of one revision
+
+        Starts from the nearest snapshot at or before `version` and replays the deltas after it,
+        at most `snapshot_interval - 1` of them.
+        """
+        snapshot_version = (
+            await self.session.execute(
+                select(func.max(ArtifactVersion.version)).where(
+                    ArtifactVersion.artifact_id == artifact_id,
+                    ArtifactVersion.is_snapshot == True,  # noqa: E712
+                    ArtifactVersion.version <= version,
+                )
+            )
+        ).scalar_one_or_none()
+        if snapshot_version is None:
+            return None
+
+        statement = (
+            select(ArtifactVersion.version, ArtifactVersion.content_sha, ArtifactVersion.delta)
+            .where(
+                ArtifactVersion.artifact_id == artifact_id,
+                ArtifactVersion.version >= snapshot_version,
+                ArtifactVersion.version <= version,
+            )
+            .order_by(ArtifactVersion.version)  # type: ignore
+        )
+        rows = (await self.session.execute(statement)).all()
+        if not rows or rows[-1].version != version:
+            return None
+
+        def rebuild() -> str:
+            content = self.blob_store.get(rows[0].content_sha).decode("utf-8")
+            for row in rows[1:]:
+                content = apply_delta(content, row.delta)
+            return content
+
+        return await asyncio.to_thread(rebuild)
+
+    async def diff_versions(self, artifact_id: int, from_version: int, to_version: int) -> Optional[str]:
+        """Unified diff between two revisions, None if either does not exist."""
+        before = await self.get_version_content(artifact_id, from_version)
+        after = await self.get_version_content(artifact_id, to_version)
+        if before is None or after is None:
+            return None
+        return "".join(
+            difflib.unified_diff(
+                before.splitlines(keepends=True),
+                after.splitlines(keepends=True),
+                fromfile=f"v{from_version}",
+                tofile=f"v{to_version}",
+            )
+        )
@@ -1 +1,152 @@
-# TODO create respository for vector documents.
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import logfire
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio.session import AsyncSession
+from sqlmodel import func, select
+
+from ..models.document import VECTOR_DIMENSIONS, Document
+from ..schemas.document import DocumentIn, DocumentUpdate
+from .base import BaseRepository
+
+COPY_COLUMNS = ["name", "content", "metadata", "embedding"]
+
+
+def vector_literal(embedding: Sequence[float]) -> str:
+    """Formats an embedding in pgvector's text input format, e.g. `[0.1,0.2]`."""
+    return "[" + ",".join(repr(float(value)) for value in embedding) + "]"
+
+
+class DocumentRepository(BaseRepository[Document, DocumentIn, DocumentUpdate]):
+    def __init__(self, session: AsyncSession):
+        super().__init__(Document, session)
+
+    async def insert_many(self, documents: Sequence[DocumentIn], batch_size: int = 5000) -> int:
+        """
+        Bulk-inserts documents with COPY instead of one INSERT per row.
+
+        Rows are streamed as CSV so no vector codec has to be registered on the (pooled)
+        connection. The caller's transaction is committed once every batch is copied.
+
+        Args:
+            documents (Sequence[DocumentIn]): Documents to store
+            batch_size (int): Rows per COPY chunk sent to the server
+
+        Returns:
+            int: Number of rows inserted
+        """
+        if not documents:
+            return 0
+        for document in documents:
+            if len(document.embedding) != VECTOR_DIMENSIONS:
+                raise ValueError(
+                    f"Document {document.name!r} has {len(document.embedding)} dimensions, expected {VECTOR_DIMENSIONS}"
+                )
+
+        logfire.debug(f"Copying {len(documents)} {self.model_name} rows")
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_to_table(
+            Document.__tablename__,
+            source=self._csv_chunks(documents, batch_size),
+            columns=COPY_COLUMNS,
+            format="csv",
+        )
+        await self.session.commit()
+        logfire.info(f"Inserted {len(documents)} {self.model_name} rows")
+        return len(documents)
+
+    @staticmethod
+    async def _csv_chunks(documents: Sequence[DocumentIn], batch_size: int) -> AsyncIterator[bytes]:
+        for start in range(0, len(documents), batch_size):
+            buffer = io.StringIO()
+            # COPY reads an unquoted empty field as NULL, so quote every field to keep "" as ""
+            writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+            for document in documents[start : start + batch_size]:
+                writer.writerow(
+                    [
+                        document.name,
+                        document.content,
+                        json.dumps(document.doc_metadata),
+                        vector_literal(document.embedding),
+                    ]
+                )
+            yield buffer.getvalue().encode("utf-8")
+
+    async def search(
+        self,
+        embedding: Sequence[float],
+        k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[Tuple[Document, float]]:
+        """
+        Returns the `k` documents closest to `embedding` by cosine distance.
+
+        The ORDER BY on the distance operator lets Postgres answer from the HNSW index instead
+        of scanning every row.
+
+        Args:
+            embedding (Sequence[float]): Query vector
+            k (int): Number of results
+            filters (Optional[Dict[str, Any]]): Metadata that must be contained in each hit (`metadata @> filters`)
+            ef_search (Optional[int]): HNSW candidate list size for this query only; higher trades speed for recall
+
+        Returns:
+            List[Tuple[Document, float]]: Documents with their cosine similarity, best first
+        """
+        if ef_search is not None:
+            # set_config(..., true) is scoped to the current transaction, like SET LOCAL
+            await self.session.execute(
+                text("SELECT set_config('hnsw.ef_search', :value, true)"), {"value": str(max(ef_search, k))}
+            )
+        if filters:
+            # Keep walking the graph until k rows survive the filter (pgvector >= 0.8)
+            await self.session.execute(text("SELECT set_config('hnsw.iterative_scan', 'strict_order', true)"))
+
+        distance = Document.embedding.cosine_distance(list(embedding)).label("distance")
+        statement = select(Document, distance)
+        if filters:
+            statement = statement.where(Document.doc_metadata.contains(filters))
+        statement = statement.order_by(distance).limit(k)
+
+        result = await self.session.execute(statement)
+        hits = [(document, 1.0 - float(score)) for document, score in result.all()]
+        logfire.debug(f"Vector search returned {len(hits)} {self.model_name} rows")
+        return hits
+
+    async def lexical_search(
+        self, query: str, k: int = 5, filters: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        Full-text search over document names and content.
+
+        Args:
+            query (str): Web-search style query (quoted phrases, `or`, `-term`)
+            k (int): Number of results
+            filters (Optional[Dict[str, Any]]): Metadata that must be contained in each hit
+
+        Returns:
+            List[Tuple[Document, float]]: Documents with their `ts_rank_cd` score, best first
+        """
+        ts_query = func.websearch_to_tsquery("simple", query)
+        rank = func.ts_rank_cd(Document.search_vector, ts_query).label("rank")
+        statement = select(Document, rank).where(Document.search_vector.op("@@")(ts_query))
+        if filters:
+            statement = statement.where(Document.doc_metadata.contains(filters))
+        statement = statement.order_by(rank.desc()).limit(k)
+
+        result = await self.session.execute(statement)
+        hits = [(document, float(score)) for document, score in result.all()]
+        logfire.debug(f"Lexical search returned {len(hits)} {self.model_name} rows")
+        return hits
+
+    async def delete_by_name(self, name: str, commit: bool = True) -> int:
+        """Deletes every document stored under `name`. Returns the number of rows removed."""
+        result = await self.session.execute(delete(Document).where(Document.name == name))
+        if commit:
+            await self.session.commit()
+        return result.rowcount
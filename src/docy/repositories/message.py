@@ -1,4 +1,9 @@
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
 from sqlalchemy.ext.asyncio.session import AsyncSession
+from sqlmodel import select
 
 from ..models.chat import Message
 from ..schemas.message import MessageIn, MessageUpdate
@@ -10,3 +15,65 @@ class MessageRepository(BaseRepository[Message, MessageIn, MessageUpdate]):
 
     def __init__(self, session: AsyncSession):
         super().__init__(Message, session)
+
+    async def _cursor(self, chat_id: int, message_id: int) -> Tuple:
+        """(created_at, id) of a message used as a pagination cursor."""
+        statement = select(Message.created_at, Message.id).where(Message.id == message_id, Message.chat_id == chat_id)
+        row = (await self.session.execute(statement)).one_or_none()
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Message with id {message_id} not found in chat {chat_id}",
+            )
+        return tuple(row)
+
+    async def get_page(
+        self,
+        chat_id: int,
+        *,
+        before: Optional[int] = None,
+        after: Optional[int] = None,
+        limit: int = 100,
+        latest: bool = False,
+        skip: int = 0,
+    ) -> Tuple[List[Message], bool]:
+        """
+        One page of a chat's messages in chronological order, using keyset pagination
+
+        Messages are ordered by (created_at, id) and pages are bounded by a cursor message
+        instead of an offset, so every page is an index range scan on
+        (chat_id, created_at, id) no matter how deep into the chat it is.
+
+        Args:
+            chat_id (int): Chat to read
+            before (Optional[int]): Only messages older than this message id; returns the newest of them
+            after (Optional[int]): Only messages newer than this message id; returns the oldest of them
+            limit (int): Maximum messages to return
+            latest (bool): Without cursors, return the newest messages instead of the oldest
+            skip (int): Messages to skip past the cursor; only kept for offset-paging callers, as it
+                scans every skipped row
+
+        Returns:
+            Tuple[List[Message], bool]: Messages oldest first, and whether more exist past the page
+        """
+        key = tuple_(Message.created_at, Message.id)
+        statement = select(Message).where(Message.chat_id == chat_id)
+        if before is not None:
+            statement = statement.where(key < tuple_(*await self._cursor(chat_id, before)))
+        if after is not None:
+            statement = statement.where(key > tuple_(*await self._cursor(chat_id, after)))
+
+        backward = before is not None or (after is None and latest)
+        if backward:
+            statement = statement.order_by(Message.created_at.desc(), Message.id.desc())  # type: ignore
+        else:
+            statement = statement.order_by(Message.created_at, Message.id)  # type: ignore
+
+        # One extra row tells whether another page exists
+        result = await self.session.execute(statement.offset(skip).limit(limit + 1))
+        messages = list(result.scalars().all())
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        if backward:
+            messages.reverse()
+        return messages, has_more
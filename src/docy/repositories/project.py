@@ -1,12 +1,17 @@
 from typing import List, Optional
 
 from sqlalchemy.ext.asyncio.session import AsyncSession
+from sqlalchemy.orm import selectinload
 from sqlmodel import any_, select
 
 from ..models.project import Project, ProjectMetadata
 from ..schemas.project import ProjectIn, ProjectMetadataIn, ProjectUpdate
+from .artifact import SUMMARY_COLUMNS
 from .base import BaseRepository
 
+# Loads a project's artifacts as metadata only, instead of the relationship's default full rows
+ARTIFACT_SUMMARIES = selectinload(Project.artifacts).load_only(*SUMMARY_COLUMNS)  # type: ignore
+
 
 class ProjectRepository(BaseRepository[Project, ProjectIn, ProjectUpdate]):
     """Repository for project model operations"""
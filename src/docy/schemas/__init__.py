@@ -1,4 +1,6 @@
 from .agent import AgentIn, AgentOut, AgentUpdate
+from .artifact import ArtifactIn, ArtifactOut, ArtifactSummary, ArtifactUpdate, ArtifactVersionOut
+from .document import DocumentIn, DocumentOut, DocumentUpdate
 from .message import MessageIn, MessageOut, MessageUpdate
 from .project import ProjectIn, ProjectMetadataIn, ProjectOut, ProjectUpdate
 from .prompt import PromptIn, PromptOut, PromptUpdate
@@ -9,6 +11,14 @@ __all__ = [
     "AgentIn",
     "AgentOut",
     "AgentUpdate",
+    "ArtifactIn",
+    "ArtifactOut",
+    "ArtifactSummary",
+    "ArtifactUpdate",
+    "ArtifactVersionOut",
+    "DocumentIn",
+    "DocumentOut",
+    "DocumentUpdate",
     "MessageIn",
     "MessageOut",
     "MessageUpdate",
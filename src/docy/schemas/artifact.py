@@ -1,3 +1,4 @@
+import datetime
 from typing import Optional
 
 from pydantic import BaseModel, Field
@@ -29,6 +30,19 @@ class ArtifactOut(BaseModel):
     project: Optional["Project"] = Field()
 
 
+class ArtifactSummary(BaseModel):
+    """Artifact metadata without description or body, for listings."""
+
+    id: int = Field()
+    name: str = Field()
+    validated: bool = Field()
+    artifact_type: ArtifactType = Field()
+    project_id: Optional[int] = Field(default=None)
+
+    content_sha: Optional[str] = Field(default=None)
+    content_size: Optional[int] = Field(default=None)
+
+
 class ArtifactUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
@@ -39,3 +53,13 @@ class ArtifactUpdate(BaseModel):
 
     # Relationships
     project_id: Optional[int] = None
+
+
+class ArtifactVersionOut(BaseModel):
+    version: int = Field()
+    created_at: datetime.datetime = Field()
+    content_sha: str = Field()
+    size: int = Field()
+    is_snapshot: bool = Field()
+    # Bytes of the compressed delta; None for snapshots, whose body is in the blob store
+    delta_size: Optional[int] = Field(default=None)
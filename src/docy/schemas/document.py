@@ -0,0 +1,36 @@
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class DocumentIn(BaseModel):
+    """
+    Schema for storing a new embedded Document.
+    """
+
+    name: str = Field(description="Source name of the document, e.g. a file path")
+    content: str = Field(default="", description="The text the embedding was computed from")
+    doc_metadata: Dict[str, Any] = Field(default_factory=dict, description="Arbitrary metadata used for filtering")
+    embedding: List[float] = Field(description="Embedding vector")
+
+
+class DocumentOut(BaseModel):
+    """
+    Schema for returning Document data without its embedding.
+    """
+
+    id: int
+    name: str
+    content: str
+    doc_metadata: Dict[str, Any]
+
+
+class DocumentUpdate(BaseModel):
+    """
+    Schema for updating an existing Document. All fields are optional.
+    """
+
+    name: Optional[str] = Field(default=None, description="New source name")
+    content: Optional[str] = Field(default=None, description="New text content")
+    doc_metadata: Optional[Dict[str, Any]] = Field(default=None, description="Replacement metadata")
+    embedding: Optional[List[float]] = Field(default=None, description="New embedding vector")
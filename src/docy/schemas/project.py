@@ -2,7 +2,8 @@ from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
-from ..models import Artifact, ProjectType, User
+from ..models import ProjectType, User
+from .artifact import ArtifactSummary
 
 
 class ProjectIn(BaseModel):
@@ -25,7 +26,7 @@ class ProjectOut(BaseModel):
 
     # Relationships
     user: "User" = Field()
-    artifacts: Optional[List["Artifact"]] = Field()
+    artifacts: Optional[List[ArtifactSummary]] = Field()
 
 
 class ProjectUpdate(BaseModel):
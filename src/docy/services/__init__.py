@@ -1,9 +1,29 @@
-from .chroma_service import ChromaService
+from .chroma_service import ChromaService, ChromaVectorDB
+from .file_listing import DirectoryListing, FileEntry
 from .github_service import GithubService
+from .ingestion import IngestionCheckpoint, IngestionPipeline, SourceDocument
+from .markdown_chunker import MarkdownChunk, MarkdownChunker
+from .note_index import NoteEntry, NoteIndex
 from .note_service import NoteService
+from .pgvector_store import PgVectorDB
+from .retrieval import HybridRetriever, RetrievalHit, RetrievalResult
 
 __all__ = [
     "ChromaService",
+    "ChromaVectorDB",
+    "DirectoryListing",
+    "FileEntry",
     "GithubService",
+    "IngestionCheckpoint",
+    "IngestionPipeline",
+    "SourceDocument",
+    "MarkdownChunk",
+    "MarkdownChunker",
+    "NoteEntry",
+    "NoteIndex",
     "NoteService",
+    "PgVectorDB",
+    "HybridRetriever",
+    "RetrievalHit",
+    "RetrievalResult",
 ]
@@ -1,47 +1,228 @@
-from typing import Any, Dict, Optional
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Sequence
 
 import chromadb
+import numpy as np
 from chromadb.api.models.Collection import Collection
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
 from chromadb.errors import NotFoundError
-from chromadb.utils import embedding_functions
+
+from .vectordb import EmbeddingModel, VectorDBInterface
+
+DEFAULT_EMBEDDING_MODEL = "all-mpnet-base-v2"
+
+
+def content_id(document: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+    """Stable id for a document: the same text and metadata always map to the same id."""
+    digest = hashlib.sha256(document.encode("utf-8"))
+    if metadata:
+        digest.update(json.dumps(metadata, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SentenceEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Chroma embedding function backed by an `EmbeddingModel`.
+
+    Collections embed with the same model, cache and worker pool as the rest of the app
+    instead of Chroma's bundled default model.
+    """
+
+    def __init__(self, embedding_model: EmbeddingModel):
+        self.embedding_model = embedding_model
+
+    def __call__(self, input: Documents) -> Embeddings:
+        embeddings = self.embedding_model.generate_embeddings(list(input))
+        return [np.asarray(vector, dtype=np.float32) for vector in embeddings]
 
 
 class ChromaService:
-    def __init__(self) -> None:
-        self.embedding_model = "all-mpnet-base-v2"
-        self.client = chromadb.PersistentClient("docs")
-        self.embeddings_function = embedding_functions.DefaultEmbeddingFunction()
+    def __init__(self, path: str = "docs", embedding_model: Optional[EmbeddingModel] = None) -> None:
+        self.embedding_model = embedding_model or EmbeddingModel(DEFAULT_EMBEDDING_MODEL)
+        self.client = chromadb.PersistentClient(path)
+        self.embeddings_function = SentenceEmbeddingFunction(self.embedding_model)
+        self._collections: Dict[str, Collection] = {}
+        self._max_batch_size: Optional[int] = None
+
+    @property
+    def max_batch_size(self) -> int:
+        """Largest number of records the client accepts in one write."""
+        if self._max_batch_size is None:
+            self._max_batch_size = self.client.get_max_batch_size()
+        return self._max_batch_size
 
     def get(self, name: str) -> Collection | None:
+        collection = self._collections.get(name)
+        if collection is not None:
+            return collection
         try:
-            return self.client.get_collection(name=name)
-        except ValueError:
+            collection = self.client.get_collection(name=name, embedding_function=self.embeddings_function)
+        except (ValueError, NotFoundError):
             return None
+        self._collections[name] = collection
+        return collection
 
     def get_collections(self, limit: int = 10, offset: int = 0):
         return self.client.list_collections(limit=limit, offset=offset)
 
     def get_or_create(self, name: str, metadata: Optional[Dict[str, str]] = None):
-        return self.client.get_or_create_collection(name=name, metadata=metadata)
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self.client.get_or_create_collection(
+                name=name, metadata=metadata, embedding_function=self.embeddings_function
+            )
+            self._collections[name] = collection
+        return collection
 
-    def add_documents_to_collection(self, name: str, ids: list[str], documents: list[str], metadatas):
-        collection = self.client.get_collection(name)
+    def upsert_documents(
+        self,
+        name: str,
+        documents: Sequence[str],
+        metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+        ids: Optional[Sequence[str]] = None,
+        embeddings: Optional[Sequence[Sequence[float]]] = None,
+    ) -> Dict[str, int]:
+        """
+        Idempotently writes documents to a collection.
 
-        if collection is None:
+        Without explicit ids every document is keyed by the hash of its text and metadata, so
+        documents already present are skipped without being embedded again; explicit ids are
+        always overwritten. Writes are split into
+        chunks of the client's max batch size.
+
+        Args:
+            name (str): Collection name, created if missing
+            documents (Sequence[str]): Document texts
+            metadatas (Optional[Sequence[Optional[Dict[str, Any]]]]): One metadata dict per document
+            ids (Optional[Sequence[str]]): Explicit ids; defaults to content hashes
+            embeddings (Optional[Sequence[Sequence[float]]]): Precomputed embeddings; computed when omitted
+
+        Returns:
+            Dict[str, int]: Counts of documents written and skipped
+        """
+        collection = self.get_or_create(name)
+        metadatas = list(metadatas) if metadatas is not None else [None] * len(documents)
+        content_addressed = ids is None
+        if len(metadatas) != len(documents) or (ids is not None and len(ids) != len(documents)):
+            raise ValueError("ids, documents and metadatas must have the same length")
+        if content_addressed:
+            ids = [content_id(document, metadata) for document, metadata in zip(documents, metadatas, strict=True)]
+        if embeddings is not None and len(embeddings) != len(documents):
+            raise ValueError("embeddings must match documents in length")
+
+        # The last occurrence of a repeated id wins, as it would with sequential upserts
+        rows = {doc_id: position for position, doc_id in enumerate(ids)}
+        unique_ids = list(rows)
+
+        stats = {"written": 0, "skipped": len(ids) - len(unique_ids)}
+        for start in range(0, len(unique_ids), self.max_batch_size):
+            chunk = unique_ids[start : start + self.max_batch_size]
+            new_ids = chunk
+            if content_addressed:
+                # Identical content hashes to an identical id, so a hit means nothing changed
+                existing = set(collection.get(ids=chunk, include=[])["ids"])
+                new_ids = [doc_id for doc_id in chunk if doc_id not in existing]
+            stats["skipped"] += len(chunk) - len(new_ids)
+            if not new_ids:
+                continue
+
+            positions = [rows[doc_id] for doc_id in new_ids]
+            chunk_documents = [documents[position] for position in positions]
+            if embeddings is None:
+                chunk_embeddings = self.embeddings_function(chunk_documents)
+            else:
+                chunk_embeddings = [embeddings[position] for position in positions]
+            collection.upsert(
+                ids=new_ids,
+                documents=chunk_documents,
+                embeddings=chunk_embeddings,
+                metadatas=[metadatas[position] or None for position in positions],
+            )
+            stats["written"] += len(new_ids)
+        return stats
+
+    def add_documents_to_collection(
+        self, name: str, ids: Optional[list[str]], documents: list[str], metadatas
+    ) -> Dict[str, int]:
+        if self.get(name) is None:
             raise ValueError(f"Collection '{name}' does not exist.")
-        collection.add(ids=ids, documents=documents, metadatas=metadatas)
+        return self.upsert_documents(name, documents, metadatas=metadatas, ids=ids)
 
     def get_documents(
         self, collection_name: str, where_filter: Optional[Dict[str, Any]] = None, limit: Optional[int] = None
     ):
         """Gets documents from ChromaDB collection based on filters."""
-        documents = self.client.get_collection(collection_name).get(where=where_filter, limit=limit)
-        return documents
+        collection = self.get(collection_name)
+        if collection is None:
+            raise ValueError(f"Collection '{collection_name}' does not exist.")
+        return collection.get(where=where_filter, limit=limit)
 
     def delete_collection(self, name: str):
+        self._collections.pop(name, None)
         try:
-            collection = self.client.get_collection(name)
-            if collection:
-                self.client.delete_collection(name)
+            self.client.delete_collection(name)
         except NotFoundError as err:
             raise err
+
+
+class ChromaVectorDB(VectorDBInterface):
+    """
+    `VectorDBInterface` over one Chroma collection.
+
+    Args:
+        chroma_service (ChromaService): Service owning the client and embedding function
+        collection_name (str): Collection to read and write
+    """
+
+    def __init__(self, chroma_service: ChromaService, collection_name: str = "documents"):
+        self.chroma_service = chroma_service
+        self.collection_name = collection_name
+        self.collection = chroma_service.get_or_create(collection_name, metadata={"hnsw:space": "cosine"})
+
+    def insert(self, vectors: np.ndarray, metadata: List[Dict]) -> Dict[str, int]:
+        """
+        Insert precomputed vectors. Each metadata dict must carry the source text under `content`;
+        the remaining keys are stored as Chroma metadata.
+
+        Returns:
+            Dict[str, int]: Counts of documents written and skipped
+        """
+        if len(vectors) != len(metadata):
+            raise ValueError(f"Got {len(vectors)} vectors but {len(metadata)} metadata entries")
+        documents, metadatas = [], []
+        for meta in metadata:
+            meta = dict(meta)
+            documents.append(str(meta.pop("content")))
+            metadatas.append(meta)
+        return self.chroma_service.upsert_documents(
+            self.collection_name,
+            documents,
+            metadatas=metadatas,
+            embeddings=[np.asarray(vector, dtype=np.float32) for vector in vectors],
+        )
+
+    def search(self, query: str, k: int = 5, where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Search the collection with the service's embedding model.
+
+        Returns:
+            List[Dict[str, Any]]: Hits (id, content, metadata, score), best first
+        """
+        query_embedding = self.chroma_service.embeddings_function([query])[0]
+        results = self.collection.query(
+            query_embeddings=[query_embedding],
+            n_results=k,
+            where=where,
+            include=["documents", "metadatas", "distances"],
+        )
+        return [
+            {"id": doc_id, "content": document, "metadata": metadata or {}, "score": 1.0 - distance}
+            for doc_id, document, metadata, distance in zip(
+                results["ids"][0],
+                results["documents"][0],
+                results["metadatas"][0],
+                results["distances"][0],
+                strict=True,
+            )
+        ]
@@ -0,0 +1,266 @@
+import asyncio
+import base64
+import os
+import re
+import tarfile
+import tempfile
+import zlib
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import logfire
+
+from .exceptions import ServiceError
+
+BLOCK_SIZE = tarfile.BLOCKSIZE
+MAX_DOC_SIZE = 5 * 1024 * 1024
+
+# "scheme://user:password@" prefix of a URL
+URL_USERINFO_PATTERN = re.compile(r"([a-zA-Z][a-zA-Z0-9+.-]*://)[^/@\s]+@")
+
+
+def redact_url(text: str) -> str:
+    """Remove credentials embedded in any URL in `text`."""
+    return URL_USERINFO_PATTERN.sub(r"\1", text)
+
+
+def git_auth_env(url: str, token: str) -> Dict[str, str]:
+    """
+    Environment passing a token to git as an HTTP header scoped to `url`'s host
+
+    Keeps the credential out of argv (visible in the process list) and out of the clone URL
+    (echoed in git's error messages). GitHub accepts tokens as basic auth for x-access-token.
+    """
+    match = re.match(r"(https?://[^/]+/)", url)
+    key = f"http.{match.group(1)}.extraHeader" if match else "http.extraHeader"
+    credentials = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+    return {
+        "GIT_CONFIG_COUNT": "1",
+        "GIT_CONFIG_KEY_0": key,
+        "GIT_CONFIG_VALUE_0": f"Authorization: Basic {credentials}",
+    }
+
+
+class GitCommandError(ServiceError):
+    """Raised when a git subprocess exits with a non-zero status. URL credentials are never included."""
+
+    def __init__(self, args: Sequence[str], stderr: str):
+        stderr = redact_url(stderr)
+        super().__init__(f"git {redact_url(' '.join(args))} failed: {stderr.strip()}")
+        self.stderr = stderr
+
+
+class TarDocExtractor:
+    """
+    Incremental .tar.gz reader that keeps documentation files only.
+
+    Bytes are fed in as they arrive from the network or a pipe; the archive is never written to
+    disk and only the selected members are held in memory, one at a time. Handles the pax and
+    GNU long-name headers GitHub and `git archive` emit.
+
+    Args:
+        select (Callable[[str], bool]): Predicate on the member path (after stripping) deciding what to keep
+        strip_components (int): Leading path components to drop, like `tar --strip-components`
+        max_size (int): Members larger than this are skipped unread
+    """
+
+    def __init__(self, select: Callable[[str], bool], strip_components: int = 1, max_size: int = MAX_DOC_SIZE):
+        self.select = select
+        self.strip_components = strip_components
+        self.max_size = max_size
+        self._gunzip = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        self._buffer = bytearray()
+        self._finished = False
+        # Member currently being read: (kind, path, size, padded size)
+        self._member: Optional[Tuple[str, str, int, int]] = None
+        self._long_name: Optional[str] = None
+
+    def feed(self, data: bytes) -> Iterator[Tuple[str, bytes]]:
+        """Consume a chunk of the compressed archive and yield the (path, content) pairs it completes."""
+        if self._finished:
+            return
+        self._buffer += self._gunzip.decompress(data)
+        while not self._finished:
+            if self._member is None:
+                if len(self._buffer) < BLOCK_SIZE:
+                    return
+                header = bytes(self._buffer[:BLOCK_SIZE])
+                del self._buffer[:BLOCK_SIZE]
+                self._read_header(header)
+                continue
+
+            kind, path, size, padded = self._member
+            if kind == "skip":
+                # Drop what we can without buffering the member
+                dropped = min(padded, len(self._buffer))
+                del self._buffer[:dropped]
+                padded -= dropped
+                self._member = None if padded == 0 else (kind, path, size, padded)
+                if self._member is not None:
+                    return
+                continue
+
+            if len(self._buffer) < padded:
+                return
+            payload = bytes(self._buffer[:size])
+            del self._buffer[:padded]
+            self._member = None
+            if kind == "file":
+                yield path, payload
+            elif kind == "pax":
+                self._long_name = self._pax_path(payload) or self._long_name
+            elif kind == "longname":
+                self._long_name = payload.rstrip(b"\0").decode("utf-8", "surrogateescape")
+
+    def _read_header(self, header: bytes) -> None:
+        if header == tarfile.NUL * BLOCK_SIZE:
+            # End-of-archive marker; anything after it is padding
+            self._finished = True
+            return
+        info = tarfile.TarInfo.frombuf(header, "utf-8", "surrogateescape")
+        padded = -(-info.size // BLOCK_SIZE) * BLOCK_SIZE
+
+        if info.type == tarfile.XHDTYPE:
+            self._member = ("pax", "", info.size, padded)
+        elif info.type == tarfile.GNUTYPE_LONGNAME:
+            self._member = ("longname", "", info.size, padded)
+        else:
+            name, self._long_name = self._long_name or info.name, None
+            path = "/".join(name.split("/")[self.strip_components :])
+            keep = info.isfile() and path and info.size <= self.max_size and self.select(path)
+            self._member = ("file" if keep else "skip", path, info.size, padded)
+
+    @staticmethod
+    def _pax_path(payload: bytes) -> Optional[str]:
+        """Extract the `path` record from a pax extended header ("<len> <key>=<value>\\n" records)."""
+        position = 0
+        while position < len(payload):
+            space = payload.find(b" ", position)
+            if space == -1:
+                break
+            length = int(payload[position:space])
+            record = payload[space + 1 : position + length - 1]
+            key, _, value = record.partition(b"=")
+            if key == b"path":
+                return value.decode("utf-8", "surrogateescape")
+            position += length
+        return None
+
+
+async def iter_tar_docs(
+    chunks: AsyncIterator[bytes], select: Callable[[str], bool], strip_components: int = 1
+) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Stream documentation files out of a .tar.gz byte stream
+
+    Returns:
+        AsyncIterator[Tuple[str, str]]: (path, decoded text) pairs in archive order
+    """
+    extractor = TarDocExtractor(select, strip_components=strip_components)
+    async for chunk in chunks:
+        for path, content in extractor.feed(chunk):
+            try:
+                yield path, content.decode("utf-8")
+            except UnicodeDecodeError as e:
+                logfire.info(f"Warning: Error decoding content of {path}: {e}")
+
+
+async def _git(*args: str, cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None) -> str:
+    process = await asyncio.create_subprocess_exec(
+        "git",
+        *args,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0", **(env or {})},
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise GitCommandError(args, stderr.decode("utf-8", "replace"))
+    return stdout.decode("utf-8", "replace")
+
+
+async def git_archive_chunks(repo_path: str, ref: str = "HEAD", chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """
+    Stream `git archive --format=tar.gz` of a local (bare or working) repository
+
+    Members are prefixed with "archive/" so the stream has the same layout as a GitHub tarball.
+    """
+    process = await asyncio.create_subprocess_exec(
+        "git",
+        "-C",
+        repo_path,
+        "archive",
+        "--format=tar.gz",
+        "--prefix=archive/",
+        ref,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    assert process.stdout is not None and process.stderr is not None
+    try:
+        while chunk := await process.stdout.read(chunk_size):
+            yield chunk
+    finally:
+        if process.returncode is None and not process.stdout.at_eof():
+            process.kill()
+        stderr = await process.stderr.read()
+        await process.wait()
+    if process.returncode != 0:
+        raise GitCommandError(["archive", ref], stderr.decode("utf-8", "replace"))
+
+
+def sparse_patterns(docs_paths: Sequence[str], extensions: Sequence[str]) -> List[str]:
+    """Non-cone sparse-checkout patterns selecting the root README and the doc files under `docs_paths`."""
+    patterns = ["/README*"]
+    for docs_path in docs_paths:
+        docs_path = docs_path.strip("/")
+        prefix = f"/{docs_path}/**/" if docs_path else ""
+        patterns.extend(f"{prefix}*{extension}" for extension in extensions)
+    return patterns
+
+
+async def iter_clone_docs(
+    url: str,
+    docs_paths: Sequence[str],
+    extensions: Sequence[str],
+    select: Callable[[str], bool],
+    ref: Optional[str] = None,
+    token: Optional[str] = None,
+) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Shallow, blobless, sparse clone of a repository, yielding its documentation files
+
+    Only the commit's trees are transferred up front; checkout then fetches just the blobs the
+    sparse patterns select. The clone lives in a temporary directory removed afterwards.
+
+    Args:
+        url (str): Clone URL; local repositories should be given as file:// URLs so depth and filter apply
+        docs_paths (Sequence[str]): Directories to check out
+        extensions (Sequence[str]): Documentation file extensions
+        select (Callable[[str], bool]): Final filter on the checked-out relative paths
+        ref (Optional[str]): Branch or tag; the remote's default branch when omitted
+        token (Optional[str]): Access token, sent as an HTTP header through the environment
+    """
+    env = git_auth_env(url, token) if token else None
+    with tempfile.TemporaryDirectory(prefix="docy-clone-") as directory:
+        clone_args = ["clone", "--quiet", "--depth", "1", "--filter=blob:none", "--no-checkout"]
+        if ref and ref != "HEAD":
+            clone_args += ["--branch", ref]
+        await _git(*clone_args, url, directory, env=env)
+        await _git("sparse-checkout", "set", "--no-cone", *sparse_patterns(docs_paths, extensions), cwd=directory)
+        # Checkout fetches the selected blobs from the promisor remote, so it needs the credential too
+        await _git("checkout", "--quiet", cwd=directory, env=env)
+
+        root = Path(directory)
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(name for name in dirnames if name != ".git")
+            for filename in sorted(filenames):
+                file_path = Path(dirpath) / filename
+                path = file_path.relative_to(root).as_posix()
+                if not select(path) or file_path.stat().st_size > MAX_DOC_SIZE:
+                    continue
+                try:
+                    yield path, file_path.read_text(encoding="utf-8")
+                except UnicodeDecodeError as e:
+                    logfire.info(f"Warning: Error decoding content of {path}: {e}")
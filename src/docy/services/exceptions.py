@@ -58,3 +58,11 @@ class ProjectNotFound(ServiceError):
     def __init__(self, project_id: int) -> None:
         super().__init__(f"No project found with ID: {project_id}")
         self.project_id = project_id
+
+
+class GithubRateLimitError(ServiceError):
+    """Raised when the GitHub rate limit resets later than the caller is willing to wait."""
+
+    def __init__(self, reset_in: float):
+        super().__init__(f"GitHub rate limit exhausted; resets in {reset_in:.0f}s.")
+        self.reset_in = reset_in
@@ -0,0 +1,185 @@
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Callable, Dict, List, Optional, Tuple
+
+SORT_KEYS: Dict[str, Callable[["FileEntry"], tuple]] = {
+    "name": lambda entry: (entry.path.lower(), entry.path),
+    "size": lambda entry: (entry.size, entry.path),
+    "modified": lambda entry: (entry.mtime_ns, entry.path),
+}
+
+
+@dataclass(frozen=True)
+class FileEntry:
+    """Stat information for one file, `path` being relative to the listed root."""
+
+    path: str
+    size: int
+    mtime_ns: int
+
+    @property
+    def modified(self) -> float:
+        return self.mtime_ns / 1e9
+
+
+@dataclass
+class _DirSnapshot:
+    mtime_ns: int
+    files: List[FileEntry]
+    subdirs: List[str]
+
+
+class DirectoryListing:
+    """
+    Cached, sortable listing of the files under a directory.
+
+    Every directory is read once with `os.scandir` and kept together with its own mtime. A
+    listing only costs one `stat` per directory: directories whose mtime is unchanged (no file
+    added, removed or renamed in them) reuse their snapshot. In-place rewrites don't touch the
+    directory mtime, so writers going through the API call `invalidate` for the file they changed.
+
+    Sorted and filtered views are memoized per (recursive, pattern, sort) and rebuilt only after
+    a snapshot changed, so paging through a large directory is a slice of a ready-made list.
+
+    Args:
+        root (Path): Directory to list
+        exclude (Optional[Callable[[str], bool]]): Predicate on entry names to hide, e.g. temp files
+        max_views (int): Memoized sorted views to keep
+    """
+
+    def __init__(self, root: Path, exclude: Optional[Callable[[str], bool]] = None, max_views: int = 32):
+        self.root = Path(root)
+        self.exclude = exclude
+        self.max_views = max_views
+
+        self._lock = threading.Lock()
+        self._dirs: Dict[str, _DirSnapshot] = {}
+        self._views: "OrderedDict[tuple, Tuple[int, List[FileEntry]]]" = OrderedDict()
+        # Bumped whenever a snapshot changes; views built at an older generation are stale
+        self._generation = 0
+
+    def invalidate(self, path: Optional[Path] = None) -> None:
+        """Forget the snapshot of the directory containing `path`, or every snapshot."""
+        with self._lock:
+            if path is None:
+                self._dirs.clear()
+            else:
+                try:
+                    relative = Path(path).parent.relative_to(self.root).as_posix()
+                except ValueError:
+                    return
+                self._dirs.pop("" if relative == "." else relative, None)
+            self._generation += 1
+
+    def page(
+        self,
+        offset: int = 0,
+        limit: int = 100,
+        sort: str = "name",
+        descending: bool = False,
+        recursive: bool = False,
+        pattern: Optional[str] = None,
+    ) -> Tuple[int, List[FileEntry]]:
+        """
+        Return one page of files in sort order
+
+        Args:
+            offset (int): Entries to skip
+            limit (int): Maximum entries to return
+            sort (str): "name", "size" or "modified"
+            descending (bool): Reverse the sort order
+            recursive (bool): Include files in subdirectories, with their relative paths
+            pattern (Optional[str]): Glob matched against the relative path from the right,
+                so "*.md" matches at any depth and "docs/*.md" only directly under a docs folder
+
+        Returns:
+            Tuple[int, List[FileEntry]]: Total matching files and the requested page
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        with self._lock:
+            self._refresh(recursive)
+            key = (recursive, pattern or "", sort)
+            cached = self._views.get(key)
+            if cached is not None and cached[0] == self._generation:
+                self._views.move_to_end(key)
+                order = cached[1]
+            else:
+                order = sorted(self._collect(recursive, pattern), key=SORT_KEYS[sort])
+                self._views[key] = (self._generation, order)
+                self._views.move_to_end(key)
+                while len(self._views) > self.max_views:
+                    self._views.popitem(last=False)
+
+        total = len(order)
+        if descending:
+            start = max(total - offset - limit, 0)
+            return total, order[start : max(total - offset, 0)][::-1]
+        return total, order[offset : offset + limit]
+
+    def _refresh(self, recursive: bool) -> None:
+        """Revalidate the root (and with `recursive`, every known subdirectory) against its mtime."""
+        stack = [""]
+        seen = set()
+        while stack:
+            relative = stack.pop()
+            seen.add(relative)
+            snapshot = self._snapshot(relative)
+            if recursive and snapshot is not None:
+                stack.extend(snapshot.subdirs)
+        if recursive:
+            # Subdirectories no longer reachable from the root were removed or renamed
+            for relative in set(self._dirs) - seen:
+                del self._dirs[relative]
+                self._generation += 1
+
+    def _snapshot(self, relative: str) -> Optional[_DirSnapshot]:
+        directory = self.root / relative if relative else self.root
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            if self._dirs.pop(relative, None) is not None:
+                self._generation += 1
+            return None
+
+        snapshot = self._dirs.get(relative)
+        if snapshot is not None and snapshot.mtime_ns == mtime_ns:
+            return snapshot
+
+        files: List[FileEntry] = []
+        subdirs: List[str] = []
+        try:
+            with os.scandir(directory) as it:
+                for dir_entry in it:
+                    if self.exclude is not None and self.exclude(dir_entry.name):
+                        continue
+                    path = f"{relative}/{dir_entry.name}" if relative else dir_entry.name
+                    try:
+                        if dir_entry.is_dir(follow_symlinks=False):
+                            subdirs.append(path)
+                        elif dir_entry.is_file():
+                            stat = dir_entry.stat()
+                            files.append(FileEntry(path=path, size=stat.st_size, mtime_ns=stat.st_mtime_ns))
+                    except OSError:
+                        # Skip files that vanish or can't be accessed mid-scan
+                        continue
+        except OSError as e:
+            print(f"Error scanning {directory}: {e}")
+            return None
+
+        snapshot = self._dirs[relative] = _DirSnapshot(mtime_ns=mtime_ns, files=files, subdirs=subdirs)
+        self._generation += 1
+        return snapshot
+
+    def _collect(self, recursive: bool, pattern: Optional[str]) -> List[FileEntry]:
+        if recursive:
+            entries = [entry for snapshot in self._dirs.values() for entry in snapshot.files]
+        else:
+            root = self._dirs.get("")
+            entries = list(root.files) if root else []
+        if pattern:
+            entries = [entry for entry in entries if PurePosixPath(entry.path).match(pattern)]
+        return entries
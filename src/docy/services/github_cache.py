@@ -0,0 +1,72 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+
+class GithubCache:
+    """
+    Persistent store behind `GithubClient`'s conditional requests.
+
+    Keeps three things in one SQLite file (or in memory when no path is given):
+
+    - responses: ETag, headers and body per GET, replayed when GitHub answers `304 Not Modified`
+      (304s do not count against the rate limit)
+    - blobs: file contents by git blob SHA; a SHA's content never changes, so these are served
+      without any request
+    - manifests: the path -> blob SHA map of the last sync of a repository's docs, used to skip
+      unchanged files
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path) if path else ":memory:", check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, etag TEXT, headers TEXT, body BLOB)"
+            )
+            self._db.execute("CREATE TABLE IF NOT EXISTS blobs (sha TEXT PRIMARY KEY, content BLOB) WITHOUT ROWID")
+            self._db.execute("CREATE TABLE IF NOT EXISTS manifests (key TEXT PRIMARY KEY, entries TEXT)")
+        self.stats: Dict[str, int] = {"not_modified": 0, "blob_hits": 0}
+
+    def get_response(self, key: str) -> Optional[Tuple[str, Dict[str, str], bytes]]:
+        with self._lock:
+            row = self._db.execute("SELECT etag, headers, body FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        etag, headers, body = row
+        return etag, json.loads(headers), body
+
+    def put_response(self, key: str, etag: str, headers: Dict[str, str], body: bytes) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, etag, headers, body) VALUES (?, ?, ?, ?)",
+                (key, etag, json.dumps(headers), body),
+            )
+
+    def get_blob(self, sha: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._db.execute("SELECT content FROM blobs WHERE sha = ?", (sha,)).fetchone()
+            if row is not None:
+                self.stats["blob_hits"] += 1
+        return row[0] if row else None
+
+    def put_blob(self, sha: str, content: bytes) -> None:
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO blobs (sha, content) VALUES (?, ?)", (sha, content))
+
+    def get_manifest(self, key: str) -> Dict[str, str]:
+        with self._lock:
+            row = self._db.execute("SELECT entries FROM manifests WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def put_manifest(self, key: str, entries: Dict[str, str]) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO manifests (key, entries) VALUES (?, ?)", (key, json.dumps(entries))
+            )
@@ -0,0 +1,219 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+import logfire
+
+from .exceptions import GithubRateLimitError
+from .github_cache import GithubCache
+
+GITHUB_API_URL = "https://api.github.com"
+
+
+class GithubClient:
+    """
+    Minimal async GitHub REST client for bulk reads.
+
+    All requests share one pooled `httpx.AsyncClient` and at most `max_concurrency` are in
+    flight at once. Every response's `x-ratelimit-*` headers are tracked: once the remaining
+    budget drops to `min_remaining`, new requests wait for the reset instead of failing, and
+    403/429 rate-limit responses are retried after `retry-after` or the reset time.
+
+    With a `cache`, GETs are sent with `If-None-Match` and a `304` is answered from the stored
+    body, and blobs already fetched by SHA are not requested at all.
+
+    Args:
+        token (Optional[str]): Personal access token; anonymous requests get 60 calls/hour
+        api_url (str): API root, overridable to point at a local fake server
+        max_concurrency (int): Concurrent requests
+        max_retries (int): Retries per request after rate limiting or transient 5xx errors
+        max_wait (float): Longest rate-limit wait in seconds before giving up with `GithubRateLimitError`
+        min_remaining (int): Remaining-call floor kept in reserve for other clients of the token
+        transport (Optional[httpx.AsyncBaseTransport]): Custom transport, e.g. `httpx.MockTransport` in tests
+        cache (Optional[GithubCache]): ETag / blob store for conditional requests
+    """
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        api_url: str = GITHUB_API_URL,
+        max_concurrency: int = 16,
+        max_retries: int = 3,
+        max_wait: float = 900.0,
+        min_remaining: int = 0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache: Optional[GithubCache] = None,
+    ):
+        headers = {"Accept": "application/vnd.github+json", "X-GitHub-Api-Version": "2022-11-28"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        self.http = httpx.AsyncClient(
+            base_url=api_url.rstrip("/"),
+            headers=headers,
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+            transport=transport,
+            follow_redirects=True,
+        )
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self.min_remaining = min_remaining
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.cache = cache
+        self.requests_sent = 0
+
+        self._slots = asyncio.Semaphore(max_concurrency)
+        # Epoch seconds before which no request may be sent
+        self._resume_at = 0.0
+
+    async def __aenter__(self) -> "GithubClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        conditional: bool = True,
+    ) -> httpx.Response:
+        """
+        Send one request, waiting out rate limits and retrying transient failures
+
+        Args:
+            conditional (bool): For GETs with a cache, revalidate with the stored ETag
+
+        Returns:
+            httpx.Response: The final response; error statuses other than rate limits are raised
+        """
+        headers = dict(headers or {})
+        cache_key = cached = None
+        if self.cache is not None and conditional and method == "GET":
+            url = self.http.build_request(method, path, params=params).url
+            # Raw and JSON representations of one URL carry different ETags
+            cache_key = f"{headers.get('Accept', '')} {url}"
+            cached = self.cache.get_response(cache_key)
+            if cached is not None:
+                headers["If-None-Match"] = cached[0]
+
+        for attempt in range(self.max_retries + 1):
+            async with self._slots:
+                await self._wait_for_budget()
+                response = await self.http.request(method, path, params=params, headers=headers)
+            self.requests_sent += 1
+            self._track(response)
+
+            if response.status_code == 304 and cached is not None:
+                self.cache.stats["not_modified"] += 1
+                _, cached_headers, body = cached
+                return httpx.Response(200, headers=cached_headers, content=body, request=response.request)
+
+            retry_in = self._retry_delay(response, attempt)
+            if retry_in is None:
+                response.raise_for_status()
+                etag = response.headers.get("etag")
+                if cache_key is not None and etag:
+                    self.cache.put_response(
+                        cache_key, etag, {"content-type": response.headers.get("content-type", "")}, response.content
+                    )
+                return response
+            logfire.warning(f"GitHub {method} {path} returned {response.status_code}; retrying in {retry_in:.1f}s")
+            self._resume_at = max(self._resume_at, time.time() + retry_in)
+
+        response.raise_for_status()
+        return response
+
+    @asynccontextmanager
+    async def stream(self, path: str, params: Optional[Dict[str, Any]] = None) -> AsyncIterator[httpx.Response]:
+        """
+        Stream a GET response body, e.g. a repository tarball, after waiting for rate-limit budget
+
+        The body is never buffered; read it with `response.aiter_bytes()`.
+        """
+        async with self._slots:
+            await self._wait_for_budget()
+            async with self.http.stream("GET", path, params=params) as response:
+                self.requests_sent += 1
+                self._track(response)
+                response.raise_for_status()
+                yield response
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        return (await self.request("GET", path, params=params)).json()
+
+    async def get_tree(self, repo: str, ref: str = "HEAD") -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        List every path of a commit's tree with one recursive trees-API call
+
+        Args:
+            repo (str): "owner/name"
+            ref (str): Branch, tag or commit SHA
+
+        Returns:
+            Tuple[List[Dict[str, Any]], bool]: Tree entries (path, type, sha, size) and whether the
+                listing was truncated
+        """
+        tree = await self.get_json(f"/repos/{repo}/git/trees/{ref}", params={"recursive": "1"})
+        return tree["tree"], tree.get("truncated", False)
+
+    async def get_blob(self, repo: str, sha: str) -> bytes:
+        """Fetch a blob's raw bytes by SHA, skipping the base64 JSON envelope."""
+        if self.cache is not None:
+            content = self.cache.get_blob(sha)
+            if content is not None:
+                return content
+        response = await self.request(
+            "GET",
+            f"/repos/{repo}/git/blobs/{sha}",
+            headers={"Accept": "application/vnd.github.raw+json"},
+            conditional=False,
+        )
+        if self.cache is not None:
+            self.cache.put_blob(sha, response.content)
+        return response.content
+
+    async def _wait_for_budget(self) -> None:
+        delay = self._resume_at - time.time()
+        if delay > self.max_wait:
+            raise GithubRateLimitError(delay)
+        if delay > 0:
+            logfire.info(f"Waiting {delay:.1f}s for the GitHub rate limit to reset")
+            await asyncio.sleep(delay)
+
+    def _track(self, response: httpx.Response) -> None:
+        remaining = response.headers.get("x-ratelimit-remaining")
+        reset = response.headers.get("x-ratelimit-reset")
+        if remaining is None or reset is None:
+            return
+        self.remaining = int(remaining)
+        self.reset_at = float(reset)
+        if self.remaining <= self.min_remaining:
+            self._resume_at = max(self._resume_at, self.reset_at + 1)
+
+    def _retry_delay(self, response: httpx.Response, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying `response`, or None if it should not be retried."""
+        if attempt >= self.max_retries:
+            return None
+        if response.status_code in (403, 429):
+            retry_after = response.headers.get("retry-after")
+            if retry_after is not None:
+                return float(retry_after)
+            if response.headers.get("x-ratelimit-remaining") == "0" and self.reset_at is not None:
+                return max(self.reset_at - time.time(), 0.0) + 1
+            # Secondary limits without headers: back off exponentially, starting at one minute
+            if "rate limit" in response.text.lower():
+                return 60.0 * 2**attempt
+            return None
+        if response.status_code in (502, 503, 504):
+            return 2.0**attempt
+        return None
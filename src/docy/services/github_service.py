@@ -1,16 +1,28 @@
-from typing import Dict, Optional
+import asyncio
+import posixpath
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Literal, Optional, Sequence, Tuple
 
+import httpx
 import logfire
 from github import Auth, Github
-from github.ContentFile import ContentFile
-from github.GithubException import UnknownObjectException
-from github.Repository import Repository
 from pydantic import BaseModel
 
 from docy.core import Settings
 
+from .doc_archive import git_archive_chunks, iter_clone_docs, iter_tar_docs, redact_url
+from .github_cache import GithubCache
+from .github_client import GithubClient
+
 settings = Settings()
 
+DOC_EXTENSIONS = (".md", ".mdx", ".txt", ".rst")
+
+# "api": tree listing + per-blob fetches (incremental, cache-aware)
+# "tarball": one streamed archive download, for large repositories or first syncs
+# "clone": shallow blobless sparse clone that only transfers the docs blobs
+FetchMode = Literal["api", "tarball", "clone"]
+
 
 class RepoDocs(BaseModel):
     """
@@ -19,62 +31,260 @@ class RepoDocs(BaseModel):
 
     readme_content: Optional[str] = None
     docs_content: Dict[str, str] = {}
+    # Filled when only changes since the last sync were requested
+    unchanged: List[str] = []
+    removed: List[str] = []
     error: Optional[str] = None
 
 
+def is_doc_path(path: str, docs_paths: Sequence[str]) -> bool:
+    """True for documentation files under one of `docs_paths` ("" or "/" selects the whole repository)."""
+    if not path.lower().endswith(DOC_EXTENSIONS):
+        return False
+    for docs_path in docs_paths:
+        docs_path = docs_path.strip("/")
+        if not docs_path or path == docs_path or path.startswith(docs_path + "/"):
+            return True
+    return False
+
+
+def is_readme_path(path: str) -> bool:
+    return "/" not in path and path.lower().startswith("readme") and path.lower().endswith(DOC_EXTENSIONS)
+
+
+def is_local_repo(repo: str) -> bool:
+    """True when `repo` is a path to a local (bare or working) git repository rather than "owner/name"."""
+    return repo.startswith(("/", ".", "~", "file://")) or Path(repo).expanduser().is_dir()
+
+
 class GithubService:
-    """Service for interacting with the GitHub API. Fetch docs and readme content. Saves to ChromaDB."""
+    """Service for interacting with the GitHub API. Fetch docs and readme content for the ingestion pipeline."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache: Optional[GithubCache] = None,
+    ):
         github_access_token = settings.GITHUB_ACCESS_TOKEN
         auth = None
         if github_access_token:
             auth = Auth.Token(github_access_token)
         self.client = Github(auth=auth)
 
-    def get_docs(self):
-        pass
+        self.token = github_access_token or None
+        self.api_url = api_url or settings.GITHUB_API_URL
+        self.max_concurrency = max_concurrency or settings.GITHUB_MAX_CONCURRENCY
+        # Lets tests point the service at an in-process fake GitHub
+        self.transport = transport
+        # Outlives the per-call clients so ETags, blobs and sync manifests carry over
+        self.cache = cache or GithubCache(settings.GITHUB_CACHE_PATH or None)
 
-    def _extract_readme(self, repo: Repository) -> str | None:
-        """Helper function to extract README content."""
-        try:
-            readme = repo.get_readme()
-            return readme.decoded_content.decode("utf-8")
-        except UnknownObjectException:
-            return None
-        except Exception:
-            return None
-
-    def _process_content_file(self, content_file: ContentFile, docs_content: Dict[str, str]) -> None:
-        """Helper function to process a single content file."""
-        if content_file.name.lower().endswith((".md", ".mdx", ".txt", ".rst")):
+    def _api(self) -> GithubClient:
+        return GithubClient(
+            token=self.token,
+            api_url=self.api_url,
+            max_concurrency=self.max_concurrency,
+            transport=self.transport,
+            cache=self.cache,
+        )
+
+    async def list_docs(
+        self, client: GithubClient, repo: str, docs_paths: Sequence[str] = ("docs",), ref: str = "HEAD"
+    ) -> List[Dict]:
+        """
+        Select the documentation blobs of a repository from a single recursive tree listing
+
+        Args:
+            client (GithubClient): Open API client
+            repo (str): "owner/name"
+            docs_paths (Sequence[str]): Directories (or single files) to include
+            ref (str): Branch, tag or commit SHA
+
+        Returns:
+            List[Dict]: Tree entries (path, sha, size) of the README and every doc file under `docs_paths`
+        """
+        entries, truncated = await client.get_tree(repo, ref)
+        if truncated:
+            # Over ~100k entries GitHub cuts the listing; fetch each docs directory's subtree on its own
+            logfire.warning(f"Tree of {repo}@{ref} was truncated; listing docs paths individually")
+            trees = {entry["path"]: entry["sha"] for entry in entries if entry["type"] == "tree"}
+            entries = [entry for entry in entries if "/" not in entry["path"]]
+            for docs_path in docs_paths:
+                docs_path = docs_path.strip("/")
+                if docs_path not in trees:
+                    continue
+                subtree, _ = await client.get_tree(repo, trees[docs_path])
+                entries.extend({**entry, "path": posixpath.join(docs_path, entry["path"])} for entry in subtree)
+
+        return [
+            entry
+            for entry in entries
+            if entry["type"] == "blob" and (is_readme_path(entry["path"]) or is_doc_path(entry["path"], docs_paths))
+        ]
+
+    async def iter_docs(
+        self,
+        repo: str,
+        docs_paths: Sequence[str] = ("docs",),
+        ref: str = "HEAD",
+        skip_unchanged: bool = False,
+        changes: Optional[Dict[str, List[str]]] = None,
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Fetch documentation files concurrently, yielding each one as soon as it arrives
+
+        Args:
+            repo (str): "owner/name"
+            docs_paths (Sequence[str]): Directories (or single files) to include
+            ref (str): Branch, tag or commit SHA
+            skip_unchanged (bool): Only yield files whose blob SHA differs from the last completed sync
+            changes (Optional[Dict[str, List[str]]]): Filled with the "unchanged" and "removed" paths
+                when `skip_unchanged` is set
+
+        Returns:
+            AsyncIterator[Tuple[str, str]]: (path, decoded text) pairs in completion order
+        """
+        manifest_key = f"{repo}@{ref}:{','.join(sorted(docs_paths))}"
+        async with self._api() as client:
+            entries = await self.list_docs(client, repo, docs_paths, ref)
+            current = {entry["path"]: entry["sha"] for entry in entries}
+            if skip_unchanged:
+                previous = self.cache.get_manifest(manifest_key)
+                unchanged = [entry["path"] for entry in entries if previous.get(entry["path"]) == entry["sha"]]
+                removed = sorted(set(previous) - set(current))
+                if changes is not None:
+                    changes["unchanged"] = unchanged
+                    changes["removed"] = removed
+                entries = [entry for entry in entries if previous.get(entry["path"]) != entry["sha"]]
+            logfire.info(f"Fetching {len(entries)} documentation files from {repo}@{ref}")
+
+            async def fetch(entry: Dict) -> Tuple[str, Optional[str]]:
+                content = await client.get_blob(repo, entry["sha"])
+                try:
+                    return entry["path"], content.decode("utf-8")
+                except UnicodeDecodeError as e:
+                    logfire.info(f"Warning: Error decoding content of {entry['path']}: {e}")
+                    return entry["path"], None
+
+            # The client's semaphore bounds how many of these are actually in flight
+            tasks = [asyncio.create_task(fetch(entry)) for entry in entries]
             try:
-                file_content = content_file.decoded_content.decode("utf-8")
-                docs_content[content_file.path] = file_content
-            except Exception as e:
-                logfire.info(f"Warning: Error decoding content of {content_file.path}: {e}")
+                for next_done in asyncio.as_completed(tasks):
+                    path, text = await next_done
+                    if text is not None:
+                        yield path, text
+                # Only a sync that got through every file may become the baseline for the next one
+                self.cache.put_manifest(manifest_key, current)
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+    async def iter_archive_docs(
+        self, repo: str, docs_paths: Sequence[str] = ("docs",), ref: str = "HEAD"
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Stream a repository tarball and yield its documentation files as they are unpacked
+
+        The archive is decompressed and parsed on the fly, so nothing but the current doc file is
+        held in memory or written to disk. A local repository path is archived with `git archive`.
+
+        Args:
+            repo (str): "owner/name", or the path of a local repository
+            docs_paths (Sequence[str]): Directories (or single files) to include
+            ref (str): Branch, tag or commit SHA
+
+        Returns:
+            AsyncIterator[Tuple[str, str]]: (path, decoded text) pairs in archive order
+        """
+
+        def select(path: str) -> bool:
+            return is_readme_path(path) or is_doc_path(path, docs_paths)
+
+        if is_local_repo(repo):
+            local_path = str(Path(repo.removeprefix("file://")).expanduser())
+            async for path, text in iter_tar_docs(git_archive_chunks(local_path, ref), select):
+                yield path, text
+            return
+
+        async with self._api() as client:
+            async with client.stream(f"/repos/{repo}/tarball/{ref}") as response:
+                async for path, text in iter_tar_docs(response.aiter_bytes(), select):
+                    yield path, text
+
+    async def iter_clone_docs(
+        self, repo: str, docs_paths: Sequence[str] = ("docs",), ref: str = "HEAD"
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Yield documentation files from a shallow, blobless, sparse clone
+
+        Args:
+            repo (str): "owner/name", or the path of a local repository
+            docs_paths (Sequence[str]): Directories (or single files) to include
+            ref (str): Branch or tag
+
+        Returns:
+            AsyncIterator[Tuple[str, str]]: (path, decoded text) pairs in path order
+        """
+        token = None
+        if is_local_repo(repo):
+            # file:// makes git honour --depth and --filter for local repositories
+            url = repo if repo.startswith("file://") else Path(repo).expanduser().resolve().as_uri()
         else:
-            logfire.info(f"Skipping non-text document in docs path: {content_file.path}")
+            # The token travels in the environment, never in the URL or argv
+            url = f"https://github.com/{repo}.git"
+            token = self.token or None
+
+        def select(path: str) -> bool:
+            return is_readme_path(path) or is_doc_path(path, docs_paths)
 
-    def _extract_docs_from_path(self, repo: Repository, docs_path: str) -> Dict[str, str]:
-        """Helper function to recursively extract documentation content from a given path."""
-        docs_content: Dict[str, str] = {}
+        async for path, text in iter_clone_docs(url, docs_paths, DOC_EXTENSIONS, select, ref, token=token):
+            yield path, text
+
+    async def get_docs(
+        self,
+        repo: str,
+        docs_paths: Sequence[str] = ("docs",),
+        ref: str = "HEAD",
+        skip_unchanged: bool = False,
+        mode: FetchMode = "api",
+    ) -> RepoDocs:
+        """
+        Collect a repository's README and documentation files
+
+        Args:
+            repo (str): "owner/name", or a local repository path in tarball and clone modes
+            docs_paths (Sequence[str]): Directories (or single files) to include
+            ref (str): Branch, tag or commit SHA
+            skip_unchanged (bool): Only return files changed since the last sync; unchanged and removed paths
+                are listed instead (api mode only)
+            mode (FetchMode): How to fetch: per-blob API calls, one tarball, or a sparse clone
+
+        Returns:
+            RepoDocs: README text, docs by path, or the error that stopped the fetch
+        """
+        docs = RepoDocs()
+        changes: Dict[str, List[str]] = {}
         try:
-            contents = repo.get_contents(docs_path)
-            if isinstance(contents, list):
-                for content_file in contents:
-                    if content_file.type == "file":
-                        self._process_content_file(content_file, docs_content)
-                    elif content_file.type == "dir":
-                        logfire.info(f"Entering subdirectory: {content_file.path}")
-                        docs_content.update(self._extract_docs_from_path(repo, content_file.path))
-            elif isinstance(contents, ContentFile):
-                self._process_content_file(contents, docs_content)
+            if mode == "tarball":
+                files = self.iter_archive_docs(repo, docs_paths, ref)
+            elif mode == "clone":
+                files = self.iter_clone_docs(repo, docs_paths, ref)
             else:
-                logfire.info(f"Warning: Unexpected content type at {docs_path} in {repo.full_name}")
-
-        except UnknownObjectException:
-            logfire.info(f"Info: No '{docs_path}' found in {repo.full_name}")
+                files = self.iter_docs(repo, docs_paths, ref, skip_unchanged, changes)
+            async for path, text in files:
+                if is_readme_path(path) and docs.readme_content is None:
+                    docs.readme_content = text
+                if is_doc_path(path, docs_paths):
+                    docs.docs_content[path] = text
+            docs.unchanged = changes.get("unchanged", [])
+            docs.removed = changes.get("removed", [])
+        except httpx.HTTPStatusError as e:
+            logfire.info(f"Warning: Error fetching docs from {repo}: {e}")
+            docs.error = f"GitHub returned {e.response.status_code} for {e.request.url.path}"
         except Exception as e:
-            logfire.info(f"Warning: Error accessing '{docs_path}' in {repo.full_name}: {e}")
-        return docs_content
+            message = redact_url(str(e))
+            logfire.info(f"Warning: Error fetching docs from {repo}: {message}")
+            docs.error = message
+        return docs
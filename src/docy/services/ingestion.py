@@ -0,0 +1,370 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Protocol, Sequence, Tuple, Union
+
+import logfire
+import numpy as np
+
+from docy.repositories import DocumentRepository
+from docy.schemas import DocumentIn
+
+from .chroma_service import ChromaService
+from .github_service import DOC_EXTENSIONS, FetchMode, GithubService
+from .markdown_chunker import MarkdownChunk, MarkdownChunker
+from .vectordb import EmbeddingModel
+
+_DONE = object()
+
+
+@dataclass
+class SourceDocument:
+    name: str
+    text: str
+    # Changes whenever the content does; compared against the checkpoint to skip unchanged documents
+    version: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class _Work:
+    document: SourceDocument
+    chunks: List[MarkdownChunk] = field(default_factory=list)
+    # Chunk texts as embedded and stored: the document name and heading trail, then the body
+    texts: List[str] = field(default_factory=list)
+    embeddings: Optional[np.ndarray] = None
+
+
+@dataclass
+class StageStats:
+    items: int = 0
+    # Seconds spent doing the stage's own work, not waiting on its neighbours
+    busy: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.items / self.busy if self.busy else 0.0
+
+
+def content_version(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+async def local_directory_source(
+    root: Union[str, Path], extensions: Sequence[str] = DOC_EXTENSIONS
+) -> AsyncIterator[SourceDocument]:
+    """Documentation files under a local directory, named by their path relative to `root`."""
+    root = Path(root)
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(name for name in dirnames if not name.startswith("."))
+        for filename in sorted(filenames):
+            if not filename.lower().endswith(tuple(extensions)):
+                continue
+            path = Path(dirpath) / filename
+            try:
+                text = await asyncio.to_thread(path.read_text, encoding="utf-8")
+            except (OSError, UnicodeDecodeError) as e:
+                logfire.info(f"Warning: Error reading {path}: {e}")
+                continue
+            name = path.relative_to(root).as_posix()
+            yield SourceDocument(name, text, content_version(text), {"source": "local", "path": name})
+
+
+async def github_source(
+    service: GithubService,
+    repo: str,
+    docs_paths: Sequence[str] = ("docs",),
+    ref: str = "HEAD",
+    mode: FetchMode = "api",
+) -> AsyncIterator[SourceDocument]:
+    """Documentation files of a GitHub (or local git) repository, named "<repo>/<path>"."""
+    if mode == "tarball":
+        files = service.iter_archive_docs(repo, docs_paths, ref)
+    elif mode == "clone":
+        files = service.iter_clone_docs(repo, docs_paths, ref)
+    else:
+        files = service.iter_docs(repo, docs_paths, ref)
+    async for path, text in files:
+        yield SourceDocument(
+            f"{repo}/{path}", text, content_version(text), {"source": "github", "repo": repo, "path": path}
+        )
+
+
+class IngestionSink(Protocol):
+    async def replace(
+        self, name: str, texts: List[str], embeddings: np.ndarray, metadatas: List[Dict[str, Any]]
+    ) -> None: ...
+
+    async def delete(self, name: str) -> None: ...
+
+
+class ChromaSink:
+    """Stores chunks in a Chroma collection with ids "<name>#<chunk>"."""
+
+    def __init__(self, chroma_service: ChromaService, collection_name: str = "docs"):
+        self.chroma_service = chroma_service
+        self.collection_name = collection_name
+        self.collection = chroma_service.get_or_create(collection_name, metadata={"hnsw:space": "cosine"})
+
+    async def replace(
+        self, name: str, texts: List[str], embeddings: np.ndarray, metadatas: List[Dict[str, Any]]
+    ) -> None:
+        def write():
+            # Chunk counts change between versions; drop the old chunks first
+            self.collection.delete(where={"name": name})
+            if texts:
+                self.chroma_service.upsert_documents(
+                    self.collection_name,
+                    texts,
+                    metadatas=[{**metadata, "name": name} for metadata in metadatas],
+                    ids=[f"{name}#{position}" for position in range(len(texts))],
+                    embeddings=list(embeddings),
+                )
+
+        await asyncio.to_thread(write)
+
+    async def delete(self, name: str) -> None:
+        await asyncio.to_thread(self.collection.delete, where={"name": name})
+
+
+class DocumentTableSink:
+    """Stores chunks as rows of the pgvector `document` table, replacing a document's rows in one transaction."""
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+
+    async def replace(
+        self, name: str, texts: List[str], embeddings: np.ndarray, metadatas: List[Dict[str, Any]]
+    ) -> None:
+        async with self.session_factory() as session:
+            repository = DocumentRepository(session)
+            await repository.delete_by_name(name, commit=False)
+            if not texts:
+                await session.commit()
+                return
+            await repository.insert_many(
+                [
+                    DocumentIn(name=name, content=text, doc_metadata=metadata, embedding=embedding.tolist())
+                    for text, embedding, metadata in zip(texts, embeddings, metadatas, strict=True)
+                ]
+            )
+
+    async def delete(self, name: str) -> None:
+        async with self.session_factory() as session:
+            await DocumentRepository(session).delete_by_name(name)
+
+
+class IngestionCheckpoint:
+    """
+    Name -> version map of the documents already stored, persisted as JSON.
+
+    Saved atomically every `save_every` updates and at the end of a run, so an interrupted run
+    resumes where it stopped and a repeated run skips everything unchanged.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, save_every: int = 50):
+        self.path = Path(path) if path else None
+        self.save_every = save_every
+        self.versions: Dict[str, str] = {}
+        self._unsaved = 0
+        if self.path and self.path.exists():
+            self.versions = json.loads(self.path.read_text(encoding="utf-8"))
+
+    def is_current(self, document: SourceDocument) -> bool:
+        return self.versions.get(document.name) == document.version
+
+    def record(self, name: str, version: Optional[str]) -> None:
+        if version is None:
+            self.versions.pop(name, None)
+        else:
+            self.versions[name] = version
+        self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            self.save()
+
+    def save(self) -> None:
+        self._unsaved = 0
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        tmp_path.write_text(json.dumps(self.versions), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+class IngestionPipeline:
+    """
+    fetch -> parse -> embed -> store, one asyncio task per stage.
+
+    Stages are connected by bounded queues, so fetching (I/O) overlaps chunking and embedding
+    (CPU, run in a worker thread) and a slow stage applies back-pressure instead of letting
+    documents pile up in memory. Chunks of several documents are embedded together in batches
+    of `batch_size`. Documents whose version matches the checkpoint are skipped at fetch time.
+
+    Args:
+        sink (IngestionSink): Where embedded chunks are stored
+        embedding_model (EmbeddingModel): Model used for the chunks
+        chunker (Optional[MarkdownChunker]): Chunker; default settings when omitted
+        checkpoint (Optional[IngestionCheckpoint]): Progress store; in-memory when omitted
+        batch_size (int): Chunks per embedding call
+        queue_size (int): Capacity of each inter-stage queue, in documents
+    """
+
+    def __init__(
+        self,
+        sink: IngestionSink,
+        embedding_model: EmbeddingModel,
+        chunker: Optional[MarkdownChunker] = None,
+        checkpoint: Optional[IngestionCheckpoint] = None,
+        batch_size: int = 64,
+        queue_size: int = 32,
+    ):
+        self.sink = sink
+        self.embedding_model = embedding_model
+        self.chunker = chunker or MarkdownChunker()
+        self.checkpoint = checkpoint or IngestionCheckpoint()
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.stats: Dict[str, StageStats] = {}
+
+    async def run(self, source: AsyncIterator[SourceDocument], prune: bool = False) -> Dict[str, Any]:
+        """
+        Ingest every document of `source`
+
+        Args:
+            source (AsyncIterator[SourceDocument]): Documents to ingest
+            prune (bool): After a complete run, delete stored documents the source no longer has
+
+        Returns:
+            Dict[str, Any]: Document counts and per-stage throughput (items/s of busy time)
+        """
+        self.stats = {stage: StageStats() for stage in ("fetch", "parse", "embed", "store")}
+        counts = {"seen": 0, "skipped": 0, "stored": 0, "chunks": 0, "pruned": 0}
+        seen: set = set()
+        parse_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        embed_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        store_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        started = time.perf_counter()
+
+        stages = [
+            asyncio.create_task(self._fetch(source, parse_queue, counts, seen)),
+            asyncio.create_task(self._parse(parse_queue, embed_queue)),
+            asyncio.create_task(self._embed(embed_queue, store_queue)),
+            asyncio.create_task(self._store(store_queue, counts)),
+        ]
+        try:
+            await asyncio.gather(*stages)
+        except BaseException:
+            for stage in stages:
+                stage.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+            self.checkpoint.save()
+            raise
+
+        if prune:
+            for name in sorted(set(self.checkpoint.versions) - seen):
+                await self.sink.delete(name)
+                self.checkpoint.record(name, None)
+                counts["pruned"] += 1
+        self.checkpoint.save()
+
+        elapsed = time.perf_counter() - started
+        report = {
+            **counts,
+            "elapsed": round(elapsed, 3),
+            "stages": {
+                stage: {"items": stats.items, "busy": round(stats.busy, 3), "per_second": round(stats.throughput, 1)}
+                for stage, stats in self.stats.items()
+            },
+        }
+        logfire.info(f"Ingestion finished: {report}")
+        return report
+
+    async def _fetch(self, source: AsyncIterator[SourceDocument], out: asyncio.Queue, counts: Dict, seen: set) -> None:
+        stats = self.stats["fetch"]
+        iterator = source.__aiter__()
+        while True:
+            start = time.perf_counter()
+            try:
+                document = await iterator.__anext__()
+            except StopAsyncIteration:
+                break
+            stats.busy += time.perf_counter() - start
+            stats.items += 1
+            counts["seen"] += 1
+            seen.add(document.name)
+            if self.checkpoint.is_current(document):
+                counts["skipped"] += 1
+                continue
+            await out.put(_Work(document))
+        await out.put(_DONE)
+
+    async def _parse(self, inbox: asyncio.Queue, out: asyncio.Queue) -> None:
+        stats = self.stats["parse"]
+        while (work := await inbox.get()) is not _DONE:
+            start = time.perf_counter()
+            work.chunks, work.texts = await asyncio.to_thread(self._chunk, work.document)
+            stats.busy += time.perf_counter() - start
+            stats.items += 1
+            await out.put(work)
+        await out.put(_DONE)
+
+    def _chunk(self, document: SourceDocument) -> Tuple[List[MarkdownChunk], List[str]]:
+        chunks = list(self.chunker.chunk(document.text))
+        return chunks, [chunk.with_context(document.name) for chunk in chunks]
+
+    async def _embed(self, inbox: asyncio.Queue, out: asyncio.Queue) -> None:
+        stats = self.stats["embed"]
+        batch: List[_Work] = []
+        batch_chunks = 0
+
+        async def flush():
+            nonlocal batch, batch_chunks
+            texts = [text for work in batch for text in work.texts]
+            start = time.perf_counter()
+            embeddings = await asyncio.to_thread(self._encode, texts) if texts else np.empty((0, 0))
+            stats.busy += time.perf_counter() - start
+            stats.items += len(texts)
+            offset = 0
+            for work in batch:
+                work.embeddings = embeddings[offset : offset + len(work.chunks)]
+                offset += len(work.chunks)
+                await out.put(work)
+            batch, batch_chunks = [], 0
+
+        while (work := await inbox.get()) is not _DONE:
+            batch.append(work)
+            batch_chunks += len(work.chunks)
+            if batch_chunks >= self.batch_size:
+                await flush()
+        if batch:
+            await flush()
+        await out.put(_DONE)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        # Documents are grouped until a batch is full, so a single call may hold more; keep calls at batch_size
+        parts = [
+            self.embedding_model.generate_embeddings(texts[start : start + self.batch_size])
+            for start in range(0, len(texts), self.batch_size)
+        ]
+        return np.concatenate(parts)
+
+    async def _store(self, inbox: asyncio.Queue, counts: Dict) -> None:
+        stats = self.stats["store"]
+        while (work := await inbox.get()) is not _DONE:
+            document = work.document
+            metadatas = [
+                {**document.metadata, "header": chunk.header or "", "chunk": position, "line": chunk.start_line}
+                for position, chunk in enumerate(work.chunks)
+            ]
+            start = time.perf_counter()
+            await self.sink.replace(document.name, work.texts, work.embeddings, metadatas)
+            stats.busy += time.perf_counter() - start
+            stats.items += 1
+            counts["stored"] += 1
+            counts["chunks"] += len(work.texts)
+            self.checkpoint.record(document.name, document.version)
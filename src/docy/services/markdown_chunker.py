@@ -0,0 +1,262 @@
+import io
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+HEADING_PATTERN = re.compile(r"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+FENCE_PATTERN = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def approximate_tokens(text: str) -> int:
+    """Word and punctuation count; close to (slightly under) a WordPiece token count for English prose."""
+    return len(TOKEN_PATTERN.findall(text))
+
+
+@dataclass
+class MarkdownChunk:
+    text: str
+    # Titles of the enclosing headings, outermost first
+    breadcrumbs: List[str]
+    # 1-based line of the first block that is new in this chunk (overlap excluded)
+    start_line: int
+    tokens: int
+
+    @property
+    def header(self) -> Optional[str]:
+        return self.breadcrumbs[-1] if self.breadcrumbs else None
+
+    def with_context(self, prefix: Optional[str] = None) -> str:
+        """Chunk text preceded by its breadcrumb trail, which is what should be embedded."""
+        trail = " > ".join(([prefix] if prefix else []) + self.breadcrumbs)
+        return f"{trail}\n{self.text}" if trail else self.text
+
+
+@dataclass
+class _Block:
+    kind: str  # "text", "code" or "table"
+    lines: List[str]
+    line: int
+    tokens: int = 0
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+
+class MarkdownChunker:
+    """
+    Streaming, structure-aware markdown chunker.
+
+    Reads the source line by line and yields chunks as soon as they are complete, so memory
+    stays bounded by `max_tokens` no matter how large the document is. Headings inside code
+    fences are left alone, code blocks and tables are only split between lines/rows (fences are
+    reopened and table headers repeated in every piece), and a chunk never spans two sections.
+    Consecutive chunks of one section share up to `overlap_tokens` of trailing context.
+
+    Args:
+        max_tokens (int): Upper bound on the tokens of one chunk
+        overlap_tokens (int): Tokens of the previous chunk repeated at the start of the next one
+        count_tokens (Optional[Callable[[str], int]]): Token counter, e.g. the embedding model's tokenizer;
+            defaults to `approximate_tokens`
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 256,
+        overlap_tokens: int = 32,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ):
+        if overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be smaller than max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.count_tokens = count_tokens or approximate_tokens
+
+    def chunk(self, source: Union[str, Iterable[str]]) -> Iterator[MarkdownChunk]:
+        """
+        Yield the chunks of a markdown document
+
+        Args:
+            source (Union[str, Iterable[str]]): Markdown text, or any iterable of lines such as an open file
+
+        Returns:
+            Iterator[MarkdownChunk]: Chunks in document order
+        """
+        lines = io.StringIO(source) if isinstance(source, str) else source
+        breadcrumbs: List[Tuple[int, str]] = []
+        pending: List[_Block] = []
+        pending_tokens = 0
+        # Leading blocks of `pending` that were carried over from the previous chunk
+        carried = 0
+
+        def emit() -> MarkdownChunk:
+            return MarkdownChunk(
+                text="\n\n".join(block.text for block in pending),
+                breadcrumbs=[title for _, title in breadcrumbs],
+                start_line=pending[carried].line,
+                tokens=pending_tokens,
+            )
+
+        for block in self._blocks(lines):
+            if block.kind == "heading":
+                if len(pending) > carried:
+                    yield emit()
+                pending, pending_tokens, carried = [], 0, 0
+                level, title = len(block.lines[0]), block.lines[1]
+                while breadcrumbs and breadcrumbs[-1][0] >= level:
+                    breadcrumbs.pop()
+                breadcrumbs.append((level, title))
+                continue
+
+            for piece in self._split(block):
+                if pending and pending_tokens + piece.tokens > self.max_tokens:
+                    if len(pending) > carried:
+                        yield emit()
+                        pending = self._overlap(pending)
+                    else:
+                        pending = []
+                    pending_tokens = sum(block.tokens for block in pending)
+                    carried = len(pending)
+                    if pending and pending_tokens + piece.tokens > self.max_tokens:
+                        pending, pending_tokens, carried = [], 0, 0
+                pending.append(piece)
+                pending_tokens += piece.tokens
+
+        if len(pending) > carried:
+            yield emit()
+
+    def _blocks(self, lines: Iterable[str]) -> Iterator[_Block]:
+        """Group lines into headings, paragraphs, fenced code blocks and tables."""
+        current: Optional[_Block] = None
+        fence: Optional[str] = None
+
+        def close() -> Optional[_Block]:
+            nonlocal current
+            block, current = current, None
+            if block is not None and block.lines:
+                block.tokens = self.count_tokens(block.text)
+                return block
+            return None
+
+        for number, line in enumerate(lines, start=1):
+            line = line.rstrip("\r\n")
+
+            if fence is not None:
+                current.lines.append(line)
+                stripped = line.strip()
+                if stripped.startswith(fence) and not stripped.lstrip(fence[0]):
+                    fence = None
+                    if (block := close()) is not None:
+                        yield block
+                continue
+
+            fence_match = FENCE_PATTERN.match(line)
+            if fence_match:
+                if (block := close()) is not None:
+                    yield block
+                fence = fence_match.group(1)
+                current = _Block("code", [line], number)
+                continue
+
+            heading_match = HEADING_PATTERN.match(line)
+            if heading_match:
+                if (block := close()) is not None:
+                    yield block
+                yield _Block("heading", [heading_match.group(1), (heading_match.group(2) or "").strip()], number)
+                continue
+
+            if not line.strip():
+                if (block := close()) is not None:
+                    yield block
+                continue
+
+            kind = "table" if line.lstrip().startswith("|") else "text"
+            if current is not None and current.kind != kind:
+                if (block := close()) is not None:
+                    yield block
+            if current is None:
+                current = _Block(kind, [], number)
+            current.lines.append(line)
+
+        # An unterminated fence runs to the end of the document, as in CommonMark
+        if (block := close()) is not None:
+            yield block
+
+    def _split(self, block: _Block) -> Iterator[_Block]:
+        """Break a block that alone exceeds `max_tokens` at the boundaries its kind allows."""
+        if block.tokens <= self.max_tokens:
+            yield block
+            return
+
+        if block.kind == "code":
+            opening = block.lines[0]
+            closing = block.lines[-1] if len(block.lines) > 1 and FENCE_PATTERN.match(block.lines[-1]) else None
+            body = block.lines[1:-1] if closing else block.lines[1:]
+            closing = closing or FENCE_PATTERN.match(opening).group(1)
+            yield from self._group_lines(block, body, [opening], [closing])
+        elif block.kind == "table":
+            # Keep the header row and the |---| separator with every piece
+            header = block.lines[:2] if len(block.lines) > 1 and set(block.lines[1].strip()) <= set("|:- ") else []
+            yield from self._group_lines(block, block.lines[len(header) :], header, [])
+        else:
+            yield from self._split_words(block)
+
+    def _group_lines(self, block: _Block, body: List[str], prefix: List[str], suffix: List[str]) -> Iterator[_Block]:
+        budget = self.max_tokens - self.count_tokens("\n".join(prefix + suffix))
+        piece: List[str] = []
+        piece_tokens = 0
+        start = block.line + len(prefix)
+        for offset, line in enumerate(body):
+            tokens = self.count_tokens(line)
+            if piece and piece_tokens + tokens > budget:
+                yield self._piece(block.kind, prefix + piece + suffix, start)
+                piece, piece_tokens, start = [], 0, block.line + len(prefix) + offset
+            piece.append(line)
+            piece_tokens += tokens
+        if piece:
+            yield self._piece(block.kind, prefix + piece + suffix, start)
+
+    def _split_words(self, block: _Block) -> Iterator[_Block]:
+        # Leave room for the overlap carried in from the previous piece
+        budget = self.max_tokens - self.overlap_tokens
+        words: List[str] = []
+        words_tokens = 0
+        for word in block.text.split():
+            tokens = self.count_tokens(word)
+            if words and words_tokens + tokens > budget:
+                yield self._piece("text", [" ".join(words)], block.line)
+                words, words_tokens = [], 0
+            words.append(word)
+            words_tokens += tokens
+        if words:
+            yield self._piece("text", [" ".join(words)], block.line)
+
+    def _piece(self, kind: str, lines: List[str], line: int) -> _Block:
+        piece = _Block(kind, lines, line)
+        piece.tokens = self.count_tokens(piece.text)
+        return piece
+
+    def _overlap(self, blocks: List[_Block]) -> List[_Block]:
+        """Trailing context carried into the next chunk: whole blocks, or the tail of a prose block."""
+        if not self.overlap_tokens:
+            return []
+        carried: List[_Block] = []
+        budget = self.overlap_tokens
+        for block in reversed(blocks):
+            if block.tokens <= budget:
+                carried.insert(0, block)
+                budget -= block.tokens
+                continue
+            if block.kind == "text" and not carried:
+                tail: List[str] = []
+                for word in reversed(block.text.split()):
+                    tokens = self.count_tokens(word)
+                    if tokens > budget:
+                        break
+                    tail.insert(0, word)
+                    budget -= tokens
+                if tail:
+                    carried.insert(0, self._piece("text", [" ".join(tail)], block.line))
+            break
+        return carried
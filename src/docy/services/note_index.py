@@ -0,0 +1,399 @@
+import bisect
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import frontmatter
+
+INDEX_DIR_NAME = ".docy"
+INDEX_FILE_NAME = "note_index.json"
+INDEX_VERSION = 1
+
+SORT_KEYS: Dict[str, Callable[["NoteEntry"], tuple]] = {
+    "title": lambda entry: (entry.title.lower(), entry.id),
+    "mtime": lambda entry: (entry.mtime_ns, entry.id),
+    "folder": lambda entry: (entry.folder.lower(), entry.title.lower(), entry.id),
+}
+
+WIKI_LINK_PATTERN = re.compile(r"\[\[(.*?)\]\]")
+TAG_PATTERN = re.compile(r"#(\w+)")
+
+
+def link_key(target: str) -> str:
+    """
+    Normalize a wikilink target to the key used for resolution.
+
+    `[[Folder/Note#Heading|Alias]]` and `[[folder/note.md]]` both map to `folder/note`.
+    """
+    target = target.split("|")[0].split("#")[0].split("^")[0].strip()
+    if target.lower().endswith(".md"):
+        target = target[:-3]
+    return target.replace("\\", "/").strip("/").lower()
+
+
+@dataclass
+class NoteEntry:
+    """Metadata kept in the index for a single note. Never holds the note body."""
+
+    id: str
+    title: str
+    folder: str
+    mtime_ns: int
+    size: int
+    tags: List[str] = field(default_factory=list)
+    links: List[str] = field(default_factory=list)
+
+    @property
+    def name_keys(self) -> Set[str]:
+        """Keys other notes can use to link to this note: path, file stem and title."""
+        stem_path = self.id[:-3] if self.id.endswith(".md") else self.id
+        return {stem_path.lower(), Path(stem_path).name.lower(), self.title.strip().lower()}
+
+
+class NoteIndex:
+    """
+    Persistent link and tag index for a vault.
+
+    Only per-note metadata (title, tags, raw link keys, stat info) is persisted. The inverted
+    maps are rebuilt from it on load, and link resolution happens at query time against them,
+    so adding or removing a note never requires re-reading the notes that link to it.
+    """
+
+    def __init__(self, vault_path: Path, refresh_interval: float = 30.0):
+        self.vault_path = Path(vault_path)
+        self.index_path = self.vault_path / INDEX_DIR_NAME / INDEX_FILE_NAME
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.RLock()
+        self._entries: Dict[str, NoteEntry] = {}
+        self._names: Dict[str, Set[str]] = {}
+        self._referrers: Dict[str, Set[str]] = {}
+        self._tags: Dict[str, Set[str]] = {}
+        # Sorted (sort key, id) lists, built on first use and maintained with bisect afterwards
+        self._orders: Dict[str, List[tuple]] = {}
+        self._last_refresh = 0.0
+        self._loaded = False
+        self._dirty = False
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def load(self) -> None:
+        """Load the persisted index, if any. Corrupt or outdated files are ignored."""
+        with self._lock:
+            self._loaded = True
+            if not self.index_path.exists():
+                return
+            try:
+                data = json.loads(self.index_path.read_text(encoding="utf-8"))
+                if data.get("version") != INDEX_VERSION:
+                    return
+                for raw in data.get("notes", []):
+                    self._add(NoteEntry(**raw))
+            except (OSError, ValueError, TypeError) as e:
+                print(f"Ignoring unreadable note index {self.index_path}: {e}")
+                self._clear()
+
+    def save(self) -> None:
+        """Persist the index next to the vault contents."""
+        with self._lock:
+            data = {"version": INDEX_VERSION, "notes": [asdict(entry) for entry in self._entries.values()]}
+            self._dirty = False
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp_path, self.index_path)
+
+    def refresh(self) -> bool:
+        """
+        Reconcile the index with the vault on disk.
+
+        Only notes whose mtime or size changed are re-read; everything else costs a stat.
+
+        Returns:
+            bool: True if anything changed
+        """
+        with self._lock:
+            if not self._loaded:
+                self.load()
+
+            changed = False
+            seen: Set[str] = set()
+            for note_id, stat in self._scan():
+                seen.add(note_id)
+                entry = self._entries.get(note_id)
+                if entry and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                    continue
+                self.update_note(self.vault_path / note_id, stat=stat)
+                changed = True
+
+            for note_id in set(self._entries) - seen:
+                self._remove(note_id)
+                changed = True
+
+            self._last_refresh = time.monotonic()
+            if changed or self._dirty:
+                self.save()
+            return changed
+
+    def ensure_fresh(self) -> None:
+        """
+        Refresh the index if it was never built or is older than `refresh_interval`.
+
+        Scans the vault, so async callers should run it in a worker thread.
+        """
+        with self._lock:
+            if not self._loaded or time.monotonic() - self._last_refresh > self.refresh_interval:
+                self.refresh()
+
+    def _scan(self) -> Iterator[Tuple[str, os.stat_result]]:
+        """Yield (note id, stat) for every markdown file, skipping hidden directories."""
+        stack = [self.vault_path]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for dir_entry in it:
+                        if dir_entry.name.startswith("."):
+                            continue
+                        if dir_entry.is_dir(follow_symlinks=False):
+                            stack.append(Path(dir_entry.path))
+                        elif dir_entry.name.endswith(".md") and dir_entry.is_file():
+                            note_id = Path(dir_entry.path).relative_to(self.vault_path).as_posix()
+                            yield note_id, dir_entry.stat()
+            except OSError as e:
+                print(f"Error scanning {directory}: {e}")
+
+    # -- incremental updates -----------------------------------------------
+
+    def note_id(self, note_path: Path | str) -> str:
+        """Return the vault-relative id of a note path."""
+        note_path = Path(note_path)
+        try:
+            return note_path.relative_to(self.vault_path).as_posix()
+        except ValueError:
+            pass
+        try:
+            return note_path.resolve().relative_to(self.vault_path.resolve()).as_posix()
+        except ValueError:
+            return note_path.as_posix()
+
+    def update_note(
+        self,
+        note_path: Path | str,
+        post: Optional[frontmatter.Post] = None,
+        stat: Optional[os.stat_result] = None,
+    ) -> Optional[NoteEntry]:
+        """
+        Index (or re-index) a single note.
+
+        Args:
+            note_path (Path or str): Path to the note file
+            post (frontmatter.Post, optional): Already-parsed note, avoids re-reading the file
+            stat (os.stat_result, optional): Already-known stat of the file
+
+        Returns:
+            NoteEntry: The new entry, or None if the note could not be read
+        """
+        note_path = self.vault_path / self.note_id(note_path)
+        note_id = self.note_id(note_path)
+        try:
+            if post is None:
+                with open(note_path, "r", encoding="utf-8") as file:
+                    post = frontmatter.load(file)
+            stat = stat or note_path.stat()
+        except Exception as e:
+            print(f"Error indexing note {note_path}: {e}")
+            with self._lock:
+                self._remove(note_id)
+            return None
+
+        entry = NoteEntry(
+            id=note_id,
+            title=str(post.metadata.get("title") or note_path.stem),
+            folder=Path(note_id).parent.as_posix() if "/" in note_id else "",
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            tags=self._extract_tags(post),
+            links=sorted({link_key(link) for link in WIKI_LINK_PATTERN.findall(post.content)} - {""}),
+        )
+        with self._lock:
+            self._remove(note_id)
+            self._add(entry)
+            self._dirty = True
+        return entry
+
+    def remove_note(self, note_path: Path | str) -> None:
+        """Drop a note from the index."""
+        with self._lock:
+            self._remove(self.note_id(note_path))
+            self._dirty = True
+
+    @staticmethod
+    def _extract_tags(post: frontmatter.Post) -> List[str]:
+        tags = post.metadata.get("tags") or []
+        if isinstance(tags, str):
+            tags = [tag.strip() for tag in tags.replace(",", " ").split()]
+        found = {str(tag).lstrip("#").lower() for tag in tags if tag}
+        found.update(tag.lower() for tag in TAG_PATTERN.findall(post.content))
+        return sorted(found)
+
+    def _add(self, entry: NoteEntry) -> None:
+        self._entries[entry.id] = entry
+        for key in entry.name_keys:
+            self._names.setdefault(key, set()).add(entry.id)
+        for key in entry.links:
+            self._referrers.setdefault(key, set()).add(entry.id)
+        for tag in entry.tags:
+            self._tags.setdefault(tag, set()).add(entry.id)
+        for sort, order in self._orders.items():
+            bisect.insort(order, SORT_KEYS[sort](entry))
+
+    def _remove(self, note_id: str) -> None:
+        entry = self._entries.pop(note_id, None)
+        if entry is None:
+            return
+        for mapping, keys in ((self._names, entry.name_keys), (self._referrers, entry.links), (self._tags, entry.tags)):
+            for key in keys:
+                ids = mapping.get(key)
+                if ids is not None:
+                    ids.discard(note_id)
+                    if not ids:
+                        del mapping[key]
+        for sort, order in self._orders.items():
+            key = SORT_KEYS[sort](entry)
+            position = bisect.bisect_left(order, key)
+            if position < len(order) and order[position] == key:
+                del order[position]
+
+    def _clear(self) -> None:
+        self._entries.clear()
+        self._names.clear()
+        self._referrers.clear()
+        self._tags.clear()
+        self._orders.clear()
+
+    # -- queries -----------------------------------------------------------
+    #
+    # Every query holds the (re-entrant) lock, so a concurrent refresh or update is never
+    # observed half-applied and the inverted maps don't change size under iteration.
+
+    def get(self, note_id: str) -> Optional[NoteEntry]:
+        with self._lock:
+            return self._entries.get(note_id)
+
+    def entries(self) -> List[NoteEntry]:
+        with self._lock:
+            return list(self._entries.values())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def page(self, sort: str = "title", descending: bool = False, offset: int = 0, limit: int = 50) -> List[NoteEntry]:
+        """
+        Return a slice of notes in sort order without touching the files.
+
+        The sorted order is kept up to date incrementally, so any page costs O(limit).
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        with self._lock:
+            order = self._orders.get(sort)
+            if order is None:
+                order = self._orders[sort] = sorted(SORT_KEYS[sort](entry) for entry in self._entries.values())
+            if descending:
+                start = max(len(order) - offset - limit, 0)
+                rows = reversed(order[start : max(len(order) - offset, 0)])
+            else:
+                rows = order[offset : offset + limit]
+            return [self._entries[row[-1]] for row in rows]
+
+    def resolve(self, key: str) -> Optional[str]:
+        """
+        Resolve a link key (or a user supplied note reference) to a note id.
+
+        Ambiguous names resolve to the note with the shortest path, like Obsidian does.
+        """
+        with self._lock:
+            if key in self._entries:
+                return key
+            if f"{key}.md" in self._entries:
+                return f"{key}.md"
+            candidates = self._names.get(link_key(key))
+            if not candidates:
+                return None
+            return min(candidates, key=lambda note_id: (note_id.count("/"), len(note_id), note_id))
+
+    def outgoing(self, note_id: str) -> List[str]:
+        """Ids of notes this note links to."""
+        with self._lock:
+            entry = self._entries.get(note_id)
+            if entry is None:
+                return []
+            return sorted({target for target in map(self.resolve, entry.links) if target and target != note_id})
+
+    def unresolved(self, note_id: str) -> List[str]:
+        """Link keys in this note that don't point at any note in the vault."""
+        with self._lock:
+            entry = self._entries.get(note_id)
+            if entry is None:
+                return []
+            return [key for key in entry.links if self.resolve(key) is None]
+
+    def backlinks(self, note_id: str) -> List[str]:
+        """Ids of notes linking to this note."""
+        with self._lock:
+            entry = self._entries.get(note_id)
+            if entry is None:
+                return []
+            sources: Set[str] = set()
+            for key in entry.name_keys:
+                referrers = self._referrers.get(key)
+                if referrers and self.resolve(key) == note_id:
+                    sources.update(referrers)
+            sources.discard(note_id)
+            return sorted(sources)
+
+    def notes_with_tag(self, tag: str) -> List[str]:
+        with self._lock:
+            return sorted(self._tags.get(tag.lstrip("#").lower(), ()))
+
+    def neighborhood(
+        self, note_id: str, depth: int = 1
+    ) -> Tuple[List[str], List[Tuple[str, str]], Dict[str, List[str]]]:
+        """
+        Breadth-first walk over outgoing links and backlinks.
+
+        Returns:
+            tuple: (node ids, (source, target) edges, unresolved link keys per visited note)
+        """
+        with self._lock:
+            nodes = {note_id}
+            edges: Set[Tuple[str, str]] = set()
+            unresolved: Dict[str, List[str]] = {}
+            frontier = [note_id]
+            for level in range(depth + 1):
+                next_frontier = []
+                for current in frontier:
+                    missing = self.unresolved(current)
+                    if missing:
+                        unresolved[current] = missing
+                    if level == depth:
+                        continue
+                    for target in self.outgoing(current):
+                        edges.add((current, target))
+                        if target not in nodes:
+                            nodes.add(target)
+                            next_frontier.append(target)
+                    for source in self.backlinks(current):
+                        edges.add((source, current))
+                        if source not in nodes:
+                            nodes.add(source)
+                            next_frontier.append(source)
+                frontier = next_frontier
+            return sorted(nodes), sorted(edges), unresolved
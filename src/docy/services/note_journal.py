@@ -0,0 +1,111 @@
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+JOURNAL_DIR_NAME = "journal"
+
+
+def fsync_directory(directory: Path) -> None:
+    """Flush a directory entry so renames inside it survive a crash. No-op where unsupported."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class NoteJournal:
+    """
+    Write-ahead journal for batched note writes.
+
+    A batch is written in four steps:
+
+    1. `begin` records every (temp file, target) pair in a journal file.
+    2. The caller writes and fsyncs all temp files.
+    3. `commit` marks the journal committed, then renames every temp file over its target.
+    4. `finish` deletes the journal.
+
+    After a crash `recover` rolls committed batches forward (finishing the renames) and rolls
+    uncommitted ones back (deleting their temp files), so a note is always either fully old or
+    fully new, never truncated.
+    """
+
+    def __init__(self, state_dir: Path):
+        self.journal_dir = Path(state_dir) / JOURNAL_DIR_NAME
+
+    def begin(self, targets: Sequence[Path]) -> Tuple[str, List[Tuple[Path, Path]]]:
+        """
+        Start a batch and assign a temp file next to each target.
+
+        Returns:
+            tuple: The batch id and the list of (temp path, target path) pairs
+        """
+        batch_id = uuid.uuid4().hex
+        targets = [Path(target).absolute() for target in targets]
+        pairs = [(target.with_name(f".{target.name}.{batch_id}.tmp"), target) for target in targets]
+        self._write(batch_id, pairs, committed=False)
+        return batch_id, pairs
+
+    def commit(self, batch_id: str, pairs: Sequence[Tuple[Path, Path]]) -> None:
+        """Mark the batch durable, then move every temp file into place."""
+        self._write(batch_id, pairs, committed=True)
+        for tmp_path, target in pairs:
+            os.replace(tmp_path, target)
+        for directory in {target.parent for _, target in pairs}:
+            fsync_directory(directory)
+
+    def finish(self, batch_id: str) -> None:
+        self._path(batch_id).unlink(missing_ok=True)
+
+    def abort(self, batch_id: str, pairs: Sequence[Tuple[Path, Path]]) -> None:
+        """Discard a batch that failed before commit."""
+        for tmp_path, _ in pairs:
+            tmp_path.unlink(missing_ok=True)
+        self.finish(batch_id)
+
+    def recover(self) -> List[Path]:
+        """
+        Resolve batches interrupted by a crash.
+
+        Returns:
+            list: Target paths that were rolled forward and need re-indexing
+        """
+        recovered: List[Path] = []
+        if not self.journal_dir.exists():
+            return recovered
+        for journal_path in self.journal_dir.glob("*.json"):
+            try:
+                record: Dict = json.loads(journal_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                print(f"Skipping unreadable journal {journal_path}: {e}")
+                continue
+            pairs = [(Path(tmp), Path(target)) for tmp, target in record.get("files", [])]
+            if record.get("committed"):
+                for tmp_path, target in pairs:
+                    if tmp_path.exists():
+                        os.replace(tmp_path, target)
+                    recovered.append(target)
+            else:
+                for tmp_path, _ in pairs:
+                    tmp_path.unlink(missing_ok=True)
+            journal_path.unlink(missing_ok=True)
+        return recovered
+
+    def _path(self, batch_id: str) -> Path:
+        return self.journal_dir / f"{batch_id}.json"
+
+    def _write(self, batch_id: str, pairs: Sequence[Tuple[Path, Path]], committed: bool) -> None:
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        record = {"committed": committed, "files": [[str(tmp), str(target)] for tmp, target in pairs]}
+        journal_path = self._path(batch_id)
+        tmp_journal = journal_path.with_suffix(".json.tmp")
+        with open(tmp_journal, "w", encoding="utf-8") as file:
+            json.dump(record, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_journal, journal_path)
+        fsync_directory(self.journal_dir)
@@ -0,0 +1,189 @@
+import hashlib
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import frontmatter
+
+from .chroma_service import ChromaService
+from .markdown_chunker import MarkdownChunker
+from .note_service import NoteService
+from .vectordb import EmbeddingModel
+
+NOTES_COLLECTION = "notes"
+
+
+class NoteSemanticIndex:
+    """
+    Keeps the chunks of every vault note embedded in a Chroma collection.
+
+    Section ids are derived from the section's content hash, so a section that did not change
+    keeps its id and is never re-embedded, no matter where it moves inside the note.
+    Notes whose mtime matches the last sync are not even read.
+
+    Searching never syncs; the collection is brought up to date by `sync`, e.g. from
+    `POST /notes/semantic-index`. Concurrent syncs are serialized.
+    """
+
+    def __init__(
+        self,
+        note_service: NoteService,
+        chroma_service: ChromaService,
+        embedding_model: EmbeddingModel,
+        collection_name: str = NOTES_COLLECTION,
+        batch_size: int = 64,
+    ):
+        self.note_service = note_service
+        self.embedding_model = embedding_model
+        self.chunker = MarkdownChunker()
+        self.batch_size = batch_size
+        self.collection = chroma_service.get_or_create(collection_name, metadata={"hnsw:space": "cosine"})
+
+        # note id -> mtime_ns of the version currently embedded; None until the first sync
+        self._synced: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+
+    def _load_synced(self) -> Dict[str, int]:
+        """Rebuild the note -> mtime map from the collection metadata (no embeddings fetched)."""
+        synced: Dict[str, int] = {}
+        existing = self.collection.get(include=["metadatas"])
+        for metadata in existing["metadatas"] or []:
+            synced[metadata["note_id"]] = metadata["mtime_ns"]
+        return synced
+
+    def sync(self) -> Dict[str, int]:
+        """
+        Bring the collection up to date with the vault
+
+        Returns:
+            dict: Counts of notes scanned, sections embedded and sections deleted
+        """
+        with self._lock:
+            return self._sync()
+
+    def _sync(self) -> Dict[str, int]:
+        index = self.note_service.index
+        index.ensure_fresh()
+        if self._synced is None:
+            self._synced = self._load_synced()
+
+        stats = {"notes": 0, "embedded": 0, "deleted": 0}
+        pending_ids: List[str] = []
+        pending_texts: List[str] = []
+        pending_metadatas: List[Dict] = []
+        # Notes read completely whose last sections are still pending: (note id, mtime_ns, unchanged ids)
+        completed: List[Tuple[str, int, List[str]]] = []
+
+        def mark_synced(note_id: str, mtime_ns: int, unchanged: List[str]):
+            # Unchanged sections still carry the old mtime; bump it so a restart doesn't re-read the note
+            if unchanged:
+                self.collection.update(ids=unchanged, metadatas=[{"mtime_ns": mtime_ns}] * len(unchanged))
+            self._synced[note_id] = mtime_ns
+
+        def flush():
+            if not pending_ids:
+                return
+            embeddings = self.embedding_model.generate_embeddings(pending_texts)
+            self.collection.upsert(
+                ids=list(pending_ids),
+                embeddings=[embedding.tolist() for embedding in embeddings],
+                documents=list(pending_texts),
+                metadatas=list(pending_metadatas),
+            )
+            stats["embedded"] += len(pending_ids)
+            pending_ids.clear()
+            pending_texts.clear()
+            pending_metadatas.clear()
+            # Only now are these notes fully embedded; a failed batch leaves them to the next sync
+            for note in completed:
+                mark_synced(*note)
+            completed.clear()
+
+        for entry in index.entries():
+            if self._synced.get(entry.id) == entry.mtime_ns:
+                continue
+            stats["notes"] += 1
+
+            try:
+                with open(self.note_service.vault_path / entry.id, "r", encoding="utf-8") as file:
+                    post = frontmatter.load(file)
+            except Exception as e:
+                print(f"Error reading note {entry.id}: {e}")
+                continue
+
+            existing = set(self.collection.get(where={"note_id": entry.id}, include=[])["ids"])
+            wanted = set()
+            occurrences: Dict[str, int] = {}
+            for chunk in self.chunker.chunk(post.content):
+                # Note title and heading trail give the chunk its context
+                text = chunk.with_context(entry.title)
+                digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+                occurrences[digest] = occurrences.get(digest, 0) + 1
+                section_id = f"{entry.id}#{digest}-{occurrences[digest]}"
+                wanted.add(section_id)
+                if section_id in existing:
+                    continue
+                pending_ids.append(section_id)
+                pending_texts.append(text)
+                pending_metadatas.append(
+                    {
+                        "note_id": entry.id,
+                        "title": entry.title,
+                        "header": chunk.header or "",
+                        "mtime_ns": entry.mtime_ns,
+                    }
+                )
+                if len(pending_ids) >= self.batch_size:
+                    flush()
+
+            stale = sorted(existing - wanted)
+            if stale:
+                self.collection.delete(ids=stale)
+                stats["deleted"] += len(stale)
+            unchanged = sorted(existing & wanted)
+            if pending_ids:
+                completed.append((entry.id, entry.mtime_ns, unchanged))
+            else:
+                mark_synced(entry.id, entry.mtime_ns, unchanged)
+
+        flush()
+
+        for note_id in [note_id for note_id in self._synced if index.get(note_id) is None]:
+            stale = self.collection.get(where={"note_id": note_id}, include=[])["ids"]
+            if stale:
+                self.collection.delete(ids=stale)
+                stats["deleted"] += len(stale)
+            del self._synced[note_id]
+
+        return stats
+
+    def search(self, query: str, k: int = 5) -> List[Dict]:
+        """
+        Find the note sections closest to the query, as of the last `sync`
+
+        Args:
+            query (str): Natural language query
+            k (int): Number of sections to return
+
+        Returns:
+            list: Sections with note id, title, header, text and cosine similarity score
+        """
+        query_embedding = self.embedding_model.generate_embeddings([query])[0]
+        results = self.collection.query(
+            query_embeddings=[query_embedding.tolist()],
+            n_results=k,
+            include=["documents", "metadatas", "distances"],
+        )
+        sections = []
+        for document, metadata, distance in zip(
+            results["documents"][0], results["metadatas"][0], results["distances"][0], strict=True
+        ):
+            sections.append(
+                {
+                    "note_id": metadata["note_id"],
+                    "title": metadata["title"],
+                    "header": metadata["header"] or None,
+                    "text": document,
+                    "score": 1.0 - distance,
+                }
+            )
+        return sections
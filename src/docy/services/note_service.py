@@ -1,24 +1,62 @@
+import os
 import re
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 import frontmatter
 import yaml
 from slugify import slugify
 
+from .note_index import INDEX_DIR_NAME, NoteIndex
+from .note_journal import NoteJournal
+
+try:
+    from yaml import CSafeDumper as YamlDumper
+except ImportError:  # libyaml not available
+    from yaml import SafeDumper as YamlDumper
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+def compile_template(text: str) -> List[str]:
+    """
+    Split a template into alternating literal text and placeholder names.
+
+    Even positions are literals, odd positions are names, so rendering is a single join.
+    """
+    return PLACEHOLDER_PATTERN.split(text)
+
+
+def render_template(parts: List[str], variables: Dict[str, str]) -> str:
+    """Fill a compiled template. Unknown placeholders are kept as written."""
+    rendered = []
+    for position, part in enumerate(parts):
+        if position % 2 == 0:
+            rendered.append(part)
+        else:
+            rendered.append(variables.get(part, "{{" + part + "}}"))
+    return "".join(rendered)
+
 
 class NoteService:
-    def __init__(self, vault_path: str):
+    def __init__(self, vault_path: str, index_refresh_interval: float = 30.0):
         """
         Initialize the NoteService with the path to your vault
 
         Args:
             vault_path (str): The path to your vault directory
+            index_refresh_interval (float): Seconds before the note index re-checks the vault for outside edits
         """
         self.vault_path = Path(vault_path)
         if not self.vault_path.exists():
             raise ValueError(f"Vault path does not exist: {vault_path}")
+        self.index = NoteIndex(self.vault_path, refresh_interval=index_refresh_interval)
+        self.journal = NoteJournal(self.vault_path / INDEX_DIR_NAME)
+        # template name -> (mtime_ns, compiled template)
+        self._templates: Dict[str, Tuple[int, List[str]]] = {}
+        # Finish or roll back batches interrupted by a crash; the index picks them up by mtime
+        self.journal.recover()
 
     def get_all_notes(self):
         """
@@ -43,14 +81,7 @@ class NoteService:
         try:
             with open(note_path, "r", encoding="utf-8") as file:
                 post = frontmatter.load(file)
-                return {
-                    "title": note_path.stem,
-                    "path": str(note_path),
-                    "metadata": post.metadata,
-                    "content": post.content,
-                    "created": datetime.fromtimestamp(note_path.stat().st_ctime),
-                    "modified": datetime.fromtimestamp(note_path.stat().st_mtime),
-                }
+            return self._note_dict(note_path, post, note_path.stat())
         except Exception as e:
             print(f"Error reading note {note_path}: {e}")
             return None
@@ -97,6 +128,80 @@ class NoteService:
         """
         return re.findall(r"#(\w+)", content)
 
+    def list_notes(self, sort: str = "title", descending: bool = False, offset: int = 0, limit: int = 50):
+        """
+        List notes from the index without reading their content
+
+        Args:
+            sort (str): One of "title", "mtime" or "folder"
+            descending (bool): Reverse the sort order
+            offset (int): Number of notes to skip
+            limit (int): Number of notes to return
+
+        Returns:
+            tuple: Total number of notes and the list of index entries for the page
+        """
+        self.index.ensure_fresh()
+        return len(self.index), self.index.page(sort, descending, offset, limit)
+
+    def resolve_note(self, note_ref: str) -> Optional[str]:
+        """
+        Resolve a note path, file name or title to its id in the index
+
+        Args:
+            note_ref (str): Vault-relative path, file stem or title
+
+        Returns:
+            str: The vault-relative note id, or None if no note matches
+        """
+        self.index.ensure_fresh()
+        return self.index.resolve(self.index.note_id(note_ref))
+
+    def get_backlinks(self, note_id: str):
+        """
+        Get the notes linking to a note
+
+        Args:
+            note_id (str): Vault-relative note id
+
+        Returns:
+            list: List of index entries for the linking notes
+        """
+        self.index.ensure_fresh()
+        return [self.index.get(source) for source in self.index.backlinks(note_id)]
+
+    def get_notes_by_tag(self, tag: str):
+        """
+        Get all notes carrying a tag, from frontmatter or inline
+
+        Args:
+            tag (str): Tag name, with or without leading '#'
+
+        Returns:
+            list: List of index entries for the tagged notes
+        """
+        self.index.ensure_fresh()
+        return [self.index.get(note_id) for note_id in self.index.notes_with_tag(tag)]
+
+    def get_graph(self, note_id: str, depth: int = 1):
+        """
+        Get the link neighborhood of a note
+
+        Args:
+            note_id (str): Vault-relative note id
+            depth (int): Number of link hops to follow in either direction
+
+        Returns:
+            dict: Nodes (index entries), edges and unresolved links of the neighborhood
+        """
+        self.index.ensure_fresh()
+        nodes, edges, unresolved = self.index.neighborhood(note_id, depth)
+        return {
+            "nodes": [self.index.get(node) for node in nodes],
+            "edges": [{"source": source, "target": target} for source, target in edges],
+            "unresolved": unresolved,
+        }
+
     def get_recent_notes(self, limit: int = 10):
         """
         Get the most recently modified notes
@@ -107,11 +212,13 @@ class NoteService:
         Returns:
             list: List of recent notes
         """
-        notes = [(note_path, note_path.stat().st_mtime) for note_path in self.get_all_notes()]
-        notes.sort(key=lambda x: x[1], reverse=True)
-        return [self.read_note(note_path) for note_path, _ in notes[:limit]]
+        self.index.ensure_fresh()
+        entries = self.index.page("mtime", descending=True, limit=limit)
+        return [self.read_note(self.vault_path / entry.id) for entry in entries]
 
-    def create_note(self, title: str, content: Optional[str] = "", metadata=None, folder=None, template=None):
+    def create_note(
+        self, title: str, content: Optional[str] = "", metadata=None, folder=None, template=None, variables=None
+    ):
         """
         Create a new note in the Obsidian vault
 
@@ -121,10 +228,52 @@ class NoteService:
             metadata (dict, optional): YAML frontmatter metadata
             folder (str, optional): Subfolder path within the vault
             template (str, optional): Name of template to use
+            variables (dict, optional): Extra `{{placeholder}}` values for the template
 
         Returns:
             Path: Path object of the created note
         """
+        try:
+            pending = self._prepare_create(title, content, metadata, folder, template, variables)
+            return Path(self._commit_writes([pending])[0]["path"])
+        except Exception as e:
+            raise Exception(f"Failed to create note: {e}") from e
+
+    def write_notes(self, creates: Optional[List[dict]] = None, updates: Optional[List[dict]] = None, durable=True):
+        """
+        Create and update many notes in one crash-safe batch
+
+        Every note is written to a temp file first and renamed into place only once the whole
+        batch is on disk, so a crash leaves each note either fully old or fully new.
+
+        Args:
+            creates (list, optional): Keyword arguments for `create_note`, one dict per note
+            updates (list, optional): Keyword arguments for `update_note`, one dict per note
+            durable (bool): fsync the batch before renaming; disable for scratch notes
+
+        Returns:
+            list: Note dictionaries, in the same shape as `read_note`, creates first
+
+        Raises:
+            FileNotFoundError: If a note to update does not exist
+            ValueError: If the batch writes the same note twice
+        """
+        pending = [self._prepare_create(**create) for create in creates or []]
+        pending += [self._prepare_update(**update) for update in updates or []]
+        if not pending:
+            return []
+        targets = [note_path.absolute() for note_path, _, _ in pending]
+        if len(set(targets)) != len(targets):
+            raise ValueError("A batch cannot write the same note more than once")
+        return self._commit_writes(pending, durable=durable)
+
+    def _prepare_create(
+        self, title: str, content: Optional[str] = "", metadata=None, folder=None, template=None, variables=None
+    ):
+        """Render a new note. Returns (note path, file text, parsed post)."""
+        content = content or ""
+        now = datetime.now()
+
         # Create a filename-safe version of the title
         safe_filename = slugify(title) + ".md"
 
@@ -137,7 +286,7 @@ class NoteService:
             note_path = self.vault_path / safe_filename
 
         # Initialize default metadata
-        default_metadata = {"created": datetime.now().isoformat(), "title": title, "tags": []}
+        default_metadata = {"created": now.isoformat(), "title": title, "tags": []}
 
         # Merge with provided metadata
         if metadata:
@@ -145,41 +294,141 @@ class NoteService:
 
         # Handle template if provided
         if template:
-            template_content = self._get_template_content(template)
-            if template_content:
-                content = template_content.replace("{{title}}", title) + "\n" + content
+            template_parts = self._get_template(template)
+            if template_parts:
+                template_variables = {
+                    "title": title,
+                    "date": now.strftime("%Y-%m-%d"),
+                    "time": now.strftime("%H:%M"),
+                    "datetime": now.isoformat(timespec="seconds"),
+                    "folder": folder or "",
+                }
+                if variables:
+                    template_variables.update(variables)
+                content = render_template(template_parts, template_variables) + "\n" + content
 
         # Create the note content with YAML frontmatter
-        note_content = "---\n"
-        note_content += yaml.dump(default_metadata)
-        note_content += "---\n\n"
-        note_content += content
+        note_content = "---\n" + yaml.dump(default_metadata, Dumper=YamlDumper) + "---\n\n" + content
 
-        try:
-            # Write the file
-            with open(note_path, "w", encoding="utf-8") as file:
-                file.write(note_content)
+        post = frontmatter.Post(content)
+        post.metadata.update(default_metadata)
+        return note_path, note_content, post
+
+    def _note_file(self, note_ref) -> Path:
+        """
+        Path of an existing note's file
+
+        Args:
+            note_ref (Path or str): Absolute path, or a vault-relative id, file stem or title as
+                returned by the index
+
+        Returns:
+            Path: Absolute paths unchanged, anything else resolved inside the vault
+
+        Raises:
+            ValueError: If a relative reference points outside the vault
+        """
+        note_path = Path(note_ref)
+        if note_path.is_absolute():
             return note_path
-        except Exception as e:
-            raise Exception(f"Failed to create note: {e}") from e
+        note_path = self.vault_path / (self.resolve_note(str(note_ref)) or note_path)
+        if not note_path.resolve().is_relative_to(self.vault_path.resolve()):
+            raise ValueError(f"Note path outside the vault: {note_ref}")
+        return note_path
+
+    def _prepare_update(self, note_path, content=None, metadata=None):
+        """Merge changes into an existing note. Returns (note path, file text, parsed post)."""
+        note_path = self._note_file(note_path)
+        if not note_path.exists():
+            raise FileNotFoundError(f"Note not found: {note_path}")
+
+        with open(note_path, "r", encoding="utf-8") as file:
+            post = frontmatter.load(file)
+
+        # Update metadata if provided
+        if metadata:
+            post.metadata.update(metadata)
 
-    def _get_template_content(self, template_name):
+        # Update content if provided
+        if content is not None:
+            post.content = content
+
+        return note_path, frontmatter.dumps(post), post
+
+    def _commit_writes(self, pending, durable=True):
         """
-        Get content from a template file
+        Write rendered notes through the journal and update the index
+
+        Args:
+            pending (list): (note path, file text, parsed post) tuples
+            durable (bool): fsync temp files before they are renamed into place
+
+        Returns:
+            list: Note dictionaries for the written notes
+        """
+        batch_id, pairs = self.journal.begin([note_path for note_path, _, _ in pending])
+        try:
+            for (tmp_path, _), (_, note_content, _) in zip(pairs, pending, strict=True):
+                with open(tmp_path, "w", encoding="utf-8") as file:
+                    file.write(note_content)
+            if durable:
+                # Sync only after everything is written so the kernel can flush the batch together
+                for tmp_path, _ in pairs:
+                    fd = os.open(tmp_path, os.O_RDONLY)
+                    try:
+                        os.fsync(fd)
+                    finally:
+                        os.close(fd)
+        except Exception:
+            self.journal.abort(batch_id, pairs)
+            raise
+
+        self.journal.commit(batch_id, pairs)
+        self.journal.finish(batch_id)
+
+        notes = []
+        for (note_path, _, post), (_, target) in zip(pending, pairs, strict=True):
+            stat = target.stat()
+            self.index.update_note(note_path, post=post, stat=stat)
+            notes.append(self._note_dict(note_path, post, stat))
+        return notes
+
+    @staticmethod
+    def _note_dict(note_path: Path, post: frontmatter.Post, stat: os.stat_result):
+        return {
+            "title": note_path.stem,
+            "path": str(note_path),
+            "metadata": post.metadata,
+            "content": post.content,
+            "created": datetime.fromtimestamp(stat.st_ctime),
+            "modified": datetime.fromtimestamp(stat.st_mtime),
+        }
+
+    def _get_template(self, template_name):
+        """
+        Get a compiled template, re-reading the file only when its mtime changes
 
         Args:
             template_name (str): Name of the template
 
         Returns:
-            str: Template content or empty string if template not found
+            list: Compiled template parts, or an empty list if the template was not found
         """
-        template_dir = self.vault_path / "templates"
-        template_path = template_dir / f"{template_name}.md"
+        template_path = self.vault_path / "templates" / f"{template_name}.md"
+        try:
+            mtime_ns = template_path.stat().st_mtime_ns
+        except OSError:
+            self._templates.pop(template_name, None)
+            return []
+
+        cached = self._templates.get(template_name)
+        if cached and cached[0] == mtime_ns:
+            return cached[1]
 
-        if template_path.exists():
-            with open(template_path, "r", encoding="utf-8") as file:
-                return file.read()
-        return ""
+        with open(template_path, "r", encoding="utf-8") as file:
+            parts = compile_template(file.read())
+        self._templates[template_name] = (mtime_ns, parts)
+        return parts
 
     def update_note(self, note_path, content=None, metadata=None):
         """
@@ -193,25 +442,12 @@ class NoteService:
         Returns:
             bool: True if successful, False otherwise
         """
-        note_path = Path(note_path)
+        note_path = self._note_file(note_path)
         if not note_path.exists():
             raise FileNotFoundError(f"Note not found: {note_path}")
 
         try:
-            with open(note_path, "r", encoding="utf-8") as file:
-                post = frontmatter.load(file)
-
-            # Update metadata if provided
-            if metadata:
-                post.metadata.update(metadata)
-
-            # Update content if provided
-            if content is not None:
-                post.content = content
-
-            # Write back to file
-            with open(note_path, "w", encoding="utf-8") as file:
-                file.write(frontmatter.dumps(post))
+            self._commit_writes([self._prepare_update(note_path, content, metadata)])
             return True
         except Exception as e:
             print(f"Error updating note {note_path}: {e}")
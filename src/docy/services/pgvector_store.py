@@ -0,0 +1,102 @@
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+from sqlalchemy.ext.asyncio.session import AsyncSession
+
+from docy.repositories import DocumentRepository
+from docy.schemas import DocumentIn
+
+from .vectordb import EmbeddingModel, VectorDBInterface
+
+
+class PgVectorDB(VectorDBInterface):
+    """
+    Postgres/pgvector implementation of `VectorDBInterface` on the `document` table.
+
+    Inserts are streamed with COPY and searches are answered by the HNSW index created in the
+    `documents_hnsw` migration. Both methods are coroutines since the database layer is async.
+
+    Args:
+        session (AsyncSession): Session the repository runs in
+        embedding_model (Optional[EmbeddingModel]): Used to embed string queries
+        ef_search (Optional[int]): Default HNSW candidate list size; None keeps the server setting
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        embedding_model: Optional[EmbeddingModel] = None,
+        ef_search: Optional[int] = None,
+    ):
+        self.repository = DocumentRepository(session)
+        self.embedding_model = embedding_model
+        self.ef_search = ef_search
+
+    async def insert(self, vectors: np.ndarray, metadata: List[Dict]) -> int:
+        """
+        Insert vectors with metadata in one COPY.
+
+        Args:
+            vectors (np.ndarray): One embedding per row
+            metadata (List[Dict]): Per-row metadata; `name` and `content` are stored in their own
+                columns, every other key lands in the JSONB `metadata` column
+
+        Returns:
+            int: Number of rows inserted
+        """
+        if len(vectors) != len(metadata):
+            raise ValueError(f"Got {len(vectors)} vectors but {len(metadata)} metadata entries")
+
+        documents = []
+        for vector, meta in zip(np.asarray(vectors, dtype=np.float32), metadata, strict=True):
+            meta = dict(meta)
+            documents.append(
+                DocumentIn(
+                    name=str(meta.pop("name", "")),
+                    content=str(meta.pop("content", "")),
+                    doc_metadata=meta,
+                    embedding=vector.tolist(),
+                )
+            )
+        return await self.repository.insert_many(documents)
+
+    async def search(
+        self,
+        query: Union[str, Sequence[float]],
+        k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for the documents most similar to `query`.
+
+        Args:
+            query (Union[str, Sequence[float]]): Text to embed, or a precomputed query vector
+            k (int): Number of results
+            filters (Optional[Dict[str, Any]]): Metadata key/values every hit must contain
+            ef_search (Optional[int]): Per-query HNSW `ef_search`, overriding the instance default
+
+        Returns:
+            List[Dict[str, Any]]: Hits (id, name, content, metadata, score), best first
+        """
+        if isinstance(query, str):
+            if self.embedding_model is None:
+                raise ValueError("PgVectorDB needs an embedding_model to search by text")
+            query = self.embedding_model.generate_embeddings([query])[0]
+
+        hits = await self.repository.search(
+            np.asarray(query, dtype=np.float32).tolist(),
+            k=k,
+            filters=filters,
+            ef_search=ef_search if ef_search is not None else self.ef_search,
+        )
+        return [
+            {
+                "id": document.id,
+                "name": document.name,
+                "content": document.content,
+                "metadata": document.doc_metadata,
+                "score": score,
+            }
+            for document, score in hits
+        ]
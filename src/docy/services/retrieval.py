@@ -0,0 +1,247 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import logfire
+from sqlalchemy.ext.asyncio.session import AsyncSession
+
+from docy.models.document import Document
+from docy.repositories import DocumentRepository
+from docy.schemas import DocumentIn
+
+from .markdown_chunker import MarkdownChunker
+from .vectordb import EmbeddingModel
+
+SessionFactory = Callable[[], AsyncSession]
+
+
+@dataclass
+class RetrievalHit:
+    id: int
+    name: str
+    content: str
+    metadata: Dict[str, Any]
+    score: float
+    # 1-based rank per retriever ("lexical", "vector") that returned the hit
+    ranks: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class RetrievalResult:
+    hits: List[RetrievalHit]
+    # True when a retriever missed the latency budget and was left out of the fusion
+    partial: bool
+    timings_ms: Dict[str, float]
+
+
+def reciprocal_rank_fusion(
+    rankings: Dict[str, Sequence[int]], weights: Dict[str, float], k: int = 60
+) -> List[Tuple[int, float]]:
+    """
+    Fuse several rankings of ids with weighted RRF: score(d) = sum w_r / (k + rank_r(d)).
+
+    Only ranks matter, so lexical and vector scores never have to be put on the same scale.
+
+    Returns:
+        List[Tuple[int, float]]: (id, fused score) pairs, best first
+    """
+    scores: Dict[int, float] = {}
+    for name, ids in rankings.items():
+        weight = weights.get(name, 1.0)
+        for rank, doc_id in enumerate(ids, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class HybridRetriever:
+    """
+    Hybrid retrieval over the `document` table.
+
+    A full-text (`tsvector`) query and an HNSW vector query run concurrently on separate
+    sessions and their rankings are fused with reciprocal rank fusion. The lexical side finds
+    exact identifiers and error codes, the vector side finds paraphrases. A retriever that has
+    not answered within the latency budget is cancelled and the other one's ranking is returned.
+
+    Args:
+        session_factory (SessionFactory): Creates a fresh `AsyncSession` per query leg
+        embedding_model (EmbeddingModel): Embeds queries and indexed chunks
+        rrf_k (int): RRF damping constant; larger values flatten the rank contribution
+        lexical_weight (float): Default weight of the full-text ranking
+        vector_weight (float): Default weight of the vector ranking
+        budget_ms (float): Default latency budget for one search
+        embed_batch_size (int): Chunks embedded per model call while indexing
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory,
+        embedding_model: EmbeddingModel,
+        rrf_k: int = 60,
+        lexical_weight: float = 1.0,
+        vector_weight: float = 1.0,
+        budget_ms: float = 500.0,
+        embed_batch_size: int = 64,
+    ):
+        self.session_factory = session_factory
+        self.embedding_model = embedding_model
+        self.chunker = MarkdownChunker()
+        self.rrf_k = rrf_k
+        self.lexical_weight = lexical_weight
+        self.vector_weight = vector_weight
+        self.budget_ms = budget_ms
+        self.embed_batch_size = embed_batch_size
+
+    async def search(
+        self,
+        query: str,
+        k: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        lexical_weight: Optional[float] = None,
+        vector_weight: Optional[float] = None,
+        budget_ms: Optional[float] = None,
+        ef_search: Optional[int] = None,
+    ) -> RetrievalResult:
+        """
+        Run both retrievers and fuse their rankings
+
+        Args:
+            query (str): Natural language or identifier query
+            k (int): Number of fused results
+            filters (Optional[Dict[str, Any]]): Metadata every hit must contain, e.g. {"source": "github"}
+            lexical_weight (Optional[float]): Weight of the full-text ranking; 0 disables it
+            vector_weight (Optional[float]): Weight of the vector ranking; 0 disables it
+            budget_ms (Optional[float]): Latency budget for this search
+            ef_search (Optional[int]): HNSW `ef_search` for the vector query
+
+        Returns:
+            RetrievalResult: Fused hits, whether a retriever was dropped, and per-retriever timings
+        """
+        weights = {
+            "lexical": self.lexical_weight if lexical_weight is None else lexical_weight,
+            "vector": self.vector_weight if vector_weight is None else vector_weight,
+        }
+        budget = (self.budget_ms if budget_ms is None else budget_ms) / 1000
+        # Each leg fetches more than k so documents ranked lower by one side can still win the fusion
+        candidates = max(k * 4, 20)
+        timings: Dict[str, float] = {}
+
+        legs: Dict[str, asyncio.Task] = {}
+        if weights["lexical"] > 0:
+            legs["lexical"] = asyncio.create_task(
+                self._timed("lexical", timings, self._lexical(query, candidates, filters))
+            )
+        if weights["vector"] > 0:
+            legs["vector"] = asyncio.create_task(
+                self._timed("vector", timings, self._vector(query, candidates, filters, ef_search))
+            )
+        if not legs:
+            return RetrievalResult(hits=[], partial=False, timings_ms=timings)
+
+        done, pending = await asyncio.wait(legs.values(), timeout=budget)
+        for task in pending:
+            task.cancel()
+
+        documents: Dict[int, Document] = {}
+        rankings: Dict[str, List[int]] = {}
+        partial = bool(pending)
+        for name, task in legs.items():
+            if task not in done:
+                logfire.warning(f"{name} retrieval exceeded the {budget * 1000:.0f}ms budget")
+                continue
+            if task.exception() is not None:
+                logfire.error(f"{name} retrieval failed: {task.exception()}")
+                partial = True
+                continue
+            rankings[name] = []
+            for document, _ in task.result():
+                documents.setdefault(document.id, document)
+                rankings[name].append(document.id)
+
+        hits = []
+        for doc_id, score in reciprocal_rank_fusion(rankings, weights, self.rrf_k)[:k]:
+            document = documents[doc_id]
+            hits.append(
+                RetrievalHit(
+                    id=doc_id,
+                    name=document.name,
+                    content=document.content,
+                    metadata=document.doc_metadata,
+                    score=score,
+                    ranks={name: ids.index(doc_id) + 1 for name, ids in rankings.items() if doc_id in ids},
+                )
+            )
+        return RetrievalResult(hits=hits, partial=partial, timings_ms=timings)
+
+    async def _timed(self, name: str, timings: Dict[str, float], coroutine):
+        start = time.perf_counter()
+        try:
+            return await coroutine
+        finally:
+            timings[name] = (time.perf_counter() - start) * 1000
+
+    async def _lexical(self, query: str, k: int, filters: Optional[Dict[str, Any]]) -> List[Tuple[Document, float]]:
+        async with self.session_factory() as session:
+            return await DocumentRepository(session).lexical_search(query, k=k, filters=filters)
+
+    async def _vector(
+        self, query: str, k: int, filters: Optional[Dict[str, Any]], ef_search: Optional[int]
+    ) -> List[Tuple[Document, float]]:
+        # Encoding is CPU-bound; keep it off the event loop so the lexical query proceeds meanwhile
+        embedding = (await asyncio.to_thread(self.embedding_model.generate_embeddings, [query]))[0]
+        async with self.session_factory() as session:
+            repository = DocumentRepository(session)
+            return await repository.search(embedding.tolist(), k=k, filters=filters, ef_search=ef_search)
+
+    async def index_markdown(
+        self, name: str, content: Union[str, Iterable[str]], metadata: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """
+        Replace the stored chunks of one markdown document
+
+        Args:
+            name (str): Document name, e.g. a note id or repository path; previous chunks with this name are removed
+            content (Union[str, Iterable[str]]): Markdown source, or an iterable of its lines (e.g. an open file)
+            metadata (Optional[Dict[str, Any]]): Metadata stored with every chunk, e.g. {"source": "note"}
+
+        Returns:
+            int: Number of chunks stored
+        """
+        documents: List[DocumentIn] = []
+        batch = []
+
+        async def flush():
+            texts = [chunk.with_context() for chunk in batch]
+            embeddings = await asyncio.to_thread(self.embedding_model.generate_embeddings, texts)
+            for chunk, text, embedding in zip(batch, texts, embeddings, strict=True):
+                documents.append(
+                    DocumentIn(
+                        name=name,
+                        content=text,
+                        doc_metadata={
+                            **(metadata or {}),
+                            "header": chunk.header or "",
+                            "chunk": len(documents),
+                            "line": chunk.start_line,
+                        },
+                        embedding=embedding.tolist(),
+                    )
+                )
+            batch.clear()
+
+        # Chunks are produced lazily and embedded in batches as they come
+        for chunk in self.chunker.chunk(content):
+            batch.append(chunk)
+            if len(batch) >= self.embed_batch_size:
+                await flush()
+        if batch:
+            await flush()
+
+        async with self.session_factory() as session:
+            repository = DocumentRepository(session)
+            # Delete and insert share one transaction, so readers never see the document missing
+            await repository.delete_by_name(name, commit=False)
+            if not documents:
+                await session.commit()
+                return 0
+            return await repository.insert_many(documents)
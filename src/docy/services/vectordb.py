@@ -1,39 +1,48 @@
-import re
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
-
-class SimpleMarkdownParser:
-    def parse(self, content: str) -> List[Dict]:
-        sections = []
-        current_section = {"header": None, "content": []}
-
-        for line in content.split("\n"):
-            header_match = re.match(r"^(#+)\s*(.*)", line)
-            if header_match:
-                if current_section["content"]:
-                    sections.append(current_section)
-                current_section = {"header": header_match.group(2).strip(), "content": []}
-            else:
-                if line.strip():
-                    current_section["content"].append(line.strip())
-
-        if current_section["content"]:
-            sections.append(current_section)
-
-        return sections
+from docy.embeddings import Backend, EmbeddingCache, EmbeddingPool, LazyModel
 
 
 class EmbeddingModel:
     """Handles text embedding generation"""
 
-    def __init__(self, model_name: str = "all-MiniLM-l6-v2"):
-        self.model = SentenceTransformer(model_name)
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-l6-v2",
+        cache_path: Optional[str] = None,
+        backend: Backend = "torch",
+        model_file: Optional[str] = None,
+        quantize: bool = False,
+        workers: int = 0,
+        threads_per_worker: int = 1,
+    ):
+        self.model_name = model_name
+        # The model is only loaded on the first cache miss (or an explicit warm_up)
+        self._model = LazyModel(model_name, backend=backend, model_file=model_file, quantize=quantize)
+        # workers > 0 spreads encoding over that many model processes, for bulk re-indexing
+        self.pool = EmbeddingPool(self._model, workers, threads_per_worker) if workers > 0 else None
+        # Always keeps an in-memory LRU; also persists to SQLite when a path is given
+        self.cache = EmbeddingCache(model_name, path=cache_path, variant=self._model.variant)
+
+    @property
+    def model(self):
+        return self._model.get()
+
+    def warm_up(self) -> None:
+        if self.pool is not None:
+            self.pool.start()
+        else:
+            self._model.warm_up()
 
     def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        return self.cache.encode(texts, self._encode)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        if self.pool is not None:
+            return self.pool.encode(texts)
         return self.model.encode(texts, convert_to_tensor=False)
 
 
@@ -10,10 +10,15 @@ from pydantic_ai.models.groq import GroqModel
 from pydantic_ai.models.openai import OpenAIModel
 from pydantic_ai.providers.openai import OpenAIProvider
 
+from docy.storage import get_blob_store
+
 ROOT_DIR = pathlib.Path(__file__).parent.resolve()
 BASE_DIR = pathlib.Path(ROOT_DIR / "data")
 CODING_DIR = BASE_DIR / "coding"
 CODING_DIR.mkdir(exist_ok=True)
+# Saved files are hard links into the shared store (copies across filesystems), so re-saving
+# identical code takes no space and its garbage collection covers them too
+blob_store = get_blob_store()
 
 groq_model = GroqModel("qwen-2.5-coder-32b")
 gemini_model = GeminiModel(
@@ -73,8 +78,7 @@ def save_to_file(file_name: str, content: str):
     file_path = CODING_DIR / safe_file_name
 
     try:
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(content)
+        blob_store.store_as("coding", safe_file_name, content.encode("utf-8"), target=file_path)
         return f"File saved at {file_path}"
     except Exception as e:
         return f"Error saving file {file_path}: {e}"
@@ -0,0 +1,10 @@
+from .blob_store import BlobStore, BlobWriter, get_blob_store
+from .delta import apply_delta, encode_delta
+
+__all__ = [
+    "BlobStore",
+    "BlobWriter",
+    "get_blob_store",
+    "apply_delta",
+    "encode_delta",
+]
@@ -0,0 +1,364 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+
+from docy.core import Settings
+
+try:
+    import zstandard
+except ImportError:  # compression is optional
+    zstandard = None
+
+COMPRESSED_SUFFIX = ".zst"
+CHUNK_SIZE = 1024 * 1024
+
+
+class BlobWriter:
+    """
+    Incremental writer for one blob, hashing while it spools to a temporary file.
+
+    Obtained from `BlobStore.writer()`; call `commit()` to get the blob's SHA-256 or `abort()`
+    to discard it. Content that is already stored is dropped at commit instead of moved in.
+    """
+
+    def __init__(self, store: "BlobStore"):
+        self._store = store
+        self._hash = hashlib.sha256()
+        self._path = store.tmp_dir / uuid.uuid4().hex
+        self._file = open(self._path, "wb")
+        self.size = 0
+
+    def write(self, data: bytes) -> None:
+        self._hash.update(data)
+        self._file.write(data)
+        self.size += len(data)
+
+    def commit(self) -> str:
+        self._file.close()
+        return self._store._adopt(self._path, self._hash.hexdigest(), self.size)
+
+    def abort(self) -> None:
+        self._file.close()
+        self._path.unlink(missing_ok=True)
+
+
+class BlobStore:
+    """
+    Content-addressed store: every distinct content is kept once, under its SHA-256.
+
+    Blobs live in `objects/ab/cd/<sha>` (zstd-compressed as `<sha>.zst` when enabled and the
+    `zstandard` package is installed). A SQLite index next to them tracks size and reference
+    counts, plus named references ("bindings") from a namespace and name, e.g. a file path, to
+    a blob. Storing content that already exists costs a hash and an index lookup.
+
+    Blobs whose reference count drops to zero are only removed by `gc()`, and only after
+    `grace_seconds`, so a blob stored but not yet referenced is not collected under a writer.
+
+    Raw blobs are made read-only because named files are hard links to them: content must be
+    replaced through the store, never rewritten in place.
+
+    Args:
+        root (Union[str, Path]): Store directory
+        compress (bool): zstd-compress blobs; ignored without `zstandard`
+        compression_level (int): zstd level
+        min_compress_size (int): Smaller contents are stored raw
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        compress: bool = False,
+        compression_level: int = 3,
+        min_compress_size: int = 512,
+    ):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.tmp_dir = self.root / "tmp"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.compress = compress and zstandard is not None
+        self.compression_level = compression_level
+        self.min_compress_size = min_compress_size
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.root / "index.sqlite3"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS blobs (sha TEXT PRIMARY KEY, size INTEGER, stored_size INTEGER, "
+                "refcount INTEGER NOT NULL DEFAULT 0, touched_at REAL) WITHOUT ROWID"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS bindings (namespace TEXT, name TEXT, sha TEXT, "
+                "PRIMARY KEY (namespace, name)) WITHOUT ROWID"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS ix_blobs_refcount ON blobs (refcount)")
+
+    # -- writing -----------------------------------------------------------
+
+    def put(self, data: bytes) -> str:
+        """Store `data` if new and return its SHA-256. Does not add a reference."""
+        sha = hashlib.sha256(data).hexdigest()
+        if self._touch(sha):
+            return sha
+        writer = self.writer()
+        try:
+            writer.write(data)
+        except BaseException:
+            writer.abort()
+            raise
+        return writer.commit()
+
+    def writer(self) -> BlobWriter:
+        """Writer for content that arrives in chunks, e.g. an upload."""
+        return BlobWriter(self)
+
+    def _adopt(self, tmp_path: Path, sha: str, size: int) -> str:
+        """Move a spooled temporary file into place as blob `sha`, or drop it if already stored."""
+        try:
+            if self._touch(sha):
+                return sha
+            raw_path = self._object_path(sha)
+            raw_path.parent.mkdir(parents=True, exist_ok=True)
+            if self.compress and size >= self.min_compress_size:
+                compressed_path = tmp_path.with_suffix(COMPRESSED_SUFFIX)
+                compressor = zstandard.ZstdCompressor(level=self.compression_level, write_content_size=True)
+                with open(tmp_path, "rb") as source, open(compressed_path, "wb") as target:
+                    compressor.copy_stream(source, target, size=size)
+                stored_size = compressed_path.stat().st_size
+                if stored_size < size:
+                    os.chmod(compressed_path, 0o444)
+                    os.replace(compressed_path, raw_path.with_suffix(COMPRESSED_SUFFIX))
+                    self._record(sha, size, stored_size)
+                    return sha
+                compressed_path.unlink()
+            os.chmod(tmp_path, 0o444)
+            os.replace(tmp_path, raw_path)
+            self._record(sha, size, size)
+            return sha
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _touch(self, sha: str) -> bool:
+        """Mark an existing blob as recently written (protecting it from gc); False if unknown."""
+        with self._lock, self._db:
+            updated = self._db.execute("UPDATE blobs SET touched_at = ? WHERE sha = ?", (time.time(), sha)).rowcount
+        return bool(updated) and self._find(sha) is not None
+
+    def _record(self, sha: str, size: int, stored_size: int) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO blobs (sha, size, stored_size, refcount, touched_at) VALUES (?, ?, ?, 0, ?) "
+                "ON CONFLICT (sha) DO UPDATE SET stored_size = excluded.stored_size, touched_at = excluded.touched_at",
+                (sha, size, stored_size, time.time()),
+            )
+
+    # -- reading -----------------------------------------------------------
+
+    def _object_path(self, sha: str) -> Path:
+        return self.objects_dir / sha[:2] / sha[2:4] / sha
+
+    def _find(self, sha: str) -> Optional[Path]:
+        raw_path = self._object_path(sha)
+        if raw_path.exists():
+            return raw_path
+        compressed_path = raw_path.with_suffix(COMPRESSED_SUFFIX)
+        return compressed_path if compressed_path.exists() else None
+
+    def exists(self, sha: str) -> bool:
+        return self._find(sha) is not None
+
+    def size(self, sha: str) -> Optional[int]:
+        """Uncompressed size of a blob, None if unknown."""
+        with self._lock:
+            row = self._db.execute("SELECT size FROM blobs WHERE sha = ?", (sha,)).fetchone()
+        return row[0] if row else None
+
+    def open(self, sha: str) -> BinaryIO:
+        """Open a blob for reading its uncompressed bytes."""
+        path = self._find(sha)
+        if path is None:
+            raise FileNotFoundError(f"Blob {sha} not found")
+        if path.suffix != COMPRESSED_SUFFIX:
+            return open(path, "rb")
+        if zstandard is None:
+            raise RuntimeError(f"Blob {sha} is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+
+    def get(self, sha: str) -> bytes:
+        with self.open(sha) as reader:
+            return reader.read()
+
+    def iter_chunks(self, sha: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        with self.open(sha) as reader:
+            while chunk := reader.read(chunk_size):
+                yield chunk
+
+    def raw_path(self, sha: str) -> Path:
+        """
+        Path of the blob as a plain file, decompressing it in place once if needed.
+
+        Used to hard-link named files to a blob; a blob exposed this way stays uncompressed.
+        """
+        path = self._find(sha)
+        if path is None:
+            raise FileNotFoundError(f"Blob {sha} not found")
+        if path.suffix != COMPRESSED_SUFFIX:
+            return path
+        tmp_path = self.tmp_dir / uuid.uuid4().hex
+        try:
+            with self.open(sha) as reader, open(tmp_path, "wb") as target:
+                shutil.copyfileobj(reader, target, CHUNK_SIZE)
+            os.chmod(tmp_path, 0o444)
+            raw_path = self._object_path(sha)
+            os.replace(tmp_path, raw_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        path.unlink(missing_ok=True)
+        with self._lock, self._db:
+            self._db.execute("UPDATE blobs SET stored_size = size WHERE sha = ?", (sha,))
+        return raw_path
+
+    def link(self, sha: str, target: Path) -> None:
+        """
+        Atomically make `target` a file with the blob's content.
+
+        A hard link when `target` is on the store's filesystem, a copy otherwise.
+        """
+        target = Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.link")
+        try:
+            try:
+                os.link(self.raw_path(sha), tmp_path)
+            except OSError:
+                # Cross-device, link limit reached or links unsupported
+                with self.open(sha) as reader, open(tmp_path, "wb") as out:
+                    shutil.copyfileobj(reader, out, CHUNK_SIZE)
+            os.replace(tmp_path, target)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    # -- references --------------------------------------------------------
+
+    def incref(self, sha: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("UPDATE blobs SET refcount = refcount + 1 WHERE sha = ?", (sha,))
+
+    def release(self, sha: Optional[str]) -> None:
+        """Drop one reference to a blob; it becomes collectable once none remain."""
+        if not sha:
+            return
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE blobs SET refcount = MAX(refcount - 1, 0), touched_at = ? WHERE sha = ?", (time.time(), sha)
+            )
+
+    def bind(self, namespace: str, name: str, sha: str) -> Optional[str]:
+        """
+        Point `name` at blob `sha`, moving the reference from the blob it pointed at before
+
+        Returns:
+            Optional[str]: The previously bound SHA, if any
+        """
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT sha FROM bindings WHERE namespace = ? AND name = ?", (namespace, name)
+            ).fetchone()
+            previous = row[0] if row else None
+            if previous == sha:
+                return previous
+            self._db.execute(
+                "INSERT OR REPLACE INTO bindings (namespace, name, sha) VALUES (?, ?, ?)", (namespace, name, sha)
+            )
+            self._db.execute("UPDATE blobs SET refcount = refcount + 1 WHERE sha = ?", (sha,))
+            if previous:
+                self._db.execute(
+                    "UPDATE blobs SET refcount = MAX(refcount - 1, 0), touched_at = ? WHERE sha = ?",
+                    (time.time(), previous),
+                )
+        return previous
+
+    def unbind(self, namespace: str, name: str) -> Optional[str]:
+        """Remove a name, releasing its blob. Returns the SHA it pointed at."""
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT sha FROM bindings WHERE namespace = ? AND name = ?", (namespace, name)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("DELETE FROM bindings WHERE namespace = ? AND name = ?", (namespace, name))
+            self._db.execute(
+                "UPDATE blobs SET refcount = MAX(refcount - 1, 0), touched_at = ? WHERE sha = ?", (time.time(), row[0])
+            )
+        return row[0]
+
+    def resolve(self, namespace: str, name: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT sha FROM bindings WHERE namespace = ? AND name = ?", (namespace, name)
+            ).fetchone()
+        return row[0] if row else None
+
+    def store_as(self, namespace: str, name: str, data: bytes, target: Optional[Path] = None) -> str:
+        """Store `data`, bind it to `name` and, with `target`, materialize it there. Returns the SHA."""
+        sha = self.put(data)
+        if target is not None:
+            self.link(sha, target)
+        self.bind(namespace, name, sha)
+        return sha
+
+    # -- maintenance -------------------------------------------------------
+
+    def gc(self, grace_seconds: float = 3600.0) -> Tuple[int, int]:
+        """
+        Delete unreferenced blobs not written or released within `grace_seconds`
+
+        Returns:
+            Tuple[int, int]: Blobs removed and bytes freed on disk
+        """
+        cutoff = time.time() - grace_seconds
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT sha, stored_size FROM blobs WHERE refcount = 0 AND touched_at < ?", (cutoff,)
+            ).fetchall()
+        removed = freed = 0
+        for sha, stored_size in rows:
+            with self._lock, self._db:
+                # Re-check under the lock in case a reference was added meanwhile
+                deleted = self._db.execute(
+                    "DELETE FROM blobs WHERE sha = ? AND refcount = 0 AND touched_at < ?", (sha, cutoff)
+                ).rowcount
+            if not deleted:
+                continue
+            raw_path = self._object_path(sha)
+            for path in (raw_path, raw_path.with_suffix(COMPRESSED_SUFFIX)):
+                path.unlink(missing_ok=True)
+            removed += 1
+            freed += stored_size or 0
+        return removed, freed
+
+    def stats(self) -> dict:
+        """Totals of logical (deduplicated) and stored bytes."""
+        with self._lock:
+            count, size, stored_size, unreferenced = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0), "
+                "COALESCE(SUM(refcount = 0), 0) FROM blobs"
+            ).fetchone()
+        return {"blobs": count, "size": size, "stored_size": stored_size, "unreferenced": unreferenced}
+
+
+@lru_cache
+def get_blob_store() -> BlobStore:
+    """Process-wide store shared by files and artifacts, configured from settings."""
+    settings = Settings()
+    root = settings.BLOB_STORE_DIR or str(Path(settings.DOCY_DATA_DIR) / ".blobs")
+    return BlobStore(root, compress=settings.BLOB_STORE_COMPRESS)
@@ -0,0 +1,36 @@
+import difflib
+import json
+import zlib
+from typing import List, Union
+
+
+def encode_delta(base: str, target: str) -> bytes:
+    """
+    Compressed line delta turning `base` into `target`
+
+    The delta is a zlib-compressed JSON list of operations: `[start, end]` copies that line
+    range of the base, a string inserts new text. Unchanged regions cost a few bytes no matter
+    how long they are.
+    """
+    base_lines = base.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    operations: List[Union[List[int], str]] = []
+    matcher = difflib.SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            operations.append([i1, i2])
+        elif j2 > j1:
+            operations.append("".join(target_lines[j1:j2]))
+    return zlib.compress(json.dumps(operations, separators=(",", ":")).encode("utf-8"), 9)
+
+
+def apply_delta(base: str, delta: bytes) -> str:
+    """Rebuild the target text from `base` and a delta made by `encode_delta`."""
+    base_lines = base.splitlines(keepends=True)
+    parts: List[str] = []
+    for operation in json.loads(zlib.decompress(delta)):
+        if isinstance(operation, str):
+            parts.append(operation)
+        else:
+            parts.extend(base_lines[operation[0] : operation[1]])
+    return "".join(parts)
@@ -0,0 +1,69 @@
+import asyncio
+from typing import Optional
+
+import typer
+from rich import print as rprint
+
+from docy.core import Settings
+from docy.storage import get_blob_store
+
+settings = Settings()
+
+app = typer.Typer(
+    help="Maintenance of the content-addressed blob store behind files and artifacts.",
+    context_settings={"help_option_names": ["-h", "--help"]},
+    no_args_is_help=True,
+)
+
+
+@app.callback()
+def main():
+    """Run one of the commands below."""
+
+
+async def _move_artifacts(batch_size: int) -> int:
+    from docy.db.session import async_session_local
+    from docy.repositories import ArtifactRepository
+
+    moved = 0
+    async with async_session_local() as session:
+        repository = ArtifactRepository(session)
+        while count := await repository.move_inline_content(batch_size):
+            moved += count
+            rprint(f"Moved {moved} artifact bodies...")
+    return moved
+
+
+@app.command()
+def gc(
+    grace: Optional[float] = typer.Option(
+        None, "--grace", "-g", help="Keep unreferenced blobs younger than this many seconds."
+    ),
+):
+    """
+    Deletes blobs that no file, artifact or artifact version references anymore.
+    """
+    blob_store = get_blob_store()
+    removed, freed = blob_store.gc(settings.BLOB_STORE_GC_GRACE if grace is None else grace)
+    stats = blob_store.stats()
+    rprint(f"[bold green]Done:[/bold green] removed {removed} blobs ({freed} bytes freed).")
+    rprint(
+        f"{stats['blobs']} blobs remain, {stats['stored_size']} bytes on disk, {stats['unreferenced']} unreferenced."
+    )
+
+
+@app.command("move-artifacts")
+def move_artifacts(
+    batch_size: int = typer.Option(100, "--batch-size", "-b", help="Rows moved per transaction."),
+):
+    """
+    Moves artifact bodies still stored inline on their rows into the blob store.
+
+    Safe to interrupt and re-run: each batch commits on its own and moved rows are not selected again.
+    """
+    moved = asyncio.run(_move_artifacts(batch_size))
+    rprint(f"[bold green]Done:[/bold green] {moved} artifact bodies moved to the blob store.")
+
+
+if __name__ == "__main__":
+    app()
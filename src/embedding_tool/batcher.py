@@ -0,0 +1,93 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Set, Tuple
+
+import numpy as np
+
+EncodeFn = Callable[[List[str]], np.ndarray]
+
+
+class MicroBatcher:
+    """
+    Gathers concurrent single-text requests into one `encode` call.
+
+    The first queued text opens a window; the batch is flushed once it holds `max_batch_size`
+    texts or `max_wait_ms` have passed. Encoding runs on `concurrency` worker threads (one by
+    default, so an in-process model is never entered from two threads at once) and the event
+    loop stays free.
+    """
+
+    def __init__(self, encode: EncodeFn, max_batch_size: int = 32, max_wait_ms: float = 5.0, concurrency: int = 1):
+        self.encode = encode
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="encode")
+        self._in_flight = asyncio.Semaphore(concurrency)
+
+        self._queue: Optional[asyncio.Queue[Tuple[str, asyncio.Future]]] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._encoding: Set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self.executor.shutdown(wait=True)
+
+    async def encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Encode an already-batched request directly on the encode thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.encode, texts)
+
+    async def submit(self, text: str) -> np.ndarray:
+        """Queue one text and wait for its embedding."""
+        if self._queue is None:
+            raise RuntimeError("MicroBatcher.start() has not been called")
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Wait for a free encode slot, then keep collecting the next batch while this one runs
+            await self._in_flight.acquire()
+            task = asyncio.create_task(self._encode_and_resolve(batch))
+            self._encoding.add(task)
+            task.add_done_callback(self._encoding.discard)
+
+    async def _encode_and_resolve(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        texts = [text for text, _ in batch]
+        try:
+            embeddings = await self.encode_batch(texts)
+            if len(embeddings) != len(batch):
+                raise ValueError(f"Encoder returned {len(embeddings)} embeddings for {len(batch)} texts")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._in_flight.release()
+        for (_, future), embedding in zip(batch, embeddings, strict=True):
+            if not future.done():
+                future.set_result(embedding)
@@ -0,0 +1,58 @@
+import io
+from typing import Optional
+
+import numpy as np
+from fastapi import Response
+
+OCTET_STREAM = "application/octet-stream"
+NPY = "application/x-npy"
+BINARY_MEDIA_TYPES = (OCTET_STREAM, NPY)
+DTYPES = {"float32": np.dtype("<f4"), "float16": np.dtype("<f2")}
+
+BINARY_RESPONSES = {
+    200: {
+        "content": {
+            OCTET_STREAM: {"schema": {"type": "string", "format": "binary"}},
+            NPY: {"schema": {"type": "string", "format": "binary"}},
+        },
+        "description": (
+            "Raw little-endian vectors (`Accept: application/octet-stream`) or a NumPy .npy file "
+            "(`Accept: application/x-npy`). Shape and dtype are sent in X-Embedding-Shape and X-Embedding-Dtype."
+        ),
+    }
+}
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """Pick a binary media type from the Accept header, or None for JSON."""
+    if not accept:
+        return None
+    for media_range in accept.split(","):
+        media_type = media_range.split(";")[0].strip().lower()
+        if media_type in BINARY_MEDIA_TYPES:
+            return media_type
+        if media_type in ("application/json", "*/*"):
+            return None
+    return None
+
+
+def binary_response(embeddings: np.ndarray, media_type: str, dtype: str, processing_time: float) -> Response:
+    """
+    Serialize embeddings without going through Python floats.
+
+    `application/octet-stream` is the C-ordered buffer, loadable with
+    `np.frombuffer(body, dtype).reshape(shape)` without a copy.
+    """
+    array = np.ascontiguousarray(embeddings, dtype=DTYPES[dtype])
+    if media_type == NPY:
+        buffer = io.BytesIO()
+        np.save(buffer, array, allow_pickle=False)
+        body = buffer.getvalue()
+    else:
+        body = array.tobytes()
+    headers = {
+        "X-Embedding-Shape": ",".join(str(dim) for dim in array.shape),
+        "X-Embedding-Dtype": array.dtype.str,
+        "X-Processing-Time": f"{processing_time:.6f}",
+    }
+    return Response(content=body, media_type=media_type, headers=headers)
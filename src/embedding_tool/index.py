@@ -0,0 +1,287 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+VECTORS_FILE = "vectors.f32"
+LOG_FILE = "documents.jsonl"
+CENTROIDS_FILE = "centroids.npy"
+ASSIGNMENTS_FILE = "assignments.npy"
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def spherical_kmeans(vectors: np.ndarray, n_clusters: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Unit-norm k-means; good enough for an IVF coarse quantizer."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        labels = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        empty = ~sums.any(axis=1)
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = normalize(sums)
+    return centroids
+
+
+class VectorIndex:
+    """
+    Persistent cosine-similarity index over a document corpus.
+
+    Vectors live in an append-only float32 file that is memory-mapped at startup, documents and
+    deletions in an append-only JSON-lines log, so adding or removing documents never rewrites
+    the corpus. Small corpora are searched with one vectorized matrix product; once the corpus
+    passes `ivf_threshold` an inverted-file index (k-means coarse quantizer) limits the scan to
+    the `nprobe` closest clusters.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        dim: int,
+        ivf_threshold: int = 50_000,
+        nprobe: int = 8,
+        compact_ratio: float = 0.5,
+    ):
+        self.directory = Path(directory)
+        self.dim = dim
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self.compact_ratio = compact_ratio
+
+        self._lock = threading.RLock()
+        self._vectors_file = VECTORS_FILE
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+        self._alive = np.empty(0, dtype=bool)
+        self._documents: List[Optional[Dict]] = []
+        self._rows: Dict[str, int] = {}
+
+        self._centroids: Optional[np.ndarray] = None
+        self._trained_size = 0
+        self._lists: List[List[int]] = []
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # -- persistence -------------------------------------------------------
+
+    def load(self) -> None:
+        """Map the vector file and replay the document log."""
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            log_path = self.directory / LOG_FILE
+            if log_path.exists():
+                with open(log_path, "r", encoding="utf-8") as log:
+                    for line in log:
+                        record = json.loads(line)
+                        if record["op"] == "add":
+                            self._set_document(record["row"], record)
+                        elif record["op"] == "remove":
+                            self._drop(record["id"])
+                        elif record["op"] == "vectors":
+                            self._vectors_file = record["file"]
+            self._remap()
+
+            centroids_path = self.directory / CENTROIDS_FILE
+            if centroids_path.exists() and len(self._documents):
+                self._centroids = np.load(centroids_path)
+                assignments = np.load(self.directory / ASSIGNMENTS_FILE)
+                self._trained_size = len(assignments)
+                self._lists = [[] for _ in range(len(self._centroids))]
+                for row, label in enumerate(assignments.tolist()):
+                    self._lists[label].append(row)
+                self._assign(range(self._trained_size, len(self._documents)))
+            elif len(self) >= self.ivf_threshold:
+                self.train()
+
+    def _remap(self) -> None:
+        vectors_path = self.directory / self._vectors_file
+        rows = len(self._documents)
+        if rows and vectors_path.exists():
+            self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+        else:
+            self._vectors = np.empty((0, self.dim), dtype=np.float32)
+        alive = np.zeros(rows, dtype=bool)
+        alive[list(self._rows.values())] = True
+        self._alive = alive
+
+    def _set_document(self, row: int, record: Dict) -> None:
+        self._drop(record["id"])
+        while len(self._documents) <= row:
+            self._documents.append(None)
+        self._documents[row] = {"id": record["id"], "text": record["text"], "metadata": record.get("metadata") or {}}
+        self._rows[record["id"]] = row
+
+    def _drop(self, doc_id: str) -> bool:
+        row = self._rows.pop(doc_id, None)
+        if row is None:
+            return False
+        self._documents[row] = None
+        if row < len(self._alive):
+            self._alive[row] = False
+        return True
+
+    def _append_log(self, records: Sequence[Dict]) -> None:
+        with open(self.directory / LOG_FILE, "a", encoding="utf-8") as log:
+            log.writelines(json.dumps(record) + "\n" for record in records)
+            log.flush()
+            os.fsync(log.fileno())
+
+    # -- mutations ---------------------------------------------------------
+
+    def add(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        vectors: np.ndarray,
+        metadatas: Optional[Sequence[Optional[Dict]]] = None,
+    ) -> None:
+        """Add documents; an existing id is replaced."""
+        vectors = normalize(vectors).reshape(-1, self.dim)
+        metadatas = metadatas or [None] * len(ids)
+        if not len(ids) == len(texts) == len(vectors) == len(metadatas):
+            raise ValueError("ids, texts, vectors and metadatas must have the same length")
+        with self._lock:
+            start = len(self._documents)
+            with open(self.directory / self._vectors_file, "ab") as file:
+                # Drop vectors left behind by a crash between this write and the log append
+                file.truncate(start * self.dim * vectors.itemsize)
+                file.write(vectors.tobytes())
+                file.flush()
+                os.fsync(file.fileno())
+
+            records = [
+                {"op": "add", "row": start + offset, "id": doc_id, "text": text, "metadata": metadata}
+                for offset, (doc_id, text, metadata) in enumerate(zip(ids, texts, metadatas, strict=True))
+            ]
+            self._append_log(records)
+            for record in records:
+                self._set_document(record["row"], record)
+            self._remap()
+
+            if self._centroids is not None:
+                self._assign(range(start, len(self._documents)))
+            if len(self) >= self.ivf_threshold and (self._centroids is None or len(self) > 4 * self._trained_size):
+                self.train()
+
+    def remove(self, ids: Sequence[str]) -> int:
+        """Remove documents by id. Returns how many existed."""
+        with self._lock:
+            removed = [doc_id for doc_id in ids if self._drop(doc_id)]
+            if removed:
+                self._append_log([{"op": "remove", "id": doc_id} for doc_id in removed])
+            dead = len(self._documents) - len(self)
+            if dead > 1000 and dead > self.compact_ratio * len(self._documents):
+                self.compact()
+            return len(removed)
+
+    def compact(self) -> None:
+        """
+        Rewrite the corpus with live documents only.
+
+        The new vectors go to a fresh file named in the first line of the new log, and the log
+        is swapped in atomically, so a crash at any point leaves one consistent generation.
+        """
+        with self._lock:
+            live_rows = sorted(self._rows.values())
+            vectors = np.array(self._vectors[live_rows], dtype=np.float32)
+            documents = [self._documents[row] for row in live_rows]
+
+            old_vectors_file = self._vectors_file
+            generation = int(old_vectors_file.split(".")[1]) + 1 if old_vectors_file.count(".") == 2 else 1
+            new_vectors_file = f"vectors.{generation}.f32"
+            vectors.tofile(self.directory / new_vectors_file)
+
+            tmp_log = self.directory / f"{LOG_FILE}.tmp"
+            with open(tmp_log, "w", encoding="utf-8") as log:
+                log.write(json.dumps({"op": "vectors", "file": new_vectors_file}) + "\n")
+                for row, document in enumerate(documents):
+                    log.write(json.dumps({"op": "add", "row": row, **document}) + "\n")
+                log.flush()
+                os.fsync(log.fileno())
+            # Row numbers change, so the old clusters must not outlive the old log
+            (self.directory / CENTROIDS_FILE).unlink(missing_ok=True)
+            os.replace(tmp_log, self.directory / LOG_FILE)
+
+            self._vectors_file = new_vectors_file
+            self._documents = documents
+            self._rows = {document["id"]: row for row, document in enumerate(documents)}
+            self._centroids = None
+            self._lists = []
+            self._trained_size = 0
+            self._remap()
+            (self.directory / old_vectors_file).unlink(missing_ok=True)
+            if len(self) >= self.ivf_threshold:
+                self.train()
+
+    # -- IVF ---------------------------------------------------------------
+
+    def train(self) -> None:
+        """(Re)build the IVF coarse quantizer over the current corpus."""
+        with self._lock:
+            live_rows = np.flatnonzero(self._alive)
+            n_clusters = max(1, int(np.sqrt(len(live_rows))))
+            rng = np.random.default_rng(0)
+            sample = rng.choice(live_rows, min(len(live_rows), n_clusters * 64), replace=False)
+            self._centroids = spherical_kmeans(np.asarray(self._vectors[np.sort(sample)]), n_clusters)
+            self._lists = [[] for _ in range(n_clusters)]
+            self._assign(range(len(self._documents)))
+            self._trained_size = len(self._documents)
+
+            assignments = np.empty(self._trained_size, dtype=np.int32)
+            for label, rows in enumerate(self._lists):
+                assignments[rows] = label
+            np.save(self.directory / ASSIGNMENTS_FILE, assignments)
+            np.save(self.directory / CENTROIDS_FILE, self._centroids)
+
+    def _assign(self, rows: range) -> None:
+        assert self._centroids is not None
+        for start in range(rows.start, rows.stop, 8192):
+            stop = min(start + 8192, rows.stop)
+            labels = np.argmax(np.asarray(self._vectors[start:stop]) @ self._centroids.T, axis=1)
+            for row, label in zip(range(start, stop), labels.tolist(), strict=True):
+                self._lists[label].append(row)
+
+    # -- search ------------------------------------------------------------
+
+    def search(self, query: np.ndarray, k: int = 5) -> List[Dict]:
+        """
+        Return the `k` most similar live documents
+
+        Returns:
+            list: Documents (id, text, metadata) with cosine similarity `score`, best first
+        """
+        query = normalize(query).reshape(self.dim)
+        with self._lock:
+            if not len(self):
+                return []
+            if self._centroids is not None and len(self) >= self.ivf_threshold:
+                probes = np.argsort(-(self._centroids @ query))[: self.nprobe]
+                candidates = np.concatenate([np.asarray(self._lists[probe], dtype=np.int64) for probe in probes])
+                candidates = candidates[self._alive[candidates]]
+            else:
+                candidates = np.flatnonzero(self._alive)
+            if not len(candidates):
+                return []
+
+            if len(candidates) == len(self._vectors):
+                scores = self._vectors @ query
+            else:
+                scores = self._vectors[candidates] @ query
+            k = min(k, len(candidates))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            results = []
+            for position in top.tolist():
+                document = self._documents[int(candidates[position])]
+                results.append({**document, "score": float(scores[position])})
+            return results
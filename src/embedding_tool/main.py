@@ -1,14 +1,112 @@
+import asyncio
 import os
+import threading
 import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Literal, Optional
 
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from batcher import MicroBatcher
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.responses import JSONResponse
+from formats import BINARY_RESPONSES, binary_response, negotiate
+from index import VectorIndex
 from pydantic import BaseModel, Field
-from sentence_transformers import SentenceTransformer
 
-app = FastAPI(title="Embeddings API", description="API for generating text embeddings", version="1.0.0")
+from docy.embeddings import EmbeddingCache, EmbeddingPool, LazyModel
+
 MODEL_NAME = "all-MiniLM-L6-v2"
-model = SentenceTransformer(MODEL_NAME)
+MAX_BATCH_SIZE = int(os.getenv("EMBED_MAX_BATCH_SIZE", "32"))
+MAX_WAIT_MS = float(os.getenv("EMBED_MAX_WAIT_MS", "5"))
+CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "embedding_cache.sqlite3")
+CACHE_MEMORY_ITEMS = int(os.getenv("EMBED_CACHE_MEMORY_ITEMS", "10000"))
+INDEX_DIR = os.getenv("EMBED_INDEX_DIR", "index")
+INDEX_IVF_THRESHOLD = int(os.getenv("EMBED_INDEX_IVF_THRESHOLD", "50000"))
+INDEX_NPROBE = int(os.getenv("EMBED_INDEX_NPROBE", "8"))
+MODEL_BACKEND = os.getenv("EMBED_MODEL_BACKEND", "torch")
+MODEL_FILE = os.getenv("EMBED_MODEL_FILE") or None
+MODEL_QUANTIZE = os.getenv("EMBED_MODEL_QUANTIZE", "0") == "1"
+WARM_UP = os.getenv("EMBED_WARM_UP", "1") == "1"
+WORKERS = int(os.getenv("EMBED_WORKERS", "0"))
+WORKER_THREADS = int(os.getenv("EMBED_WORKER_THREADS", "1"))
+
+model = LazyModel(MODEL_NAME, backend=MODEL_BACKEND, model_file=MODEL_FILE, quantize=MODEL_QUANTIZE)  # type: ignore[arg-type]
+# With EMBED_WORKERS > 0 encoding runs in a pool of model processes instead of in this one
+pool = EmbeddingPool(model, workers=WORKERS, threads_per_worker=WORKER_THREADS) if WORKERS > 0 else None
+cache = EmbeddingCache(
+    MODEL_NAME, path=CACHE_PATH or None, max_memory_items=CACHE_MEMORY_ITEMS, variant=model.variant
+)
+
+_index: Optional[VectorIndex] = None
+_index_lock = threading.Lock()
+
+
+def encode_uncached(texts: List[str]):
+    if pool is not None:
+        return pool.encode(texts)
+    return model.get().encode(texts, batch_size=MAX_BATCH_SIZE, convert_to_numpy=True)
+
+
+def embedding_dimension() -> int:
+    if pool is not None:
+        pool.start()
+        assert pool.dim is not None
+        return pool.dim
+    return model.get().get_sentence_embedding_dimension()
+
+
+def model_ready() -> bool:
+    return pool.ready if pool is not None else model.loaded
+
+
+def encode(texts: List[str]):
+    return cache.encode(texts, encode_uncached)
+
+
+def get_index() -> VectorIndex:
+    """Open the search index; its dimension comes from the model, so this loads the model too."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                vector_index = VectorIndex(
+                    INDEX_DIR,
+                    dim=embedding_dimension(),
+                    ivf_threshold=INDEX_IVF_THRESHOLD,
+                    nprobe=INDEX_NPROBE,
+                )
+                vector_index.load()
+                _index = vector_index
+    return _index
+
+
+def warm_up():
+    if pool is not None:
+        pool.start()
+    else:
+        model.warm_up()
+    get_index()
+
+
+batcher = MicroBatcher(encode, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS, concurrency=max(WORKERS, 1))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await batcher.start()
+    # Warm up in the background so /health answers immediately; /ready flips once it is done
+    warm_up_task = asyncio.create_task(asyncio.to_thread(warm_up)) if WARM_UP else None
+    yield
+    if warm_up_task:
+        await warm_up_task
+    await batcher.stop()
+    if pool is not None:
+        pool.close()
+
+
+app = FastAPI(
+    title="Embeddings API", description="API for generating text embeddings", version="1.0.0", lifespan=lifespan
+)
 
 
 class EmbeddingRequest(BaseModel):
@@ -19,33 +117,144 @@ class EmbeddingResponse(BaseModel):
     embedding: list = Field(..., description="Generated embedding vector")
     processing_time: float = Field(..., description="Time taken to generate embeddings (seconds)")
 
-class SearchEmbeddingResponse(EmbeddingResponse):
-    text: str
+
+class BatchEmbeddingRequest(BaseModel):
+    texts: List[str] = Field(..., min_length=1, description="Texts to generate embeddings for")
+
+
+class BatchEmbeddingResponse(BaseModel):
+    embeddings: List[list] = Field(..., description="Generated embedding vectors, in request order")
+    processing_time: float = Field(..., description="Time taken to generate embeddings (seconds)")
+
+
+class Document(BaseModel):
+    id: str = Field(..., description="Caller-chosen document id; adding an existing id replaces it")
+    text: str = Field(..., description="Text to embed and return on search hits")
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+
+
+class AddDocumentsRequest(BaseModel):
+    documents: List[Document] = Field(..., min_length=1)
 
 
-@app.post("/embed", response_model=EmbeddingResponse)
-async def get_embedding(request: EmbeddingRequest):
-    """Generate embeddings for the provided text"""
+class SearchRequest(BaseModel):
+    text: str = Field(..., description="Query text")
+    k: int = Field(5, ge=1, le=100, description="Number of results")
+
+
+class SearchResult(Document):
+    score: float = Field(..., description="Cosine similarity to the query")
+
+
+class SearchEmbeddingResponse(BaseModel):
+    results: List[SearchResult]
+    processing_time: float = Field(..., description="Time taken to embed the query and search (seconds)")
+
+
+@app.post("/embed", response_model=EmbeddingResponse, responses=BINARY_RESPONSES)
+async def get_embedding(
+    request: EmbeddingRequest,
+    accept: Optional[str] = Header(None),
+    dtype: Literal["float32", "float16"] = Query("float32", description="Element type of binary responses"),
+):
+    """Generate embeddings for the provided text. Concurrent requests are encoded together."""
+    start_time = time.time()
+
+    try:
+        embedding = await batcher.submit(request.text)
+        processing_time = time.time() - start_time
+
+        media_type = negotiate(accept)
+        if media_type:
+            return binary_response(embedding, media_type, dtype, processing_time)
+        return EmbeddingResponse(embedding=embedding.tolist(), processing_time=processing_time)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating embeddings: {str(e)}") from e
+
+
+@app.post("/embed/batch", response_model=BatchEmbeddingResponse, responses=BINARY_RESPONSES)
+async def get_embeddings(
+    request: BatchEmbeddingRequest,
+    accept: Optional[str] = Header(None),
+    dtype: Literal["float32", "float16"] = Query("float32", description="Element type of binary responses"),
+):
+    """Generate embeddings for many texts in one model call"""
     start_time = time.time()
 
     try:
-        embedding = model.encode(request.text).tolist()
+        embeddings = await batcher.encode_batch(request.texts)
         processing_time = time.time() - start_time
 
-        return EmbeddingResponse(embedding=embedding, processing_time=processing_time)
+        media_type = negotiate(accept)
+        if media_type:
+            return binary_response(embeddings, media_type, dtype, processing_time)
+        return BatchEmbeddingResponse(embeddings=embeddings.tolist(), processing_time=processing_time)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating embeddings: {str(e)}") from e
 
 
+@app.post("/documents", status_code=201)
+async def add_documents(request: AddDocumentsRequest):
+    """Embed documents and add them to the search index"""
+    try:
+        documents = request.documents
+        embeddings = await batcher.encode_batch([document.text for document in documents])
+        index = await asyncio.to_thread(get_index)
+        await asyncio.to_thread(
+            index.add,
+            [document.id for document in documents],
+            [document.text for document in documents],
+            embeddings,
+            [document.metadata for document in documents],
+        )
+        return {"added": len(documents), "total": len(index)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error indexing documents: {str(e)}") from e
+
+
+@app.delete("/documents/{document_id}", status_code=204)
+async def remove_document(document_id: str):
+    """Remove a document from the search index"""
+    index = await asyncio.to_thread(get_index)
+    if not await asyncio.to_thread(index.remove, [document_id]):
+        raise HTTPException(status_code=404, detail=f"Document '{document_id}' not found")
+
+
 @app.post("/search", response_model=SearchEmbeddingResponse)
-async def search_document():
-    pass
+async def search_document(request: SearchRequest):
+    """Find the indexed documents most similar to the query text"""
+    start_time = time.time()
+
+    try:
+        query = await batcher.submit(request.text)
+        index = await asyncio.to_thread(get_index)
+        results = await asyncio.to_thread(index.search, query, request.k)
+        processing_time = time.time() - start_time
+
+        return SearchEmbeddingResponse(results=results, processing_time=processing_time)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching documents: {str(e)}") from e
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "model": MODEL_NAME}
+    return {
+        "status": "healthy",
+        "model": MODEL_NAME,
+        "model_loaded": model_ready(),
+        "workers": WORKERS,
+        "cache": cache.metrics(),
+        "documents": len(_index) if _index is not None else None,
+    }
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once the model and index are loaded, 503 while warming up"""
+    if model_ready() and _index is not None:
+        return {"status": "ready"}
+    return JSONResponse(status_code=503, content={"status": "loading"})
 
 
 if __name__ == "__main__":
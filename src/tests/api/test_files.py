@@ -0,0 +1,83 @@
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from docy.api.v1.endpoints import files
+from docy.services.file_listing import DirectoryListing
+from docy.storage import BlobStore
+
+
+@pytest.fixture
+def data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    blob_store = BlobStore(data_dir / ".blobs")
+    monkeypatch.setattr(files, "DATA_DIR", data_dir)
+    monkeypatch.setattr(files, "blob_store", blob_store)
+    monkeypatch.setattr(files, "listing", DirectoryListing(data_dir, exclude=files._hidden))
+    return data_dir
+
+
+@pytest.fixture
+def client(data_dir: Path) -> TestClient:
+    app = FastAPI()
+    app.include_router(files.router)
+    return TestClient(app)
+
+
+def test_upload_list_and_delete(client: TestClient, data_dir: Path):
+    assert client.put("/files/docs/a.md", content=b"# A\n").status_code == 201
+    upload = client.post("/files/upload", files=[("files", ("b.txt", b"bee", "text/plain"))])
+    assert upload.json() == {"files": [{"name": "b.txt", "size": 3}]}
+
+    listed = client.get("/files/", params={"recursive": True})
+    assert listed.headers["X-Total-Count"] == "2"
+    assert [entry["name"] for entry in listed.json()] == ["b.txt", "docs/a.md"]
+
+    assert client.delete("/files/b.txt").status_code == 204
+    assert [entry["name"] for entry in client.get("/files/").json()] == []
+    assert files.blob_store.resolve(files.BLOB_NAMESPACE, "b.txt") is None
+    assert (data_dir / "docs" / "a.md").read_bytes() == b"# A\n"
+
+
+def test_replacing_a_file_moves_its_blob(client: TestClient):
+    client.put("/files/notes.md", content=b"version 1")
+    client.put("/files/notes.md", content=b"version 2")
+
+    assert client.get("/files/notes.md").content == b"version 2"
+    assert files.blob_store.stats()["unreferenced"] == 1
+
+
+def test_content_chunks_reassemble_utf8(client: TestClient):
+    text = "naïve café ✓ " * 50
+    client.post("/files/", json={"name": "text.md", "content": text})
+
+    parts, offset = [], 0
+    while offset is not None:
+        chunk = client.get("/files/text.md/content", params={"offset": offset, "length": 7}).json()
+        parts.append(chunk["content"])
+        offset = chunk["next_offset"]
+
+    assert "".join(parts) == text
+
+
+def test_range_and_revalidation(client: TestClient):
+    client.put("/files/data.bin", content=b"0123456789")
+
+    partial = client.get("/files/data.bin", headers={"Range": "bytes=2-5"})
+    revalidated = client.get("/files/data.bin", headers={"If-None-Match": partial.headers["etag"]})
+
+    assert (partial.status_code, partial.content) == (206, b"2345")
+    assert revalidated.status_code == 304
+
+
+@pytest.mark.parametrize("name", [".", "docs/..", "../outside.md", ".blobs/raw"])
+def test_invalid_names_are_rejected(client: TestClient, name: str):
+    assert client.post("/files/", json={"name": name, "content": "x"}).status_code == 400
+
+
+def test_missing_file(client: TestClient):
+    assert client.get("/files/missing.md").status_code == 404
+    assert client.delete("/files/missing.md").status_code == 404
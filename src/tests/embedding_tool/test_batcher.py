@@ -0,0 +1,83 @@
+import asyncio
+from typing import List
+
+import numpy as np
+import pytest
+import pytest_asyncio
+
+from embedding_tool.batcher import MicroBatcher
+
+
+class RecordingEncoder:
+    """Embeds each text as [len(text)] and records the batches it was called with."""
+
+    def __init__(self):
+        self.batches: List[List[str]] = []
+        self.fail = False
+        self.drop_last = False
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError("model crashed")
+        embeddings = np.array([[float(len(text))] for text in texts], dtype=np.float32)
+        return embeddings[:-1] if self.drop_last else embeddings
+
+
+@pytest.fixture
+def encoder() -> RecordingEncoder:
+    return RecordingEncoder()
+
+
+@pytest_asyncio.fixture
+async def batcher(encoder: RecordingEncoder):
+    batcher = MicroBatcher(encoder, max_batch_size=4, max_wait_ms=50)
+    await batcher.start()
+    yield batcher
+    await batcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_batches(batcher: MicroBatcher, encoder: RecordingEncoder):
+    texts = ["a" * length for length in range(1, 11)]
+
+    embeddings = await asyncio.gather(*(batcher.submit(text) for text in texts))
+
+    # Each caller gets the embedding of its own text
+    assert [float(embedding[0]) for embedding in embeddings] == [float(len(text)) for text in texts]
+    assert [len(batch) for batch in encoder.batches] == [4, 4, 2]
+
+
+@pytest.mark.asyncio
+async def test_lone_request_is_flushed_after_the_window(batcher: MicroBatcher, encoder: RecordingEncoder):
+    embedding = await asyncio.wait_for(batcher.submit("solo"), timeout=2)
+
+    assert float(embedding[0]) == 4.0
+    assert encoder.batches == [["solo"]]
+
+
+@pytest.mark.asyncio
+async def test_encoder_errors_reach_every_caller(batcher: MicroBatcher, encoder: RecordingEncoder):
+    encoder.fail = True
+    results = await asyncio.gather(batcher.submit("x"), batcher.submit("y"), return_exceptions=True)
+
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+
+    # The failed batch released its encode slot
+    encoder.fail = False
+    assert float((await asyncio.wait_for(batcher.submit("ok"), timeout=2))[0]) == 2.0
+
+
+@pytest.mark.asyncio
+async def test_short_encoder_output_is_an_error(batcher: MicroBatcher, encoder: RecordingEncoder):
+    encoder.drop_last = True
+
+    results = await asyncio.gather(batcher.submit("x"), batcher.submit("y"), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_submit_before_start(encoder: RecordingEncoder):
+    with pytest.raises(RuntimeError):
+        await MicroBatcher(encoder).submit("early")
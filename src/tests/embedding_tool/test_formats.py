@@ -0,0 +1,45 @@
+import io
+
+import numpy as np
+import pytest
+
+from embedding_tool.formats import NPY, OCTET_STREAM, binary_response, negotiate
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        (None, None),
+        ("application/json", None),
+        ("application/octet-stream", OCTET_STREAM),
+        ("Application/X-NPY; q=0.9", NPY),
+        ("text/html, application/x-npy;q=0.5", NPY),
+        ("application/json, application/octet-stream", None),
+        ("*/*", None),
+    ],
+)
+def test_negotiate(accept, expected):
+    assert negotiate(accept) == expected
+
+
+def test_octet_stream_is_the_raw_buffer():
+    embeddings = np.arange(6, dtype=np.float64).reshape(2, 3)
+
+    response = binary_response(embeddings, OCTET_STREAM, "float16", 0.25)
+
+    assert response.media_type == OCTET_STREAM
+    assert response.headers["X-Embedding-Shape"] == "2,3"
+    assert response.headers["X-Embedding-Dtype"] == "<f2"
+    assert response.headers["X-Processing-Time"] == "0.250000"
+    decoded = np.frombuffer(response.body, dtype="<f2").reshape(2, 3)
+    np.testing.assert_array_equal(decoded, embeddings)
+
+
+def test_npy_round_trips():
+    embeddings = np.random.default_rng(0).normal(size=(4, 5)).astype(np.float32)
+
+    response = binary_response(embeddings, NPY, "float32", 0.0)
+
+    loaded = np.load(io.BytesIO(response.body), allow_pickle=False)
+    assert loaded.dtype == np.dtype("<f4")
+    np.testing.assert_array_equal(loaded, embeddings)
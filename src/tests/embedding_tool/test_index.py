@@ -0,0 +1,101 @@
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pytest
+
+from embedding_tool.index import VectorIndex
+
+DIM = 8
+
+
+def unit_vectors(count: int, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).normal(size=(count, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_index(directory: Path, **kwargs) -> VectorIndex:
+    index = VectorIndex(directory, DIM, **kwargs)
+    index.load()
+    return index
+
+
+def result_ids(results: List[dict]) -> List[str]:
+    return [result["id"] for result in results]
+
+
+@pytest.fixture
+def vectors() -> np.ndarray:
+    return unit_vectors(20)
+
+
+@pytest.fixture
+def index(tmp_path: Path, vectors: np.ndarray) -> VectorIndex:
+    index = make_index(tmp_path / "index")
+    ids = [f"doc{number}" for number in range(len(vectors))]
+    index.add(ids, [f"text {number}" for number in range(len(vectors))], vectors, [{"n": n} for n in range(20)])
+    return index
+
+
+def test_search_ranks_by_cosine_similarity(index: VectorIndex, vectors: np.ndarray):
+    results = index.search(vectors[3] * 5, k=3)
+
+    expected = np.argsort(-(vectors @ vectors[3]))[:3]
+    assert result_ids(results) == [f"doc{number}" for number in expected]
+    assert results[0]["score"] == pytest.approx(1.0)
+    assert results[0]["text"] == "text 3" and results[0]["metadata"] == {"n": 3}
+
+
+def test_replace_and_remove(index: VectorIndex, vectors: np.ndarray):
+    index.add(["doc3"], ["moved"], vectors[7:8])
+
+    assert index.remove(["doc7", "missing"]) == 1
+    assert len(index) == 19
+    [best] = index.search(vectors[7], k=1)
+    assert (best["id"], best["text"]) == ("doc3", "moved")
+
+
+def test_log_replay_restores_the_corpus(tmp_path: Path, index: VectorIndex, vectors: np.ndarray):
+    index.add(["doc3"], ["moved"], vectors[7:8])
+    index.remove(["doc7"])
+
+    reloaded = make_index(tmp_path / "index")
+
+    assert len(reloaded) == 19
+    assert reloaded.search(vectors[7], k=1)[0]["text"] == "moved"
+    assert result_ids(reloaded.search(vectors[5], k=5)) == result_ids(index.search(vectors[5], k=5))
+
+
+def test_compact_keeps_live_documents(tmp_path: Path, index: VectorIndex, vectors: np.ndarray):
+    index.remove([f"doc{number}" for number in range(10)])
+    index.compact()
+
+    reloaded = make_index(tmp_path / "index")
+
+    assert len(reloaded) == 10
+    assert reloaded.search(vectors[15], k=1)[0]["id"] == "doc15"
+    assert sorted(path.name for path in (tmp_path / "index").glob("vectors*")) == ["vectors.1.f32"]
+
+
+def test_ivf_finds_exact_matches(tmp_path: Path):
+    vectors = unit_vectors(400, seed=1)
+    index = make_index(tmp_path / "ivf", ivf_threshold=100, nprobe=4)
+    index.add([str(number) for number in range(400)], [""] * 400, vectors)
+
+    assert index._centroids is not None
+    for number in (0, 123, 399):
+        assert index.search(vectors[number], k=1)[0]["id"] == str(number)
+
+    # Clusters are persisted and reused on load
+    reloaded = make_index(tmp_path / "ivf", ivf_threshold=100, nprobe=4)
+    assert reloaded.search(vectors[123], k=1)[0]["id"] == "123"
+
+
+def test_mismatched_lengths(index: VectorIndex, vectors: np.ndarray):
+    with pytest.raises(ValueError):
+        index.add(["a", "b"], ["only one"], vectors[:2])
+    assert len(index) == 20
+
+
+def test_empty_index(tmp_path: Path):
+    assert make_index(tmp_path / "empty").search(unit_vectors(1)[0]) == []
@@ -0,0 +1,170 @@
+from pathlib import Path
+from typing import List
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio.session import AsyncSession
+
+from docy.api.v1.endpoints.artifact import get_artifact_repository
+from docy.main import app
+from docy.models import Artifact, Project
+from docy.repositories.artifact import ArtifactRepository
+from docy.schemas.artifact import ArtifactIn, ArtifactUpdate
+from docy.storage import BlobStore
+
+SNAPSHOT_INTERVAL = 3
+
+
+def revision(number: int, lines: int = 200) -> str:
+    """A long body differing from its neighbours in one line, so revisions are stored as small deltas."""
+    body = [f"line {position}" for position in range(lines)]
+    body[number % lines] = f"line {number % lines} changed in revision {number}"
+    return "\n".join(body) + "\n"
+
+
+@pytest_asyncio.fixture
+async def project(session: AsyncSession) -> Project:
+    project = Project(name="versioned", description="Artifact version tests", framework="none")
+    session.add(project)
+    await session.flush()
+    return project
+
+
+@pytest.fixture
+def repository(session: AsyncSession, tmp_path: Path) -> ArtifactRepository:
+    return ArtifactRepository(session, blob_store=BlobStore(tmp_path / "blobs"), snapshot_interval=SNAPSHOT_INTERVAL)
+
+
+async def create_with_revisions(repository: ArtifactRepository, project: Project, bodies: List[str]) -> int:
+    artifact = await repository.create(
+        ArtifactIn(name="notes", description="", content=bodies[0], project_id=project.id)
+    )
+    for body in bodies[1:]:
+        assert await repository.update(ArtifactUpdate(content=body), artifact) is not None
+    return artifact.id
+
+
+@pytest.mark.asyncio
+async def test_snapshots_every_interval(repository: ArtifactRepository, project: Project):
+    artifact_id = await create_with_revisions(repository, project, [revision(number) for number in range(1, 8)])
+
+    versions = await repository.list_versions(artifact_id)
+
+    assert [version.version for version in versions] == [7, 6, 5, 4, 3, 2, 1]
+    assert {version.version for version in versions if version.is_snapshot} == {1, 4, 7}
+    for version in versions:
+        if version.is_snapshot:
+            assert version.delta_size is None
+        else:
+            assert 0 < version.delta_size < version.size // 2
+
+
+@pytest.mark.asyncio
+async def test_large_change_is_stored_as_snapshot(repository: ArtifactRepository, project: Project):
+    artifact_id = await create_with_revisions(repository, project, [revision(1), "completely different\n"])
+
+    versions = await repository.list_versions(artifact_id)
+
+    assert [(version.version, version.is_snapshot) for version in versions] == [(2, True), (1, True)]
+
+
+@pytest.mark.asyncio
+async def test_every_version_replays_to_its_body(repository: ArtifactRepository, project: Project):
+    bodies = [revision(number) for number in range(1, 9)]
+    artifact_id = await create_with_revisions(repository, project, bodies)
+
+    for number, body in enumerate(bodies, start=1):
+        assert await repository.get_version_content(artifact_id, number) == body
+    assert await repository.get_version_content(artifact_id, len(bodies) + 1) is None
+
+
+@pytest.mark.asyncio
+async def test_unchanged_body_adds_no_version(repository: ArtifactRepository, project: Project):
+    artifact_id = await create_with_revisions(repository, project, [revision(1), revision(1)])
+
+    assert [version.version for version in await repository.list_versions(artifact_id)] == [1]
+
+
+@pytest.mark.asyncio
+async def test_diff_between_versions(repository: ArtifactRepository, project: Project):
+    artifact_id = await create_with_revisions(repository, project, [revision(1), revision(2), revision(3)])
+
+    diff = await repository.diff_versions(artifact_id, 1, 3)
+
+    assert diff.startswith("--- v1\n+++ v3\n")
+    assert "-line 1 changed in revision 1\n" in diff
+    assert "+line 3 changed in revision 3\n" in diff
+    assert "revision 2" not in diff
+    assert await repository.diff_versions(artifact_id, 1, 9) is None
+
+
+@pytest.mark.asyncio
+async def test_list_summaries_skip_description_and_body(repository: ArtifactRepository, project: Project):
+    bodies = ["first body\n", "second, longer body\n", "first body\n"]
+    for number, body in enumerate(bodies):
+        await repository.create(
+            ArtifactIn(name=f"artifact {number}", description="x" * 1000, content=body, project_id=project.id)
+        )
+
+    summaries = await repository.list_summaries(project_id=project.id)
+
+    assert [summary.name for summary in summaries] == ["artifact 0", "artifact 1", "artifact 2"]
+    assert [summary.content_size for summary in summaries] == [len(body.encode()) for body in bodies]
+    assert summaries[0].content_sha == summaries[2].content_sha != summaries[1].content_sha
+    assert [summary.name for summary in await repository.list_summaries(skip=1, limit=1, project_id=project.id)] == [
+        "artifact 1"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_move_inline_content(session: AsyncSession, repository: ArtifactRepository, project: Project):
+    bodies = ["legacy body\n", "another legacy body\n", "legacy body\n"]
+    artifacts = [
+        Artifact(name=f"legacy {number}", description="", content=body, project_id=project.id)
+        for number, body in enumerate(bodies)
+    ]
+    session.add_all(artifacts)
+    await session.flush()
+
+    moved = 0
+    while count := await repository.move_inline_content(batch_size=2):
+        assert count <= 2
+        moved += count
+
+    assert moved == len(bodies)
+    for artifact, body in zip(artifacts, bodies, strict=True):
+        await session.refresh(artifact)
+        assert artifact.content is None
+        assert await repository.read_content(artifact) == body
+    stats = repository.blob_store.stats()
+    assert (stats["blobs"], stats["unreferenced"]) == (2, 0)
+
+
+@pytest.mark.asyncio
+async def test_content_etag_revalidation(client: AsyncClient, repository: ArtifactRepository, project: Project):
+    app.dependency_overrides[get_artifact_repository] = lambda: repository
+    try:
+        artifact = await repository.create(
+            ArtifactIn(name="served", description="", content="# Served\n", project_id=project.id)
+        )
+        url = f"/api/v1/artifacts/{artifact.id}/content"
+
+        response = await client.get(url)
+        etag = response.headers["etag"]
+        assert response.status_code == 200
+        assert response.text == "# Served\n"
+        assert etag == f'"{artifact.content_sha}"'
+        assert response.headers["content-length"] == str(len("# Served\n"))
+
+        not_modified = await client.get(url, headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == etag
+
+        await repository.update(ArtifactUpdate(content="# Changed\n"), artifact)
+        changed = await client.get(url, headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.text == "# Changed\n"
+        assert changed.headers["etag"] != etag
+    finally:
+        del app.dependency_overrides[get_artifact_repository]
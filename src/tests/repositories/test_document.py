@@ -0,0 +1,35 @@
+import csv
+import io
+
+import pytest
+from sqlalchemy.ext.asyncio.session import AsyncSession
+from sqlmodel import select
+
+from docy.models.document import VECTOR_DIMENSIONS, Document
+from docy.repositories.document import DocumentRepository
+from docy.schemas.document import DocumentIn
+
+
+def make_document(name: str, content: str) -> DocumentIn:
+    return DocumentIn(name=name, content=content, doc_metadata={"source": "test"}, embedding=[0.5] * VECTOR_DIMENSIONS)
+
+
+@pytest.mark.asyncio
+async def test_csv_chunks_quote_empty_content():
+    chunks = [chunk async for chunk in DocumentRepository._csv_chunks([make_document("empty.md", "")], batch_size=10)]
+
+    line = b"".join(chunks).decode("utf-8")
+    assert '"empty.md",""' in line
+    assert next(csv.reader(io.StringIO(line)))[1] == ""
+
+
+@pytest.mark.asyncio
+async def test_insert_many_keeps_empty_content(session: AsyncSession):
+    repository = DocumentRepository(session)
+
+    inserted = await repository.insert_many([make_document("empty.md", ""), make_document("full.md", "text")])
+
+    assert inserted == 2
+    result = await session.execute(select(Document).where(Document.name.in_(["empty.md", "full.md"])))
+    rows = result.scalars().all()
+    assert {row.name: row.content for row in rows} == {"empty.md": "", "full.md": "text"}
@@ -0,0 +1,108 @@
+import datetime
+from typing import List
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio.session import AsyncSession
+
+from docy.models import Chat, User
+from docy.models.chat import Message
+from docy.repositories.message import MessageRepository
+
+START = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+@pytest_asyncio.fixture
+async def chat(session: AsyncSession) -> Chat:
+    user = User(name="pager")
+    session.add(user)
+    await session.flush()
+    chat = Chat(name="paging", user_id=user.id)
+    session.add(chat)
+    await session.flush()
+    return chat
+
+
+@pytest_asyncio.fixture
+async def messages(session: AsyncSession, chat: Chat) -> List[Message]:
+    """Seven messages in (created_at, id) order; the middle three share one timestamp."""
+    offsets = [0, 1, 2, 2, 2, 3, 4]
+    messages = [
+        Message(content=f"message {number}", chat_id=chat.id, created_at=START + datetime.timedelta(seconds=offset))
+        for number, offset in enumerate(offsets)
+    ]
+    for message in messages:
+        session.add(message)
+        # One flush per message so ids follow insertion order within the tie
+        await session.flush()
+    return messages
+
+
+def contents(page: List[Message]) -> List[str]:
+    return [message.content for message in page]
+
+
+@pytest.mark.asyncio
+async def test_first_and_latest_pages(session: AsyncSession, chat: Chat, messages: List[Message]):
+    repository = MessageRepository(session)
+
+    first, first_more = await repository.get_page(chat.id, limit=3)
+    latest, latest_more = await repository.get_page(chat.id, limit=3, latest=True)
+    everything, everything_more = await repository.get_page(chat.id, limit=10)
+
+    assert (contents(first), first_more) == (["message 0", "message 1", "message 2"], True)
+    assert (contents(latest), latest_more) == (["message 4", "message 5", "message 6"], True)
+    assert (len(everything), everything_more) == (7, False)
+
+
+@pytest.mark.asyncio
+async def test_after_walks_forward_through_ties(session: AsyncSession, chat: Chat, messages: List[Message]):
+    repository = MessageRepository(session)
+
+    seen: List[str] = []
+    page, has_more = await repository.get_page(chat.id, limit=2)
+    seen += contents(page)
+    while has_more:
+        page, has_more = await repository.get_page(chat.id, after=page[-1].id, limit=2)
+        seen += contents(page)
+
+    assert seen == [f"message {number}" for number in range(7)]
+
+
+@pytest.mark.asyncio
+async def test_before_walks_backward_through_ties(session: AsyncSession, chat: Chat, messages: List[Message]):
+    repository = MessageRepository(session)
+
+    pages: List[List[str]] = []
+    page, has_more = await repository.get_page(chat.id, limit=2, latest=True)
+    pages.append(contents(page))
+    while has_more:
+        page, has_more = await repository.get_page(chat.id, before=page[0].id, limit=2)
+        pages.append(contents(page))
+
+    assert pages == [
+        ["message 5", "message 6"],
+        ["message 3", "message 4"],
+        ["message 1", "message 2"],
+        ["message 0"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cursor_bounds_and_skip(session: AsyncSession, chat: Chat, messages: List[Message]):
+    repository = MessageRepository(session)
+
+    between, has_more = await repository.get_page(chat.id, after=messages[1].id, before=messages[5].id, limit=10)
+    skipped, _ = await repository.get_page(chat.id, skip=3, limit=2)
+
+    assert (contents(between), has_more) == (["message 2", "message 3", "message 4"], False)
+    assert contents(skipped) == ["message 3", "message 4"]
+
+
+@pytest.mark.asyncio
+async def test_unknown_cursor_is_404(session: AsyncSession, chat: Chat, messages: List[Message]):
+    with pytest.raises(HTTPException) as error:
+        await MessageRepository(session).get_page(chat.id, before=messages[-1].id + 1000)
+
+    assert error.value.status_code == 404
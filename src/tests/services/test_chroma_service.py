@@ -0,0 +1,83 @@
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pytest
+
+from docy.services.chroma_service import ChromaService, ChromaVectorDB, content_id
+
+
+class CountingEmbeddingModel:
+    """Deterministic vectors; remembers every text it was asked to embed."""
+
+    def __init__(self):
+        self.embedded: List[str] = []
+
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        self.embedded.extend(texts)
+        return np.array([[len(text) + 1.0, text.count("a") + 1.0, 1.0] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def model() -> CountingEmbeddingModel:
+    return CountingEmbeddingModel()
+
+
+@pytest.fixture
+def chroma(tmp_path: Path, model: CountingEmbeddingModel) -> ChromaService:
+    return ChromaService(str(tmp_path / "chroma"), embedding_model=model)
+
+
+def test_content_id_covers_metadata():
+    assert content_id("text") == content_id("text", {})
+    assert content_id("text", {"a": 1, "b": 2}) == content_id("text", {"b": 2, "a": 1})
+    assert content_id("text", {"a": 1}) != content_id("text", {"a": 2})
+
+
+def test_unchanged_documents_are_not_reembedded(chroma: ChromaService, model: CountingEmbeddingModel):
+    first = chroma.upsert_documents("docs", ["alpha", "beta", "alpha"])
+    model.embedded.clear()
+    second = chroma.upsert_documents("docs", ["alpha", "beta", "gamma"], metadatas=[None, None, {"k": "v"}])
+
+    assert first == {"written": 2, "skipped": 1}
+    assert second == {"written": 1, "skipped": 2}
+    assert model.embedded == ["gamma"]
+    assert chroma.get("docs").count() == 3
+
+
+def test_explicit_ids_are_overwritten(chroma: ChromaService):
+    chroma.upsert_documents("docs", ["old"], ids=["one"])
+    stats = chroma.upsert_documents("docs", ["new"], ids=["one"])
+
+    assert stats == {"written": 1, "skipped": 0}
+    assert chroma.get_documents("docs")["documents"] == ["new"]
+
+
+def test_writes_are_chunked(chroma: ChromaService):
+    chroma._max_batch_size = 2
+
+    stats = chroma.upsert_documents("docs", [f"document {number}" for number in range(5)])
+
+    assert stats == {"written": 5, "skipped": 0}
+    assert chroma.get("docs").count() == 5
+
+
+def test_mismatched_lengths(chroma: ChromaService):
+    with pytest.raises(ValueError):
+        chroma.upsert_documents("docs", ["a", "b"], metadatas=[{}])
+    with pytest.raises(ValueError):
+        chroma.upsert_documents("docs", ["a", "b"], ids=["only"])
+    with pytest.raises(ValueError):
+        chroma.upsert_documents("docs", ["a"], embeddings=[])
+
+
+def test_vector_db_round_trip(chroma: ChromaService, model: CountingEmbeddingModel):
+    database = ChromaVectorDB(chroma, "vectors")
+    texts = ["aaa", "bbbbbbbb", "ab"]
+
+    database.insert(model.generate_embeddings(texts), [{"content": text, "n": n} for n, text in enumerate(texts)])
+    [hit] = database.search("aaa", k=1)
+
+    assert hit["content"] == "aaa"
+    assert hit["metadata"] == {"n": 0}
+    assert hit["score"] == pytest.approx(1.0, abs=1e-5)
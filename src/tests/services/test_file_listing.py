@@ -0,0 +1,114 @@
+import os
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from docy.services.file_listing import DirectoryListing, FileEntry
+
+
+def write(path: Path, size: int) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def bump_mtime(directory: Path) -> None:
+    """Move a directory's mtime forward, so the change is seen even on coarse-grained file systems."""
+    stat = directory.stat()
+    os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+
+
+def names(entries: List[FileEntry]) -> List[str]:
+    return [entry.path for entry in entries]
+
+
+@pytest.fixture
+def root(tmp_path: Path) -> Path:
+    root = tmp_path / "data"
+    write(root / "b.md", 30)
+    write(root / "A.txt", 10)
+    write(root / "c.md", 20)
+    write(root / "docs" / "guide.md", 5)
+    write(root / "docs" / "deep" / "api.md", 7)
+    write(root / ".upload.link", 1)
+    return root
+
+
+@pytest.fixture
+def listing(root: Path) -> DirectoryListing:
+    return DirectoryListing(root, exclude=lambda name: name.endswith(".link"))
+
+
+def test_pages_in_sort_order(listing: DirectoryListing):
+    total, first = listing.page(limit=2)
+    _, second = listing.page(offset=2, limit=2)
+    _, by_size = listing.page(sort="size", descending=True)
+
+    assert total == 3
+    assert names(first) == ["A.txt", "b.md"]
+    assert names(second) == ["c.md"]
+    assert names(by_size) == ["b.md", "c.md", "A.txt"]
+
+
+def test_recursive_listing_and_patterns(listing: DirectoryListing):
+    total, entries = listing.page(recursive=True)
+    _, markdown = listing.page(recursive=True, pattern="*.md")
+    _, docs = listing.page(recursive=True, pattern="docs/*.md")
+
+    assert total == 5
+    assert names(entries) == ["A.txt", "b.md", "c.md", "docs/deep/api.md", "docs/guide.md"]
+    assert names(markdown) == ["b.md", "c.md", "docs/deep/api.md", "docs/guide.md"]
+    assert names(docs) == ["docs/guide.md"]
+
+
+def test_new_and_removed_files_are_picked_up(root: Path, listing: DirectoryListing):
+    listing.page(recursive=True)
+
+    write(root / "d.md", 1)
+    (root / "b.md").unlink()
+    bump_mtime(root)
+    write(root / "docs" / "deep" / "new.md", 1)
+    bump_mtime(root / "docs" / "deep")
+
+    _, entries = listing.page(recursive=True)
+
+    assert names(entries) == ["A.txt", "c.md", "d.md", "docs/deep/api.md", "docs/deep/new.md", "docs/guide.md"]
+
+
+def test_removed_subdirectory_is_dropped(root: Path, listing: DirectoryListing):
+    listing.page(recursive=True)
+
+    (root / "docs" / "deep" / "api.md").unlink()
+    (root / "docs" / "deep").rmdir()
+    bump_mtime(root / "docs")
+
+    _, entries = listing.page(recursive=True)
+
+    assert names(entries) == ["A.txt", "b.md", "c.md", "docs/guide.md"]
+
+
+def test_in_place_rewrite_needs_invalidate(root: Path, listing: DirectoryListing):
+    assert listing.page(sort="size")[1][0].size == 10
+
+    # Rewriting an existing file leaves the directory mtime alone, so the snapshot is reused
+    write(root / "A.txt", 50)
+    assert names(listing.page(sort="size")[1]) == ["A.txt", "c.md", "b.md"]
+
+    listing.invalidate(root / "A.txt")
+    _, entries = listing.page(sort="size")
+
+    assert names(entries) == ["c.md", "b.md", "A.txt"]
+    assert entries[-1].size == 50
+
+
+def test_invalidate_outside_root_is_ignored(tmp_path: Path, listing: DirectoryListing):
+    listing.page()
+    listing.invalidate(tmp_path / "elsewhere" / "file.txt")
+
+    assert listing.page()[0] == 3
+
+
+def test_unknown_sort_key(listing: DirectoryListing):
+    with pytest.raises(ValueError):
+        listing.page(sort="owner")
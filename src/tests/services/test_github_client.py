@@ -0,0 +1,106 @@
+import hashlib
+import json
+from typing import Dict, List
+
+import httpx
+import pytest
+
+from docy.services.github_cache import GithubCache
+from docy.services.github_client import GithubClient
+from docy.services.github_service import GithubService
+
+REPO = "octo/docs"
+
+
+class FakeGithub:
+    """In-process GitHub API serving one repository tree, recording every request it receives."""
+
+    def __init__(self, files: Dict[str, bytes]):
+        self.files = files
+        self.requests: List[httpx.Request] = []
+
+    @property
+    def tree_etag(self) -> str:
+        return f'"tree-{hash(tuple(sorted(self.files.items())))}"'
+
+    def blob_sha(self, path: str) -> str:
+        return hashlib.sha1(self.files[path]).hexdigest()
+
+    def blob_requests(self) -> List[str]:
+        return [request.url.path.rsplit("/", 1)[-1] for request in self.requests if "/git/blobs/" in request.url.path]
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        path = request.url.path
+        if path.startswith(f"/repos/{REPO}/git/trees/"):
+            if request.headers.get("if-none-match") == self.tree_etag:
+                return httpx.Response(304, headers={"etag": self.tree_etag})
+            tree = [{"path": "docs", "type": "tree", "sha": "docs-tree"}] + [
+                {"path": name, "type": "blob", "sha": self.blob_sha(name), "size": len(content)}
+                for name, content in self.files.items()
+            ]
+            return httpx.Response(
+                200,
+                headers={"etag": self.tree_etag, "content-type": "application/json"},
+                content=json.dumps({"tree": tree, "truncated": False}).encode(),
+            )
+        if path.startswith(f"/repos/{REPO}/git/blobs/"):
+            sha = path.rsplit("/", 1)[-1]
+            for name in self.files:
+                if self.blob_sha(name) == sha:
+                    return httpx.Response(200, content=self.files[name])
+        return httpx.Response(404, json={"message": "Not Found"})
+
+
+@pytest.fixture
+def fake_github() -> FakeGithub:
+    return FakeGithub({"README.md": b"# Docs", "docs/intro.md": b"Intro", "docs/guide.md": b"Guide"})
+
+
+def make_client(fake: FakeGithub, cache: GithubCache) -> GithubClient:
+    return GithubClient(api_url="https://api.test", transport=httpx.MockTransport(fake.handler), cache=cache)
+
+
+@pytest.mark.asyncio
+async def test_not_modified_replays_cached_body(fake_github: FakeGithub):
+    cache = GithubCache()
+    async with make_client(fake_github, cache) as client:
+        first, _ = await client.get_tree(REPO)
+        second, _ = await client.get_tree(REPO)
+
+    assert first == second
+    assert cache.stats["not_modified"] == 1
+    assert "if-none-match" not in fake_github.requests[0].headers
+    assert fake_github.requests[1].headers["if-none-match"] == fake_github.tree_etag
+
+
+@pytest.mark.asyncio
+async def test_blobs_are_fetched_once_per_sha(fake_github: FakeGithub):
+    cache = GithubCache()
+    sha = fake_github.blob_sha("docs/intro.md")
+    async with make_client(fake_github, cache) as client:
+        assert await client.get_blob(REPO, sha) == b"Intro"
+    async with make_client(fake_github, cache) as client:
+        assert await client.get_blob(REPO, sha) == b"Intro"
+
+    assert fake_github.blob_requests() == [sha]
+    assert cache.stats["blob_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_skip_unchanged_only_fetches_changed_files(fake_github: FakeGithub):
+    transport = httpx.MockTransport(fake_github.handler)
+    service = GithubService(api_url="https://api.test", transport=transport, cache=GithubCache())
+
+    first = dict([item async for item in service.iter_docs(REPO, skip_unchanged=True)])
+    assert first == {"README.md": "# Docs", "docs/intro.md": "Intro", "docs/guide.md": "Guide"}
+
+    fake_github.files["docs/guide.md"] = b"Guide, revised"
+    del fake_github.files["README.md"]
+    fake_github.requests.clear()
+    changes: Dict[str, List[str]] = {}
+    second = dict([item async for item in service.iter_docs(REPO, skip_unchanged=True, changes=changes)])
+
+    assert second == {"docs/guide.md": "Guide, revised"}
+    assert changes == {"unchanged": ["docs/intro.md"], "removed": ["README.md"]}
+    assert fake_github.blob_requests() == [fake_github.blob_sha("docs/guide.md")]
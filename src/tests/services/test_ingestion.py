@@ -0,0 +1,104 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pytest
+
+from docy.services.ingestion import IngestionCheckpoint, IngestionPipeline, local_directory_source
+
+
+class FakeEmbeddingModel:
+    def __init__(self):
+        self.calls: List[int] = []
+
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        self.calls.append(len(texts))
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+
+class MemorySink:
+    """Keeps the stored chunk texts per document; optionally fails when a given document is stored."""
+
+    def __init__(self, fail_on: Optional[str] = None):
+        self.fail_on = fail_on
+        self.documents: Dict[str, List[str]] = {}
+        self.replaced: List[str] = []
+
+    async def replace(self, name: str, texts: List[str], embeddings: np.ndarray, metadatas: List[Dict[str, Any]]):
+        if name == self.fail_on:
+            raise RuntimeError(f"cannot store {name}")
+        assert len(embeddings) == len(texts) == len(metadatas)
+        self.documents[name] = texts
+        self.replaced.append(name)
+
+    async def delete(self, name: str):
+        self.documents.pop(name, None)
+
+
+@pytest.fixture
+def docs_dir(tmp_path: Path) -> Path:
+    root = tmp_path / "docs"
+    (root / "guide").mkdir(parents=True)
+    (root / "index.md").write_text("# Index\n\nWelcome.\n", encoding="utf-8")
+    (root / "guide" / "install.md").write_text(
+        "# Install\n\nRun it.\n\n## Upgrade\n\nRun it again.\n", encoding="utf-8"
+    )
+    (root / "guide" / "usage.md").write_text("# Usage\n\nCall it.\n", encoding="utf-8")
+    (root / "build.py").write_text("print('not a doc')", encoding="utf-8")
+    return root
+
+
+def make_pipeline(sink: MemorySink, checkpoint_path: Path, batch_size: int = 64) -> IngestionPipeline:
+    return IngestionPipeline(
+        sink, FakeEmbeddingModel(), checkpoint=IngestionCheckpoint(checkpoint_path, save_every=1), batch_size=batch_size
+    )
+
+
+@pytest.mark.asyncio
+async def test_pipeline_stores_every_document(docs_dir: Path, tmp_path: Path):
+    sink = MemorySink()
+    pipeline = make_pipeline(sink, tmp_path / "state" / "checkpoint.json", batch_size=2)
+
+    report = await pipeline.run(local_directory_source(docs_dir))
+
+    assert sorted(sink.documents) == ["guide/install.md", "guide/usage.md", "index.md"]
+    assert report["seen"] == report["stored"] == 3
+    assert report["chunks"] == sum(len(texts) for texts in sink.documents.values())
+    assert max(pipeline.embedding_model.calls) <= 2
+    assert all(text.startswith("guide/install.md") for text in sink.documents["guide/install.md"])
+
+
+@pytest.mark.asyncio
+async def test_rerun_skips_unchanged_and_prunes_removed(docs_dir: Path, tmp_path: Path):
+    checkpoint_path = tmp_path / "state" / "checkpoint.json"
+    sink = MemorySink()
+    await make_pipeline(sink, checkpoint_path).run(local_directory_source(docs_dir))
+
+    (docs_dir / "index.md").write_text("# Index\n\nWelcome back.\n", encoding="utf-8")
+    (docs_dir / "guide" / "usage.md").unlink()
+    sink.replaced.clear()
+    report = await make_pipeline(sink, checkpoint_path).run(local_directory_source(docs_dir), prune=True)
+
+    assert sink.replaced == ["index.md"]
+    assert (report["stored"], report["skipped"], report["pruned"]) == (1, 1, 1)
+    assert sorted(sink.documents) == ["guide/install.md", "index.md"]
+
+
+@pytest.mark.asyncio
+async def test_interrupted_run_resumes_from_checkpoint(docs_dir: Path, tmp_path: Path):
+    checkpoint_path = tmp_path / "state" / "checkpoint.json"
+    failing = MemorySink(fail_on="guide/usage.md")
+
+    with pytest.raises(RuntimeError):
+        await make_pipeline(failing, checkpoint_path).run(local_directory_source(docs_dir))
+
+    stored_before = set(IngestionCheckpoint(checkpoint_path).versions)
+    # Documents are stored in walk order, so everything before the failing one is checkpointed
+    assert stored_before == set(failing.replaced) == {"index.md", "guide/install.md"}
+
+    sink = MemorySink()
+    report = await make_pipeline(sink, checkpoint_path).run(local_directory_source(docs_dir))
+
+    assert sink.replaced == ["guide/usage.md"]
+    assert report["skipped"] == 2
+    assert set(IngestionCheckpoint(checkpoint_path).versions) == {"guide/install.md", "guide/usage.md", "index.md"}
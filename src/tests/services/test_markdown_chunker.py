@@ -0,0 +1,116 @@
+import io
+
+import pytest
+
+from docy.services.markdown_chunker import MarkdownChunker
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+def make_chunker(max_tokens: int, overlap_tokens: int = 0) -> MarkdownChunker:
+    return MarkdownChunker(max_tokens=max_tokens, overlap_tokens=overlap_tokens, count_tokens=count_words)
+
+
+def test_breadcrumbs_follow_heading_levels():
+    source = "# Guide\n\nIntro.\n\n## Install\n\nRun it.\n\n### Linux\n\nApt.\n\n## Usage\n\nCall it.\n\n# Reference\n\nAPI.\n"
+
+    chunks = list(make_chunker(50).chunk(source))
+
+    assert [chunk.breadcrumbs for chunk in chunks] == [
+        ["Guide"],
+        ["Guide", "Install"],
+        ["Guide", "Install", "Linux"],
+        ["Guide", "Usage"],
+        ["Reference"],
+    ]
+    assert [chunk.text for chunk in chunks] == ["Intro.", "Run it.", "Apt.", "Call it.", "API."]
+    assert chunks[1].with_context("guide.md") == "guide.md > Guide > Install\nRun it."
+
+
+def test_headings_inside_fences_are_code():
+    source = "# Shell\n\n```sh\n# install the tool\npip install docy\n```\n\nDone.\n"
+
+    [chunk] = make_chunker(50).chunk(source)
+
+    assert chunk.breadcrumbs == ["Shell"]
+    assert chunk.text == "```sh\n# install the tool\npip install docy\n```\n\nDone."
+
+
+def test_unterminated_fence_runs_to_the_end():
+    source = "# Code\n\n~~~\n# still code\n\n## also code\n"
+
+    [chunk] = make_chunker(50).chunk(source)
+
+    assert chunk.breadcrumbs == ["Code"]
+    assert chunk.text == "~~~\n# still code\n\n## also code"
+
+
+def test_long_code_block_is_split_between_lines_and_refenced():
+    body = [f"step {number} of the build" for number in range(12)]
+    source = "```python\n" + "\n".join(body) + "\n```\n"
+
+    chunks = list(make_chunker(12).chunk(source))
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        lines = chunk.text.split("\n")
+        assert lines[0] == "```python"
+        assert lines[-1] == "```"
+        assert chunk.tokens <= 12
+    assert [line for chunk in chunks for line in chunk.text.split("\n")[1:-1]] == body
+    # Each piece starts at its first body line
+    assert [chunk.start_line for chunk in chunks] == [2, 4, 6, 8, 10, 12]
+
+
+def test_long_table_repeats_its_header():
+    header = ["| name | size |", "|------|-----:|"]
+    rows = [f"| file{number} | {number} |" for number in range(10)]
+    source = "\n".join(header + rows) + "\n"
+
+    chunks = list(make_chunker(20).chunk(source))
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.text.split("\n")[:2] == header
+        assert chunk.tokens <= 20
+    assert [line for chunk in chunks for line in chunk.text.split("\n")[2:]] == rows
+
+
+def test_consecutive_chunks_overlap_within_a_section():
+    paragraphs = [f"paragraph {number} has exactly six words" for number in range(6)]
+    source = "# Notes\n\n" + "\n\n".join(paragraphs) + "\n"
+
+    chunks = list(make_chunker(max_tokens=18, overlap_tokens=6).chunk(source))
+
+    assert len(chunks) > 1
+    for previous, current in zip(chunks, chunks[1:], strict=False):
+        # The last paragraph of a chunk is repeated at the start of the next one
+        assert current.text.startswith(previous.text.split("\n\n")[-1])
+        assert current.tokens <= 18
+    new_paragraphs = [chunks[0].text.split("\n\n")] + [chunk.text.split("\n\n")[1:] for chunk in chunks[1:]]
+    assert [paragraph for group in new_paragraphs for paragraph in group] == paragraphs
+    # start_line points at the first paragraph new to the chunk, not at the carried one
+    assert [chunk.start_line for chunk in chunks] == [3, 9, 13]
+
+
+def test_overlap_never_crosses_sections():
+    source = "# One\n\n" + " ".join(["word"] * 10) + "\n\n# Two\n\nshort\n"
+
+    chunks = list(make_chunker(max_tokens=8, overlap_tokens=3).chunk(source))
+
+    assert chunks[-1].breadcrumbs == ["Two"]
+    assert chunks[-1].text == "short"
+
+
+def test_lines_stream_like_a_string():
+    source = "# A\n\n" + "\n\n".join(f"line {number} " * 5 for number in range(20)) + "\n"
+    chunker = make_chunker(max_tokens=30, overlap_tokens=5)
+
+    assert list(chunker.chunk(io.StringIO(source))) == list(chunker.chunk(source))
+
+
+def test_overlap_must_be_smaller_than_chunks():
+    with pytest.raises(ValueError):
+        MarkdownChunker(max_tokens=10, overlap_tokens=10)
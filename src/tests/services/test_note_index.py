@@ -0,0 +1,127 @@
+import os
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from docy.services.note_index import NoteEntry, NoteIndex, link_key
+
+
+def write(path: Path, text: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def touch_later(path: Path) -> None:
+    """Move a file's mtime forward, so a rewrite is seen even on coarse-grained file systems."""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+
+
+def ids(entries: List[NoteEntry]) -> List[str]:
+    return [entry.id for entry in entries]
+
+
+@pytest.fixture
+def vault(tmp_path: Path) -> Path:
+    vault = tmp_path / "vault"
+    write(
+        vault / "home.md",
+        "---\ntitle: Home\ntags: [start]\n---\n\nSee [[Guide]] and [[projects/plan#Goals|the plan]].\n",
+    )
+    write(vault / "guide.md", "# Guide\n\nBack to [[home]]. Missing [[nowhere]]. #howto\n")
+    write(vault / "projects" / "plan.md", "---\ntitle: Plan\n---\n\nLinks to [[Guide.md]].\n")
+    write(vault / ".obsidian" / "hidden.md", "Never indexed.\n")
+    return vault
+
+
+@pytest.fixture
+def index(vault: Path) -> NoteIndex:
+    index = NoteIndex(vault)
+    index.refresh()
+    return index
+
+
+def test_link_key_normalizes_targets():
+    assert link_key("Folder/Note#Heading|Alias") == "folder/note"
+    assert link_key("folder\\note.md") == "folder/note"
+    assert link_key("Note^block") == "note"
+
+
+def test_links_backlinks_and_tags(index: NoteIndex):
+    assert len(index) == 3
+    assert index.outgoing("home.md") == ["guide.md", "projects/plan.md"]
+    assert index.backlinks("guide.md") == ["home.md", "projects/plan.md"]
+    assert index.unresolved("guide.md") == ["nowhere"]
+    assert index.resolve("Plan") == "projects/plan.md"
+    assert index.notes_with_tag("#howto") == ["guide.md"]
+    assert index.notes_with_tag("start") == ["home.md"]
+
+
+def test_ambiguous_names_resolve_to_the_shortest_path(vault: Path, index: NoteIndex):
+    write(vault / "archive" / "guide.md", "Old guide.\n")
+    index.refresh()
+
+    assert index.resolve("guide") == "guide.md"
+    assert index.backlinks("archive/guide.md") == []
+
+
+def test_refresh_rereads_only_changed_notes(vault: Path, index: NoteIndex):
+    assert index.refresh() is False
+
+    write(vault / "guide.md", "# Guide\n\nNo links any more.\n")
+    touch_later(vault / "guide.md")
+    (vault / "projects" / "plan.md").unlink()
+
+    assert index.refresh() is True
+    assert ids(index.page()) == ["guide.md", "home.md"]
+    assert index.backlinks("home.md") == []
+    assert index.outgoing("home.md") == ["guide.md"]
+    assert index.unresolved("home.md") == ["projects/plan"]
+
+
+def test_index_is_persisted(vault: Path, index: NoteIndex):
+    reloaded = NoteIndex(vault)
+    reloaded.load()
+
+    assert sorted(ids(reloaded.entries())) == sorted(ids(index.entries()))
+    assert reloaded.backlinks("guide.md") == ["home.md", "projects/plan.md"]
+    assert reloaded.refresh() is False
+
+
+def test_corrupt_index_is_rebuilt(vault: Path, index: NoteIndex):
+    index.index_path.write_text("{not json", encoding="utf-8")
+
+    reloaded = NoteIndex(vault)
+    reloaded.refresh()
+
+    assert len(reloaded) == 3
+
+
+def test_pages_follow_incremental_updates(vault: Path, index: NoteIndex):
+    assert ids(index.page(limit=2)) == ["guide.md", "home.md"]
+    assert ids(index.page(offset=2)) == ["projects/plan.md"]
+    assert ids(index.page(sort="folder", descending=True)) == ["projects/plan.md", "home.md", "guide.md"]
+
+    # The sorted orders built above are kept in place rather than rebuilt
+    index.update_note(write(vault / "about.md", "---\ntitle: About\n---\n"))
+    index.remove_note(vault / "home.md")
+
+    assert ids(index.page(limit=2)) == ["about.md", "guide.md"]
+    assert ids(index.page(descending=True, offset=1, limit=1)) == ["guide.md"]
+    assert ids(index.page(sort="folder", descending=True)) == ["projects/plan.md", "guide.md", "about.md"]
+    assert index.page(offset=10) == []
+
+
+def test_neighborhood_walks_both_directions(index: NoteIndex):
+    nodes, edges, unresolved = index.neighborhood("projects/plan.md", depth=1)
+
+    assert nodes == ["guide.md", "home.md", "projects/plan.md"]
+    assert edges == [("home.md", "projects/plan.md"), ("projects/plan.md", "guide.md")]
+    assert unresolved == {"guide.md": ["nowhere"]}
+
+
+def test_unknown_sort_key(index: NoteIndex):
+    with pytest.raises(ValueError):
+        index.page(sort="size")
@@ -0,0 +1,73 @@
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pytest
+
+from docy.services.chroma_service import ChromaService
+from docy.services.note_search import NoteSemanticIndex
+from docy.services.note_service import NoteService
+
+
+class FakeEmbeddingModel:
+    """Deterministic vectors; raises on the next call while `fail` is set."""
+
+    def __init__(self):
+        self.fail = False
+        self.embedded: List[str] = []
+
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        if self.fail:
+            raise RuntimeError("embedding backend unavailable")
+        self.embedded.extend(texts)
+        return np.array([[len(text) % 7 + 1.0, text.count("e") + 1.0, 1.0] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def vault(tmp_path: Path) -> Path:
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    (vault / "alpha.md").write_text("# Alpha\n\nFirst section.\n\n## More\n\nSecond section.\n", encoding="utf-8")
+    (vault / "beta.md").write_text("# Beta\n\nOnly section.\n", encoding="utf-8")
+    return vault
+
+
+def make_index(vault: Path, tmp_path: Path, model: FakeEmbeddingModel, batch_size: int = 64) -> NoteSemanticIndex:
+    chroma = ChromaService(str(tmp_path / "chroma"), embedding_model=model)
+    return NoteSemanticIndex(NoteService(str(vault)), chroma, model, batch_size=batch_size)
+
+
+def test_unchanged_notes_are_not_reembedded(vault: Path, tmp_path: Path):
+    model = FakeEmbeddingModel()
+    index = make_index(vault, tmp_path, model, batch_size=2)
+
+    first = index.sync()
+    model.embedded.clear()
+    second = index.sync()
+
+    assert first["notes"] == 2 and first["embedded"] > 0
+    assert second == {"notes": 0, "embedded": 0, "deleted": 0}
+    assert model.embedded == []
+
+
+def test_failed_batch_leaves_notes_unsynced(vault: Path, tmp_path: Path):
+    model = FakeEmbeddingModel()
+    index = make_index(vault, tmp_path, model)
+
+    # Every note fits one batch, so nothing is embedded before the final flush fails
+    model.fail = True
+    with pytest.raises(RuntimeError):
+        index.sync()
+    assert index._synced == {}
+
+    model.fail = False
+    stats = index.sync()
+
+    assert stats["notes"] == 2
+    assert sorted(section["note_id"] for section in index.search("section", k=10)) == [
+        "alpha.md",
+        "alpha.md",
+        "beta.md",
+    ]
+    # A fresh index rebuilds the synced map from the collection and finds nothing to do
+    assert make_index(vault, tmp_path, model).sync()["notes"] == 0
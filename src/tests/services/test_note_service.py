@@ -0,0 +1,86 @@
+import os
+from pathlib import Path
+
+import frontmatter
+import pytest
+
+from docy.services.note_service import NoteService, compile_template, render_template
+
+
+@pytest.fixture
+def service(tmp_path: Path) -> NoteService:
+    vault = tmp_path / "vault"
+    (vault / "projects").mkdir(parents=True)
+    (vault / "alpha.md").write_text("---\ntitle: Alpha\n---\n\nSee [[beta]].\n", encoding="utf-8")
+    (vault / "projects" / "beta.md").write_text("---\ntitle: Beta\n---\n\nOld body.\n", encoding="utf-8")
+    return NoteService(str(vault))
+
+
+def read_post(path: Path) -> frontmatter.Post:
+    with open(path, "r", encoding="utf-8") as file:
+        return frontmatter.load(file)
+
+
+def test_update_by_listed_id(service: NoteService):
+    _, entries = service.list_notes()
+    note_id = next(entry.id for entry in entries if entry.title == "Beta")
+
+    [note] = service.write_notes(updates=[{"note_path": note_id, "content": "New body.", "metadata": {"tags": ["x"]}}])
+
+    post = read_post(service.vault_path / "projects" / "beta.md")
+    assert note_id == "projects/beta.md"
+    assert post.content == "New body."
+    assert post.metadata == {"title": "Beta", "tags": ["x"]}
+    assert note["content"] == "New body."
+    assert service.get_notes_by_tag("x")[0].id == note_id
+
+
+def test_update_by_title(service: NoteService):
+    service.write_notes(updates=[{"note_path": "Beta", "content": "Renamed body."}])
+
+    assert read_post(service.vault_path / "projects" / "beta.md").content == "Renamed body."
+
+
+def test_update_missing_or_outside_vault(service: NoteService, tmp_path: Path):
+    (tmp_path / "outside.md").write_text("secret", encoding="utf-8")
+
+    with pytest.raises(FileNotFoundError):
+        service.write_notes(updates=[{"note_path": "missing.md", "content": "x"}])
+    with pytest.raises(ValueError):
+        service.write_notes(updates=[{"note_path": "../outside.md", "content": "x"}])
+
+
+def test_list_notes_pages_without_reading_content(service: NoteService):
+    total, first = service.list_notes(limit=1)
+    _, rest = service.list_notes(offset=1, limit=5)
+    _, by_folder = service.list_notes(sort="folder", descending=True)
+
+    assert total == 2
+    assert [entry.title for entry in first + rest] == ["Alpha", "Beta"]
+    assert [entry.id for entry in by_folder] == ["projects/beta.md", "alpha.md"]
+    assert not hasattr(first[0], "content")
+
+
+def test_render_template_keeps_unknown_placeholders():
+    parts = compile_template("# {{ title }}\n{{date}} by {{author}}")
+
+    assert render_template(parts, {"title": "Plan", "date": "2026-01-01"}) == "# Plan\n2026-01-01 by {{author}}"
+
+
+def test_template_is_recompiled_when_the_file_changes(service: NoteService):
+    template = service.vault_path / "templates" / "meeting.md"
+    template.parent.mkdir()
+    template.write_text("## {{title}} with {{who}}", encoding="utf-8")
+
+    first = service.create_note("Standup", "Notes.", template="meeting", variables={"who": "team"})
+    cached = service._get_template("meeting")
+    assert service._get_template("meeting") is cached
+
+    template.write_text("## {{title}} ({{folder}})", encoding="utf-8")
+    stat = template.stat()
+    os.utime(template, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+    second = service.create_note("Retro", template="meeting", folder="projects")
+
+    assert read_post(first).content == "## Standup with team\nNotes."
+    assert read_post(second).content == "## Retro (projects)"
+    assert service.create_note("Plain", "Body.", template="missing").read_text(encoding="utf-8").endswith("Body.")
@@ -0,0 +1,36 @@
+import pytest
+
+from docy.services.retrieval import reciprocal_rank_fusion
+
+
+def test_documents_found_by_both_rankings_win():
+    fused = reciprocal_rank_fusion({"lexical": [1, 2, 3], "vector": [3, 4, 1]}, {})
+
+    assert [doc_id for doc_id, _ in fused] == [1, 3, 2, 4]
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 63)
+    assert fused[-1][1] == pytest.approx(1 / 62)
+
+
+def test_weights_scale_each_ranking():
+    rankings = {"lexical": [1, 2], "vector": [2, 1]}
+
+    lexical_heavy = reciprocal_rank_fusion(rankings, {"lexical": 2.0, "vector": 1.0})
+    vector_only = reciprocal_rank_fusion(rankings, {"lexical": 0.0, "vector": 1.0})
+
+    assert [doc_id for doc_id, _ in lexical_heavy] == [1, 2]
+    assert [doc_id for doc_id, _ in vector_only] == [2, 1]
+    assert vector_only[0][1] == pytest.approx(1 / 61)
+
+
+def test_k_flattens_rank_differences():
+    rankings = {"lexical": [1, 2]}
+
+    steep = reciprocal_rank_fusion(rankings, {}, k=1)
+    flat = reciprocal_rank_fusion(rankings, {}, k=1000)
+
+    assert steep[0][1] / steep[1][1] == pytest.approx(3 / 2)
+    assert flat[0][1] / flat[1][1] == pytest.approx(1002 / 1001)
+
+
+def test_no_rankings():
+    assert reciprocal_rank_fusion({}, {"lexical": 1.0}) == []
@@ -0,0 +1,140 @@
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+
+from docy.storage import BlobStore
+from docy.storage import blob_store as blob_store_module
+
+GRACE = 3600.0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(blob_store_module, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def store(tmp_path: Path, clock: FakeClock) -> BlobStore:
+    return BlobStore(tmp_path / "blobs")
+
+
+def refcount(store: BlobStore, sha: str) -> int:
+    return store._db.execute("SELECT refcount FROM blobs WHERE sha = ?", (sha,)).fetchone()[0]
+
+
+def test_identical_content_is_stored_once(store: BlobStore):
+    first = store.put(b"same body")
+    second = store.put(b"same body")
+    other = store.put(b"other body")
+
+    assert first == second == hashlib.sha256(b"same body").hexdigest()
+    assert store.get(first) == b"same body"
+    assert store.size(other) == len(b"other body")
+    assert store.stats()["blobs"] == 2
+
+
+def test_writer_matches_put_and_abort_leaves_nothing(store: BlobStore):
+    writer = store.writer()
+    for chunk in (b"chunked ", b"upload"):
+        writer.write(chunk)
+    sha = writer.commit()
+
+    aborted = store.writer()
+    aborted.write(b"never stored")
+    aborted.abort()
+
+    assert sha == store.put(b"chunked upload")
+    assert writer.size == len(b"chunked upload")
+    assert store.stats()["blobs"] == 1
+    assert list(store.tmp_dir.iterdir()) == []
+
+
+def test_gc_keeps_referenced_and_recent_blobs(store: BlobStore, clock: FakeClock):
+    kept = store.put(b"referenced")
+    store.incref(kept)
+    fresh = store.put(b"stored but not referenced yet")
+
+    assert store.gc(GRACE) == (0, 0)
+
+    clock.now += GRACE + 1
+    removed, freed = store.gc(GRACE)
+
+    assert (removed, freed) == (1, len(b"stored but not referenced yet"))
+    assert store.exists(kept)
+    assert not store.exists(fresh)
+
+
+def test_release_starts_the_grace_period(store: BlobStore, clock: FakeClock):
+    sha = store.put(b"body")
+    store.incref(sha)
+    store.incref(sha)
+    clock.now += GRACE + 1
+
+    store.release(sha)
+    assert refcount(store, sha) == 1
+    store.release(sha)
+    store.release(sha)
+    assert refcount(store, sha) == 0
+
+    # Released just now, so still protected
+    assert store.gc(GRACE)[0] == 0
+    clock.now += GRACE + 1
+    assert store.gc(GRACE)[0] == 1
+    assert store.stats() == {"blobs": 0, "size": 0, "stored_size": 0, "unreferenced": 0}
+
+
+def test_rewriting_unreferenced_content_protects_it(store: BlobStore, clock: FakeClock):
+    sha = store.put(b"body")
+    clock.now += GRACE + 1
+
+    # A writer storing the same content again is about to reference it
+    store.put(b"body")
+
+    assert store.gc(GRACE)[0] == 0
+    assert store.exists(sha)
+
+
+def test_bind_moves_the_reference(store: BlobStore):
+    old = store.put(b"version 1")
+    new = store.put(b"version 2")
+
+    assert store.bind("files", "notes.md", old) is None
+    assert store.bind("files", "notes.md", old) == old
+    assert refcount(store, old) == 1
+    assert store.bind("files", "notes.md", new) == old
+
+    assert (refcount(store, old), refcount(store, new)) == (0, 1)
+    assert store.resolve("files", "notes.md") == new
+    assert store.unbind("files", "notes.md") == new
+    assert refcount(store, new) == 0
+    assert store.resolve("files", "notes.md") is None
+    assert store.unbind("files", "notes.md") is None
+
+
+def test_link_materializes_read_only_content(store: BlobStore, tmp_path: Path):
+    target = tmp_path / "files" / "report.md"
+    sha = store.store_as("files", "report.md", b"# Report\n", target=target)
+
+    assert target.read_bytes() == b"# Report\n"
+    assert store.resolve("files", "report.md") == sha
+    # Named files are hard links to the blob, so it carries no write permission
+    assert os.stat(store.raw_path(sha)).st_mode & 0o222 == 0
+    assert [path.name for path in target.parent.iterdir()] == ["report.md"]
+
+
+def test_missing_blob(store: BlobStore):
+    with pytest.raises(FileNotFoundError):
+        store.get("0" * 64)
+    assert store.size("0" * 64) is None
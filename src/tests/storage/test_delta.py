@@ -0,0 +1,33 @@
+import pytest
+
+from docy.storage import apply_delta, encode_delta
+
+BASE = "".join(f"line {number}\n" for number in range(200))
+
+
+@pytest.mark.parametrize(
+    "target",
+    [
+        BASE,
+        "",
+        BASE.replace("line 100\n", "line one hundred\n"),
+        "new first line\n" + BASE + "appended\n",
+        BASE.replace("line 10\n", "").replace("line 150\n", ""),
+        BASE.rstrip("\n"),
+        "crlf line\r\n" + BASE + "ünïcødé ✓\n",
+    ],
+    ids=["unchanged", "emptied", "edited", "prepend-append", "deletions", "no-final-newline", "crlf-unicode"],
+)
+def test_round_trip(target: str):
+    assert apply_delta(BASE, encode_delta(BASE, target)) == target
+
+
+def test_from_empty_base():
+    assert apply_delta("", encode_delta("", "fresh\ntext")) == "fresh\ntext"
+
+
+def test_small_edit_costs_little():
+    target = BASE.replace("line 100\n", "line one hundred\n")
+
+    # Unchanged runs are copied by range, so the delta stays far below the text size
+    assert len(encode_delta(BASE, target)) < len(target.encode("utf-8")) // 10
@@ -1,13 +1,24 @@
 import pathlib
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 import logfire
 from config import settings
 
+if TYPE_CHECKING:
+    from docy.storage import BlobStore
+
 BASE_DIR = settings.BASE_DATA_DIR
 CODING_DIR = BASE_DIR / settings.CODING_SUBDIR
 
 CODING_DIR.mkdir(exist_ok=True)
+# Content-addressed store the saved files link into, so identical saves are stored once
+blob_store: Optional["BlobStore"] = None
+try:
+    from docy.storage import get_blob_store
+except ImportError:  # running without docy on the path: plain writes
+    pass
+else:
+    blob_store = get_blob_store()
 
 
 async def list_files(directory: str = settings.CODING_SUBDIR) -> List[str] | str:
@@ -35,8 +46,11 @@ async def save_file(file_name: str, file_content: str, extension: str) -> str:
 
     file_path = CODING_DIR / safe_file_name
     try:
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(file_content)
+        if blob_store is not None:
+            blob_store.store_as(settings.CODING_SUBDIR, safe_file_name, file_content.encode("utf-8"), target=file_path)
+        else:
+            with open(file_path, "w", encoding="utf-8") as f:
+                f.write(file_content)
         return f"File saved at {file_path}"
     except Exception as e:
         logfire.error(f"Error saving file '{file_path}': {e}")